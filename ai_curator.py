@@ -3,15 +3,30 @@
 AI Curator - Scores articles using Anthropic Claude
 """
 
+import asyncio
+import json
 import os
 import psycopg
-from anthropic import Anthropic
 from datetime import datetime
 
+from scripts.call_log import CallLog, new_run_id
+from scripts.score_cache import ScoreCache
+from scripts.scoring_engine import (RateLimiter, ScoringError, UsageTotals, async_client, create_message,
+                                    is_transient, run_concurrently)
+from scripts.scoring_queue import dead_letter
+
 DATABASE_URL = os.environ.get('DATABASE_URL')
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
+MODEL = "claude-3-5-sonnet-20241022"
+PROMPT_VERSION = "root-v1"  # Bump whenever SCORING_PROMPT changes meaning
+
+# Scoring concurrency and API rate limits
+SCORING_CONCURRENCY = int(os.environ.get('SCORING_CONCURRENCY', '8'))
+REQUESTS_PER_MINUTE = float(os.environ.get('ANTHROPIC_REQUESTS_PER_MINUTE', '50'))
+TOKENS_PER_MINUTE = float(os.environ.get('ANTHROPIC_TOKENS_PER_MINUTE', '40000'))
 
-client = Anthropic(api_key=ANTHROPIC_API_KEY)
+# Identical content scored within this many days is reused instead of re-scored
+SCORE_CACHE_TTL_DAYS = float(os.environ.get('SCORE_CACHE_TTL_DAYS', '90'))
 
 SCORING_PROMPT = """You are an AI ethics expert curator for a newsletter. Score this article on three dimensions (0.00 to 1.00):
 
@@ -32,19 +47,119 @@ Respond in this exact JSON format:
 }}
 """
 
+async def score_article(client, limiter, article, usage=None):
+    """Score one (id, url, title, source) row; returns the score tuple for storage"""
+    article_id, url, title, source = article
+
+    try:
+        response = await create_message(client, limiter, {
+            "model": MODEL,
+            "max_tokens": 500,
+            "messages": [{
+                "role": "user",
+                "content": SCORING_PROMPT.format(title=title, source=source, url=url)
+            }]
+        }, usage, article_ids=[article_id])
+    except Exception as e:
+        raise ScoringError(f"API error: {e}", is_transient(e)) from e
+
+    # Parse JSON response; output that doesn't parse won't on a retry either
+    text = response.content[0].text if response.content else ''
+    try:
+        result = json.loads(text)
+        relevance = float(result['relevance_score'])
+        quality = float(result['quality_score'])
+        novelty = float(result['novelty_score'])
+        reasoning = result['reasoning']
+    except (ValueError, KeyError, TypeError) as e:
+        raise ScoringError(f"Unparseable response: {e!r}", False, text) from e
+
+    # Calculate overall score (weighted average)
+    overall = (relevance * 0.5) + (quality * 0.3) + (novelty * 0.2)
+    return overall, relevance, quality, novelty, reasoning
+
+def store_score(conn, article_id, result):
+    """Upsert one article's (overall, relevance, quality, novelty, reasoning) scores with their provenance"""
+    overall, relevance, quality, novelty, reasoning = result
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO article_scores
+                (article_id, overall_score, relevance_score, quality_score, novelty_score, reasoning,
+                 ai_model, prompt_version)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (article_id) DO UPDATE SET
+                    overall_score = EXCLUDED.overall_score,
+                    relevance_score = EXCLUDED.relevance_score,
+                    quality_score = EXCLUDED.quality_score,
+                    novelty_score = EXCLUDED.novelty_score,
+                    reasoning = EXCLUDED.reasoning,
+                    ai_model = EXCLUDED.ai_model,
+                    prompt_version = EXCLUDED.prompt_version,
+                    scored_at = CURRENT_TIMESTAMP;
+            """, (article_id, overall, relevance, quality, novelty, reasoning, MODEL, PROMPT_VERSION))
+
+            conn.commit()
+            print(f"  ✅ Score: {overall:.2f} (R:{relevance:.2f} Q:{quality:.2f} N:{novelty:.2f})")
+            return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"  ❌ Error storing score: {e}")
+        return False
+
+async def score_concurrently(conn, articles, cache):
+    """Score articles with bounded concurrency, storing each as it completes"""
+    client = async_client(ANTHROPIC_API_KEY)
+    limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+    usage = UsageTotals(CallLog(new_run_id(), PROMPT_VERSION))
+    scored = 0
+
+    async for article, result in run_concurrently(
+        articles, lambda article: score_article(client, limiter, article, usage), SCORING_CONCURRENCY
+    ):
+        article_id, url, title, source = article
+        print(f"[{datetime.now()}] Scored: {title[:60]}...")
+
+        if isinstance(result, Exception):
+            print(f"  ❌ Error scoring article: {result}")
+            if isinstance(result, ScoringError) and not result.transient:
+                dead_letter(conn, article_id, MODEL, PROMPT_VERSION, str(result), result.raw_response)
+                conn.commit()
+                print("  🪦 Moved to scoring_dead_letters")
+            continue
+
+        overall, relevance, quality, novelty, reasoning = result
+        cache.store(cache.key(title, None, source), {
+            'overall_score': overall,
+            'relevance_score': relevance,
+            'quality_score': quality,
+            'novelty_score': novelty,
+            'reasoning': reasoning
+        })
+        if store_score(conn, article_id, result):
+            scored += 1
+
+    await client.close()
+    usage.log.flush(conn)
+    print(f"[{datetime.now()}] 📈 {usage.log.calls} API calls logged to scoring_calls "
+          f"(run {usage.log.run_id}), estimated cost ${usage.log.cost:.4f}")
+    return scored
+
 def score_articles():
     """Score unscored articles using Claude"""
     print(f"[{datetime.now()}] 🤖 Starting AI curation...")
 
     conn = psycopg.connect(DATABASE_URL)
 
-    # Get unscored articles
+    # Get unscored articles, skipping ones that failed permanently
     with conn.cursor() as cur:
         cur.execute("""
             SELECT a.id, a.url, a.title, a.source
             FROM articles a
             LEFT JOIN article_scores s ON a.id = s.article_id
             WHERE s.id IS NULL
+              AND NOT EXISTS (SELECT 1 FROM scoring_dead_letters d WHERE d.article_id = a.id)
             ORDER BY a.scraped_at DESC
             LIMIT 20;
         """)
@@ -56,54 +171,30 @@ def score_articles():
         return 0
 
     print(f"[{datetime.now()}] Found {len(articles)} unscored articles")
-    scored = 0
-
-    for article in articles:
-        article_id, url, title, source = article
 
-        try:
-            print(f"[{datetime.now()}] Scoring: {title[:60]}...")
-
-            # Call Claude API
-            response = client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=500,
-                messages=[{
-                    "role": "user",
-                    "content": SCORING_PROMPT.format(title=title, source=source, url=url)
-                }]
-            )
-
-            # Parse JSON response
-            import json
-            result = json.loads(response.content[0].text)
-
-            relevance = float(result['relevance_score'])
-            quality = float(result['quality_score'])
-            novelty = float(result['novelty_score'])
-            reasoning = result['reasoning']
-
-            # Calculate overall score (weighted average)
-            overall = (relevance * 0.5) + (quality * 0.3) + (novelty * 0.2)
-
-            # Store in database
-            with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO article_scores
-                    (article_id, overall_score, relevance_score, quality_score, novelty_score, reasoning)
-                    VALUES (%s, %s, %s, %s, %s, %s);
-                """, (article_id, overall, relevance, quality, novelty, reasoning))
+    # Reuse scores for content already scored under this model and prompt
+    cache = ScoreCache(conn, MODEL, PROMPT_VERSION, SCORE_CACHE_TTL_DAYS)
+    cache.evict()
+    keys = {article[0]: cache.key(article[2], None, article[3]) for article in articles}
+    cached_scores = cache.lookup(keys.values())
 
-                conn.commit()
-                scored += 1
-                print(f"  ✅ Score: {overall:.2f} (R:{relevance:.2f} Q:{quality:.2f} N:{novelty:.2f})")
-
-        except Exception as e:
-            print(f"  ❌ Error scoring article: {e}")
-            continue
+    scored = 0
+    for article_id, url, title, source in articles:
+        cached = cached_scores.get(keys[article_id])
+        if cached:
+            print(f"[{datetime.now()}] Cached: {title[:60]}...")
+            scored += store_score(conn, article_id, (
+                cached['overall_score'], cached['relevance_score'], cached['quality_score'],
+                cached['novelty_score'], cached['reasoning']
+            ))
+
+    to_score = [article for article in articles if keys[article[0]] not in cached_scores]
+    if to_score:
+        scored += asyncio.run(score_concurrently(conn, to_score, cache))
 
     conn.close()
-    print(f"[{datetime.now()}] ✅ AI curation complete. Scored: {scored}")
+    print(f"[{datetime.now()}] ✅ AI curation complete. Scored: {scored} "
+          f"(score cache: {cache.hits} hits, {cache.misses} misses, {cache.hit_rate():.0%} hit rate)")
     return scored
 
 if __name__ == "__main__":
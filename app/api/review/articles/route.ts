@@ -32,13 +32,14 @@ export async function GET(request: NextRequest) {
       LIMIT ${limit}
     `;
 
-    // Convert score strings to numbers for frontend
+    // Convert score strings to numbers for frontend (scores the pre-filter
+    // did not assess may be NULL on older rows)
     const articles = results.map(article => ({
       ...article,
-      overall_score: parseFloat(article.overall_score),
-      relevance_score: parseFloat(article.relevance_score),
-      quality_score: parseFloat(article.quality_score),
-      novelty_score: parseFloat(article.novelty_score)
+      overall_score: parseFloat(article.overall_score ?? 0),
+      relevance_score: parseFloat(article.relevance_score ?? 0),
+      quality_score: parseFloat(article.quality_score ?? 0),
+      novelty_score: parseFloat(article.novelty_score ?? 0)
     }));
 
     return NextResponse.json({
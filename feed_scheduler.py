@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Feed Scheduler - Adaptive per-feed polling for the background worker
+"""
+
+import random
+from datetime import datetime, timedelta
+from statistics import median
+
+# Polling interval bounds
+MIN_INTERVAL = timedelta(minutes=15)
+MAX_INTERVAL = timedelta(hours=24)
+DEFAULT_INTERVAL = timedelta(hours=8)
+
+HISTORY_SIZE = 20       # Recent posts used to estimate a feed's posting rate
+POLLS_PER_POST = 2      # Poll about twice per typical gap between posts
+MAX_BACKOFF_STEPS = 5   # Failures double the interval up to 2^5 times
+JITTER = 0.1            # Randomize intervals by +/-10% so polls don't bunch up
+
+class FeedScheduler:
+    """Tracks when each feed is next due, learning intervals from post history"""
+
+    def __init__(self, feeds, now=None):
+        now = now or datetime.now()
+        self.feeds = {feed['source']: feed for feed in feeds}
+        self.intervals = {source: DEFAULT_INTERVAL for source in self.feeds}
+        self.failures = {source: 0 for source in self.feeds}
+        # Spread the first round of polls over the next few minutes
+        self.next_poll = {
+            source: now + timedelta(seconds=random.uniform(0, MIN_INTERVAL.total_seconds()))
+            for source in self.feeds
+        }
+
+    def learn_rates(self, conn):
+        """Estimate each feed's polling interval from its published_date history"""
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT source, published_date
+                FROM (
+                    SELECT source, published_date,
+                           ROW_NUMBER() OVER (PARTITION BY source ORDER BY published_date DESC) AS rn
+                    FROM articles
+                    WHERE published_date IS NOT NULL
+                ) recent
+                WHERE rn <= %s
+                ORDER BY source, published_date;
+            """, (HISTORY_SIZE,))
+            rows = cur.fetchall()
+        conn.commit()
+
+        history = {}
+        for source, published in rows:
+            history.setdefault(source, []).append(published)
+
+        for source in self.feeds:
+            dates = history.get(source, [])
+            gaps = [(b - a).total_seconds() for a, b in zip(dates, dates[1:]) if b > a]
+            if not gaps:
+                continue
+
+            interval = timedelta(seconds=median(gaps) / POLLS_PER_POST)
+            self.intervals[source] = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+
+    def due_feeds(self, now=None):
+        """Return the feeds whose next poll time has passed"""
+        now = now or datetime.now()
+        return [self.feeds[source] for source, due in self.next_poll.items() if due <= now]
+
+    def record_result(self, source, new_articles, now=None):
+        """Schedule a feed's next poll; new_articles is None when the fetch failed"""
+        if new_articles is None:
+            # Back off exponentially from failing feeds
+            self.failures[source] = min(self.failures[source] + 1, MAX_BACKOFF_STEPS)
+        else:
+            self.failures[source] = 0
+        self._schedule(source, now)
+
+    def record_skip(self, source, now=None):
+        """Schedule a feed that was skipped without being fetched, keeping its interval and backoff"""
+        self._schedule(source, now)
+
+    def _schedule(self, source, now=None):
+        now = now or datetime.now()
+        interval = self.intervals[source] * (2 ** self.failures[source])
+        interval = min(interval, MAX_INTERVAL) * random.uniform(1 - JITTER, 1 + JITTER)
+        self.next_poll[source] = now + interval
@@ -19,13 +19,15 @@ with conn.cursor() as cur:
     cur.execute("""
         CREATE TABLE IF NOT EXISTS articles (
             id SERIAL PRIMARY KEY,
-            url TEXT UNIQUE NOT NULL,
+            url TEXT NOT NULL,
+            url_key BYTEA NOT NULL,
             title TEXT NOT NULL,
             source TEXT NOT NULL,
             published_date TIMESTAMP,
             scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
     """)
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_url_key ON articles(url_key);")
 
     print("📋 Creating article_scores table...")
     cur.execute("""
@@ -37,10 +39,14 @@ with conn.cursor() as cur:
             quality_score DECIMAL(3,2),
             novelty_score DECIMAL(3,2),
             reasoning TEXT,
+            ai_model VARCHAR(100),
+            prompt_version VARCHAR(50),
             scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             UNIQUE(article_id)
         );
     """)
+    cur.execute("ALTER TABLE article_scores ADD COLUMN IF NOT EXISTS ai_model VARCHAR(100);")
+    cur.execute("ALTER TABLE article_scores ADD COLUMN IF NOT EXISTS prompt_version VARCHAR(50);")
 
     print("📋 Creating newsletter_items table...")
     cur.execute("""
@@ -55,6 +61,75 @@ with conn.cursor() as cur:
         );
     """)
 
+    print("📋 Creating feed_registry table...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS feed_registry (
+            feed_url TEXT PRIMARY KEY,
+            feed_name TEXT,
+            last_attempt_at TIMESTAMP,
+            last_success_at TIMESTAMP,
+            avg_latency_ms DOUBLE PRECISION,
+            consecutive_failures INTEGER DEFAULT 0,
+            total_fetches INTEGER DEFAULT 0,
+            total_failures INTEGER DEFAULT 0,
+            last_error TEXT,
+            open_until TIMESTAMP
+        );
+    """)
+
+    print("📋 Creating score_cache table...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS score_cache (
+            cache_key BYTEA PRIMARY KEY,
+            ai_model VARCHAR(100) NOT NULL,
+            prompt_version VARCHAR(50) NOT NULL,
+            relevance_score DECIMAL(3,2),
+            quality_score DECIMAL(3,2),
+            novelty_score DECIMAL(3,2),
+            overall_score DECIMAL(3,2),
+            reasoning TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_hit_at TIMESTAMP,
+            hits INTEGER DEFAULT 0
+        );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_score_cache_created ON score_cache(created_at);")
+
+    print("📋 Creating scoring_dead_letters table...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scoring_dead_letters (
+            id SERIAL PRIMARY KEY,
+            article_id INTEGER REFERENCES articles(id) ON DELETE CASCADE,
+            ai_model VARCHAR(100),
+            prompt_version VARCHAR(50),
+            error TEXT NOT NULL,
+            raw_response TEXT,
+            failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_dead_letters_article ON scoring_dead_letters(article_id);")
+
+    print("📋 Creating scoring_calls table...")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scoring_calls (
+            id BIGSERIAL PRIMARY KEY,
+            run_id TEXT NOT NULL,
+            called_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ai_model VARCHAR(100) NOT NULL,
+            prompt_version VARCHAR(50),
+            article_ids INTEGER[] NOT NULL,
+            input_tokens INTEGER DEFAULT 0,
+            output_tokens INTEGER DEFAULT 0,
+            cache_read_tokens INTEGER DEFAULT 0,
+            cache_write_tokens INTEGER DEFAULT 0,
+            latency_ms DOUBLE PRECISION,
+            outcome VARCHAR(20) NOT NULL,
+            cost_usd NUMERIC(12,6)
+        );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_scoring_calls_called ON scoring_calls(called_at);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_scoring_calls_run ON scoring_calls(run_id);")
+
     conn.commit()
     print("✅ Database schema initialized successfully!")
 
@@ -4,12 +4,40 @@ RSS Monitor - Fetches articles from AI ethics RSS feeds
 """
 
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from datetime import datetime
+from urllib.parse import urlparse
 import feedparser
 import psycopg
-from datetime import datetime
+import requests
+
+from scripts.feed_health import (BudgetExhausted, DeadlineReader, circuit_open, load_registry,
+                                 record_failure, record_success, registry_entry, request_timeout,
+                                 save_registry)
+from scripts.feed_stream import ParseError, iter_entries
+from scripts.url_canon import drop_unique_constraints, url_key
 
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Fetch concurrency (overridable from the environment)
+RSS_MAX_WORKERS = int(os.environ.get('RSS_MAX_WORKERS', '8'))
+RSS_PER_HOST_LIMIT = int(os.environ.get('RSS_PER_HOST_LIMIT', '2'))
+RSS_FEED_TIMEOUT = float(os.environ.get('RSS_FEED_TIMEOUT', '20'))  # Hard limit per feed
+RSS_RUN_BUDGET = float(os.environ.get('RSS_RUN_BUDGET', '300'))    # Hard limit per run
+RUN_BUDGET_GRACE = 5
+
+# Stop reading a feed after this many already-stored entries in a row
+KNOWN_STREAK_LIMIT = 3
+
+# Only the most recent entries of each feed are considered
+ENTRIES_PER_FEED = 10
+
+# feed_results value for feeds skipped this run (open circuit breaker or no run budget left)
+NOT_ATTEMPTED = 'not attempted'
+
 # AI Ethics RSS Feeds
 RSS_FEEDS = [
     {
@@ -30,54 +58,246 @@ RSS_FEEDS = [
     }
 ]
 
-def fetch_rss_feeds():
-    """Fetch and store new articles from RSS feeds"""
+_host_semaphores = {}
+_host_lock = threading.Lock()
+
+def _host_semaphore(url):
+    """Return the semaphore limiting concurrent requests to url's host"""
+    host = urlparse(url).netloc.lower()
+    with _host_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.Semaphore(RSS_PER_HOST_LIMIT)
+        return _host_semaphores[host]
+
+def _get(url, deadline):
+    """Start a streamed GET with whatever time is left before the deadline"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise BudgetExhausted('no time left before the fetch could start')
+    response = requests.get(url, timeout=request_timeout(deadline), stream=True)
+    response.raise_for_status()
+    response.raw.decode_content = True
+    return response
+
+def _fetch_entries(feed_info, deadline):
+    """Download and parse the newest entries of a feed before the deadline"""
+    with _host_semaphore(feed_info['url']):
+        # Stream the document and hang up once enough entries have been read
+        with _get(feed_info['url'], deadline) as response:
+            try:
+                return list(iter_entries(DeadlineReader(response.raw, deadline), limit=ENTRIES_PER_FEED))
+            except ParseError:
+                pass
+
+        # Malformed XML: fall back to feedparser's lenient parser
+        with _get(feed_info['url'], deadline) as response:
+            body = DeadlineReader(response.raw, deadline).read_all()
+
+    entries = []
+    for entry in feedparser.parse(body).entries[:ENTRIES_PER_FEED]:
+        # An entry without a link is skipped, not the whole feed
+        link = entry.get('link')
+        if not link:
+            continue
+        published = None
+        if entry.get('published_parsed'):
+            published = datetime(*entry.published_parsed[:6])
+        entries.append({'link': link, 'title': entry.get('title', ''), 'pub_date': published})
+    return entries
+
+def fetch_feed(feed_info, run_deadline, health):
+    """Fetch one feed on a worker thread, recording the outcome in its health entry"""
+    print(f"[{datetime.now()}] Fetching {feed_info['source']}...")
+    started = time.monotonic()
+    deadline = min(started + RSS_FEED_TIMEOUT, run_deadline)
+
+    try:
+        entries = _fetch_entries(feed_info, deadline)
+    except BudgetExhausted:
+        raise
+    except Exception as e:
+        record_failure(health, time.monotonic() - started, f"{type(e).__name__}: {e}")
+        raise
+
+    record_success(health, time.monotonic() - started)
+    return entries
+
+def load_known_urls(conn):
+    """Load stored canonical URL keys grouped by source, once per run"""
+    known = {}
+    with conn.cursor() as cur:
+        cur.execute("SELECT source, url_key FROM articles WHERE url_key IS NOT NULL;")
+        for source, key in cur:
+            known.setdefault(source, set()).add(bytes(key))
+    return known
+
+def backfill_url_keys(conn):
+    """
+    Key articles stored before url_key existed, then drop the raw url constraint.
+
+    worker.init_database runs it while the old constraint exists; it can also be
+    run by hand with `python3 rss_monitor.py --backfill-url-keys`.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, url FROM articles WHERE url_key IS NULL ORDER BY id;")
+        rows = cur.fetchall()
+
+        ids, keys, seen = [], [], set()
+        for article_id, url in rows:
+            key = url_key(url)
+            if key not in seen:
+                seen.add(key)
+                ids.append(article_id)
+                keys.append(key)
+
+        # Duplicate canonical URLs stay unkeyed
+        cur.execute("""
+            UPDATE articles a
+            SET url_key = d.url_key
+            FROM unnest(%s::int[], %s::bytea[]) AS d(id, url_key)
+            WHERE a.id = d.id
+              AND NOT EXISTS (SELECT 1 FROM articles b WHERE b.url_key = d.url_key);
+        """, (ids, keys))
+        keyed = cur.rowcount
+
+        drop_unique_constraints(cur, 'articles', 'url')
+    conn.commit()
+    return keyed
+
+def store_entries(conn, rows):
+    """Insert (url, title, source, published, url_key) rows, returning titles of new articles"""
+    if not rows:
+        return []
+
+    try:
+        # One round trip for the whole feed
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO articles (url, title, source, published_date, url_key)
+                    SELECT * FROM unnest(%s::text[], %s::text[], %s::text[], %s::timestamp[], %s::bytea[])
+                    ON CONFLICT (url_key) DO NOTHING
+                    RETURNING title;
+                """, [list(column) for column in zip(*rows)])
+                return [row[0] for row in cur.fetchall()]
+
+    except Exception as e:
+        print(f"  ⚠️  Batch insert failed ({e}), retrying entries one at a time")
+
+    # Savepoint per row so a bad entry doesn't discard the rest of the feed
+    titles = []
+    for row in rows:
+        try:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        INSERT INTO articles (url, title, source, published_date, url_key)
+                        VALUES (%s, %s, %s, %s, %s)
+                        ON CONFLICT (url_key) DO NOTHING
+                        RETURNING title;
+                    """, row)
+                    if cur.fetchone():
+                        titles.append(row[1])
+
+        except Exception as e:
+            print(f"  ⚠️  Error processing entry: {e}")
+            continue
+
+    return titles
+
+def fetch_rss_feeds(feeds=None, feed_results=None):
+    """
+    Fetch and store new articles from RSS feeds (all of RSS_FEEDS by default).
+
+    If feed_results is a dict, it receives each feed's new article count keyed
+    by source, None for feeds that failed, or NOT_ATTEMPTED for feeds that were
+    skipped without being fetched.
+    """
+    feeds = RSS_FEEDS if feeds is None else feeds
+    feed_results = {} if feed_results is None else feed_results
     print(f"[{datetime.now()}] 📡 Starting RSS feed monitoring...")
 
     conn = psycopg.connect(DATABASE_URL)
     new_articles = 0
+    known_urls = load_known_urls(conn)
+    registry = load_registry(conn)
+    conn.commit()
 
-    for feed_info in RSS_FEEDS:
-        try:
-            print(f"[{datetime.now()}] Fetching {feed_info['source']}...")
-            feed = feedparser.parse(feed_info['url'])
-
-            for entry in feed.entries[:10]:  # Limit to 10 most recent
-                try:
-                    # Extract article details
-                    url = entry.link
-                    title = entry.title
-                    source = feed_info['source']
-                    published = None
-
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published = datetime(*entry.published_parsed[:6])
-
-                    # Insert into database (skip if URL exists)
-                    with conn.cursor() as cur:
-                        cur.execute("""
-                            INSERT INTO articles (url, title, source, published_date)
-                            VALUES (%s, %s, %s, %s)
-                            ON CONFLICT (url) DO NOTHING
-                            RETURNING id;
-                        """, (url, title, source, published))
-
-                        if cur.fetchone():
-                            new_articles += 1
-                            print(f"  ✅ Added: {title[:60]}...")
-
-                        conn.commit()
-
-                except Exception as e:
-                    print(f"  ⚠️  Error processing entry: {e}")
-                    continue
+    run_deadline = time.monotonic() + RSS_RUN_BUDGET
+    executor = ThreadPoolExecutor(max_workers=max(1, RSS_MAX_WORKERS))
+    futures = {}
+    for feed_info in feeds:
+        health = registry_entry(registry, feed_info['url'], feed_info['source'])
+        if circuit_open(health):
+            print(f"[{datetime.now()}] ⏸️  Skipping {feed_info['source']} until {health['open_until']:%Y-%m-%d %H:%M}"
+                  f" ({health['consecutive_failures']} consecutive failures)")
+            feed_results[feed_info['source']] = NOT_ATTEMPTED
+            continue
+        futures[executor.submit(fetch_feed, feed_info, run_deadline, health)] = feed_info
 
-        except Exception as e:
-            print(f"[{datetime.now()}] ❌ Error fetching {feed_info['source']}: {e}")
+    # Store each feed as soon as it arrives while slower feeds keep downloading
+    try:
+        for future in as_completed(futures, timeout=RSS_RUN_BUDGET + RUN_BUDGET_GRACE):
+            feed_info = futures[future]
+            try:
+                entries = future.result()
+
+                known = known_urls.get(feed_info['source'], set())
+                known_streak = 0
+
+                rows = []
+                for entry in entries:
+                    try:
+                        if not entry['link']:
+                            continue
+
+                        # Skip entries we already have without a database round trip
+                        key = url_key(entry['link'])
+                        if key in known:
+                            known_streak += 1
+                            if known_streak >= KNOWN_STREAK_LIMIT:
+                                break
+                            continue
+                        known_streak = 0
+
+                        rows.append((entry['link'], entry['title'], feed_info['source'], entry['pub_date'], key))
+
+                    except Exception as e:
+                        print(f"  ⚠️  Error processing entry: {e}")
+                        continue
+
+                titles = store_entries(conn, rows)
+                for title in titles:
+                    new_articles += 1
+                    print(f"  ✅ Added: {title[:60]}...")
+                feed_results[feed_info['source']] = len(titles)
+
+            except BudgetExhausted:
+                print(f"[{datetime.now()}] ⏱️  Run budget exhausted before fetching {feed_info['source']}")
+                feed_results[feed_info['source']] = NOT_ATTEMPTED
+
+            except Exception as e:
+                print(f"[{datetime.now()}] ❌ Error fetching {feed_info['source']}: {e}")
+                feed_results[feed_info['source']] = None
+
+            save_registry(conn, [registry[feed_info['url']]])
+
+    except FuturesTimeout:
+        unfinished = [futures[future]['source'] for future in futures if not future.done()]
+        print(f"[{datetime.now()}] ⏱️  Run budget exhausted, abandoning: {', '.join(unfinished)}")
+        for source in unfinished:
+            feed_results[source] = NOT_ATTEMPTED
 
+    executor.shutdown(wait=False, cancel_futures=True)
     conn.close()
     print(f"[{datetime.now()}] ✅ RSS monitoring complete. New articles: {new_articles}")
     return new_articles
 
 if __name__ == "__main__":
-    fetch_rss_feeds()
+    if '--backfill-url-keys' in sys.argv:
+        conn = psycopg.connect(DATABASE_URL)
+        keyed = backfill_url_keys(conn)
+        conn.close()
+        print(f"[{datetime.now()}] 🔑 Backfilled url_key for {keyed} articles")
+    else:
+        fetch_rss_feeds()
@@ -0,0 +1 @@
+"""Local pipeline scripts; the Render modules at the repo root import the shared helpers from here."""
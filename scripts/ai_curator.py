@@ -4,13 +4,27 @@ AI Curator for AI Ethics Newsletter
 Uses Claude API to score articles for relevance, quality, and novelty.
 """
 
+import argparse
+import asyncio
 import json
 import sys
 import os
+import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import psycopg
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
+
+from call_log import CallLog, new_run_id
+from novelty import NOVELTY_WINDOW_DAYS, NoveltyIndex, blend_novelty, local_novelty
+from prefilter import PREFILTER_CONFIDENCE, PREFILTER_MODEL, Prefilter, article_text, rejection_scores
+from score_cache import SCORE_CACHE_TTL_DAYS, ScoreCache
+from scoring_engine import (BACKFILL_RATE_SHARE, REQUESTS_PER_MINUTE, SCORING_CONCURRENCY,
+                            TOKENS_PER_MINUTE, RateLimiter, ScoringError, UsageTotals, async_client,
+                            create_message, estimate_tokens, is_transient, run_concurrently)
+from scoring_queue import (LEASE_SECONDS, NOTIFY_CHANNEL, dead_letter, enqueue_backlog, lease,
+                           queue_counts, worker_id)
+from scoring_queue import complete as queue_complete, fail as queue_fail
 
 # Database connection parameters
 DB_CONFIG = {
@@ -24,12 +38,16 @@ DB_CONFIG = {
 # AI Model configuration
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
 MODEL = "claude-sonnet-4-20250514"
+FAST_MODEL = "claude-3-5-haiku-20241022"  # First tier in cascade mode
+CASCADE_BAND = (0.55, 0.80)               # Fast-tier overall scores in this range are escalated to MODEL
+PROMPT_VERSION = "rubric-v1"  # Bump whenever the scoring prompt changes meaning
 
-SCORING_PROMPT = """You are an expert AI safety and ethics researcher tasked with curating content for a professional newsletter.
+# Static instructions sent as the system prompt; only the article text varies per call
+SCORING_SYSTEM = """You are an expert AI safety and ethics researcher tasked with curating content for a professional newsletter.
 
 Your role is to evaluate whether articles are relevant and valuable for an audience of AI researchers, engineers, and policymakers focused on AI safety, alignment, and ethics.
 
-Evaluate the following article and provide scores (0.00 to 1.00) for:
+Evaluate each article you are given and provide scores (0.00 to 1.00) for:
 
 1. **Relevance Score**: How directly does this relate to AI safety, ethics, alignment, or responsible AI development?
    - 1.00: Core AI safety/ethics topic (alignment research, safety techniques, ethical frameworks)
@@ -51,7 +69,30 @@ Evaluate the following article and provide scores (0.00 to 1.00) for:
 
 4. **Overall Score**: Your recommendation for inclusion (weighted average favoring relevance)
 
-ARTICLE TO EVALUATE:
+Score every article independently of any others in the same request.
+
+Respond with JSON only (no other text). For a single article, respond with one object:
+{
+  "relevance_score": 0.00,
+  "quality_score": 0.00,
+  "novelty_score": 0.00,
+  "overall_score": 0.00,
+  "reasoning": "Brief explanation of your scores (2-3 sentences)"
+}
+
+When given several articles with IDs, respond with a JSON array containing exactly one such object per article, each with an added "id" field holding that article's ID:
+[
+  {
+    "id": 0,
+    "relevance_score": 0.00,
+    "quality_score": 0.00,
+    "novelty_score": 0.00,
+    "overall_score": 0.00,
+    "reasoning": "Brief explanation of your scores (2-3 sentences)"
+  }
+]"""
+
+SCORING_PROMPT = """ARTICLE TO EVALUATE:
 ---
 Title: {title}
 Source: {source}
@@ -59,29 +100,52 @@ Date: {pub_date}
 Description: {description}
 ---
 
-Respond with a JSON object only (no other text):
-{{
-  "relevance_score": 0.00,
-  "quality_score": 0.00,
-  "novelty_score": 0.00,
-  "overall_score": 0.00,
-  "reasoning": "Brief explanation of your scores (2-3 sentences)"
-}}"""
+Respond with a JSON object only."""
+
+BATCH_SCORING_PROMPT = """ARTICLES TO EVALUATE:
+---
+{articles}
+---
+
+Respond with a JSON array only, one object per article above, using each article's ID."""
 
-def get_unscored_articles(conn, limit: int = 50) -> List[Dict]:
-    """Fetch articles that haven't been scored yet."""
+BATCH_ARTICLE = """ID: {id}
+Title: {title}
+Source: {source}
+Date: {pub_date}
+Description: {description}"""
+
+SCORE_FIELDS = ('relevance_score', 'quality_score', 'novelty_score', 'overall_score')
+SCORE_FLUSH_ROWS = 50             # Buffered scores written per upsert
+SCORE_FLUSH_SECONDS = 2.0         # ...or sooner, once the oldest buffered score has waited this long
+FOLLOW_BATCH_WINDOW = 0.5         # --follow: seconds to gather further arrivals into one micro-batch
+FOLLOW_IDLE_POLL = 60.0           # --follow: re-check the queue this often without notifications
+BATCH_SIZE = 1                    # Articles per scoring request (1 = one request per article)
+BATCH_TOKENS_PER_ARTICLE = 250    # Response budget for each article in a batch
+BACKFILL_ACTIVE_MINUTES = 10      # A backfill that checkpointed this recently counts as running
+
+def get_leased_articles(conn, article_ids: List[int]) -> List[Dict]:
+    """
+    Fetch the articles this worker leased from the scoring queue.
+
+    Leased articles that already have a score (e.g. inherited from a
+    near-duplicate) are dropped from the queue instead of being returned.
+    """
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT a.id, a.title, a.source_name, a.pub_date, a.description, a.link
+        SELECT a.id, a.title, a.source_name, a.pub_date, a.description, a.link, s.id
         FROM articles a
         LEFT JOIN article_scores s ON a.id = s.article_id
-        WHERE s.id IS NULL
+        WHERE a.id = ANY(%s)
         ORDER BY a.pub_date DESC
-        LIMIT %s
-    """, (limit,))
+    """, (article_ids,))
 
     articles = []
+    already_scored = []
     for row in cursor.fetchall():
+        if row[6] is not None:
+            already_scored.append(row[0])
+            continue
         articles.append({
             'id': row[0],
             'title': row[1],
@@ -91,77 +155,639 @@ def get_unscored_articles(conn, limit: int = 50) -> List[Dict]:
             'link': row[5]
         })
 
+    queue_complete(conn, already_scored)
+    conn.commit()
     cursor.close()
     return articles
 
-def score_article(client: Anthropic, article: Dict) -> Optional[Dict]:
-    """Use Claude to score an article."""
+def extract_json(response_text: str):
+    """Parse the JSON value out of a model response."""
+    response_text = response_text.strip()
+
+    # Try to parse JSON directly
     try:
-        prompt = SCORING_PROMPT.format(
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        # If wrapped in markdown code block, extract it
+        if '```json' in response_text:
+            json_start = response_text.find('```json') + 7
+            json_end = response_text.find('```', json_start)
+            response_text = response_text[json_start:json_end].strip()
+        elif '```' in response_text:
+            json_start = response_text.find('```') + 3
+            json_end = response_text.find('```', json_start)
+            response_text = response_text[json_start:json_end].strip()
+        return json.loads(response_text)
+
+def valid_scores(scores) -> bool:
+    """True if a scores object has every score in [0, 1] and a reasoning string."""
+    if not isinstance(scores, dict) or not isinstance(scores.get('reasoning'), str):
+        return False
+    for field in SCORE_FIELDS:
+        value = scores.get(field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+            return False
+    return True
+
+def parse_scores(response_text: str) -> Dict:
+    """Parse and validate a single-article scores object."""
+    scores = extract_json(response_text)
+    if not valid_scores(scores):
+        raise ValueError(f"invalid scores object: {response_text[:200]}")
+    return scores
+
+def parse_batch_scores(response_text: str, article_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Parse a batch response into {article_id: scores}.
+
+    Objects with an unknown, repeated or missing id, or with invalid scores,
+    are dropped so their articles fall back to single scoring.
+    """
+    try:
+        items = extract_json(response_text)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    expected = set(article_ids)
+    results = {}
+    repeated = set()
+    for item in items:
+        if not valid_scores(item):
+            continue
+        article_id = item.get('id')
+        if isinstance(article_id, str) and article_id.isdigit():
+            article_id = int(article_id)
+        # True == 1 and 1.0 == 1, so only real integers may match an article
+        if type(article_id) is not int or article_id not in expected:
+            continue
+        if article_id in results:
+            repeated.add(article_id)
+        results[article_id] = {key: value for key, value in item.items() if key != 'id'}
+
+    for article_id in repeated:
+        del results[article_id]
+    return results
+
+def build_request(article: Dict, model: str = MODEL) -> Dict:
+    """Build the Messages API request that scores one article."""
+    prompt = SCORING_PROMPT.format(
+        title=article['title'],
+        source=article['source_name'],
+        pub_date=article['pub_date'] or 'Unknown',
+        description=article['description'][:500] if article['description'] else 'No description available'
+    )
+    return {
+        'model': model,
+        'max_tokens': 1024,
+        'system': SCORING_SYSTEM,
+        'messages': [{"role": "user", "content": prompt}]
+    }
+
+def build_batch_request(articles: List[Dict], model: str = MODEL) -> Dict:
+    """Build one Messages API request that scores several articles."""
+    blocks = "\n---\n".join(
+        BATCH_ARTICLE.format(
+            id=article['id'],
             title=article['title'],
             source=article['source_name'],
             pub_date=article['pub_date'] or 'Unknown',
             description=article['description'][:500] if article['description'] else 'No description available'
         )
+        for article in articles
+    )
+    return {
+        'model': model,
+        'max_tokens': BATCH_TOKENS_PER_ARTICLE * len(articles),
+        'system': SCORING_SYSTEM,
+        'messages': [{"role": "user", "content": BATCH_SCORING_PROMPT.format(articles=blocks)}]
+    }
+
+async def score_article(client: AsyncAnthropic, limiter: RateLimiter, article: Dict,
+                        usage: Optional[UsageTotals] = None, model: str = MODEL) -> Dict:
+    """
+    Use Claude to score an article.
+
+    Raises ScoringError once retries are exhausted; unparseable output is
+    permanent and carries the raw response.
+    """
+    try:
+        message = await create_message(client, limiter, build_request(article, model), usage,
+                                       article_ids=[article['id']])
+    except Exception as e:
+        raise ScoringError(f"API error: {e}", is_transient(e)) from e
 
-        message = client.messages.create(
-            model=MODEL,
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        # Extract JSON from response
-        response_text = message.content[0].text.strip()
-
-        # Try to parse JSON directly
+    text = message.content[0].text if message.content else ''
+    try:
+        return parse_scores(text)
+    except ValueError as e:
+        raise ScoringError(f"Unparseable response: {e}", False, text) from e
+
+async def score_batch(client: AsyncAnthropic, limiter: RateLimiter, articles: List[Dict],
+                      usage: Optional[UsageTotals] = None,
+                      model: str = MODEL) -> Tuple[Dict[int, Dict], Dict[int, ScoringError]]:
+    """
+    Score several articles in one request.
+
+    Articles missing from, or malformed in, the response are re-scored one by one.
+    Returns (scores, errors) keyed by article id.
+    """
+    results = {}
+    errors = {}
+    if len(articles) > 1:
         try:
-            scores = json.loads(response_text)
-        except json.JSONDecodeError:
-            # If wrapped in markdown code block, extract it
-            if '```json' in response_text:
-                json_start = response_text.find('```json') + 7
-                json_end = response_text.find('```', json_start)
-                response_text = response_text[json_start:json_end].strip()
-            elif '```' in response_text:
-                json_start = response_text.find('```') + 3
-                json_end = response_text.find('```', json_start)
-                response_text = response_text[json_start:json_end].strip()
-            scores = json.loads(response_text)
-
-        return scores
+            message = await create_message(client, limiter, build_batch_request(articles, model), usage,
+                                           article_ids=[article['id'] for article in articles])
+            results = parse_batch_scores(message.content[0].text, [article['id'] for article in articles])
+        except Exception as e:
+            print(f"  Error scoring batch of {len(articles)}: {e}")
+
+    missing = [article for article in articles if article['id'] not in results]
+    if missing and len(articles) > 1:
+        print(f"  {len(missing)} of {len(articles)} articles missing from batch response, scoring singly")
+    singles = await asyncio.gather(*(score_article(client, limiter, article, usage, model) for article in missing),
+                                   return_exceptions=True)
+    for article, result in zip(missing, singles):
+        if isinstance(result, Exception):
+            print(f"  Error scoring article {article['id']}: {result}")
+            errors[article['id']] = result if isinstance(result, ScoringError) else ScoringError(str(result), True)
+        else:
+            results[article['id']] = result
+    return results, errors
+
+async def score_cascade(client: AsyncAnthropic, limiter: RateLimiter, articles: List[Dict],
+                        usage: Optional[UsageTotals] = None,
+                        band: Optional[Tuple[float, float]] = None) -> Dict[int, Dict]:
+    """
+    Score a batch, optionally as a two-tier cascade.
+
+    Returns {article_id: {'final': (model, scores) or None, 'history': [(model, scores), ...]}},
+    with the deciding ScoringError under 'error' when there is no final score.
+    With a band, FAST_MODEL scores first and only articles whose overall score
+    falls inside the band (or that the fast tier failed on) go to MODEL. An
+    escalated article whose second call fails gets no final score, so the next
+    run retries it rather than keeping the fast tier's borderline verdict.
+    """
+    if band is None:
+        results, errors = await score_batch(client, limiter, articles, usage, MODEL)
+        return {
+            article['id']: {
+                'final': (MODEL, results[article['id']]) if article['id'] in results else None,
+                'history': [(MODEL, results[article['id']])] if article['id'] in results else [],
+                'error': errors.get(article['id'])
+            }
+            for article in articles
+        }
+
+    fast, fast_errors = await score_batch(client, limiter, articles, usage, FAST_MODEL)
+    outcomes = {}
+    escalate = []
+    for article in articles:
+        scores = fast.get(article['id'])
+        outcomes[article['id']] = {
+            'final': (FAST_MODEL, scores) if scores else None,
+            'history': [(FAST_MODEL, scores)] if scores else [],
+            'error': fast_errors.get(article['id'])
+        }
+        if not scores or band[0] <= scores['overall_score'] <= band[1]:
+            escalate.append(article)
+
+    if escalate:
+        strong, strong_errors = await score_batch(client, limiter, escalate, usage, MODEL)
+        for article in escalate:
+            scores = strong.get(article['id'])
+            outcome = outcomes[article['id']]
+            outcome['escalated'] = True
+            outcome['final'] = (MODEL, scores) if scores else None
+            outcome['error'] = strong_errors.get(article['id'])
+            if scores:
+                outcome['history'].append((MODEL, scores))
 
-    except Exception as e:
-        print(f"  Error scoring article: {e}")
-        return None
+    return outcomes
 
-def store_score(conn, article_id: int, scores: Dict) -> bool:
-    """Store article scores in database."""
+def store_score_history(conn, article_id: int, model: str, scores: Dict) -> None:
+    """Record one model's scores for an article (the caller commits)."""
     cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            INSERT INTO article_scores
-            (article_id, relevance_score, quality_score, novelty_score, overall_score, reasoning, ai_model)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (
+    cursor.execute("""
+        INSERT INTO article_score_history
+        (article_id, ai_model, prompt_version, relevance_score, quality_score,
+         novelty_score, overall_score, reasoning)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (article_id, ai_model, prompt_version) DO UPDATE SET
+            relevance_score = EXCLUDED.relevance_score,
+            quality_score = EXCLUDED.quality_score,
+            novelty_score = EXCLUDED.novelty_score,
+            overall_score = EXCLUDED.overall_score,
+            reasoning = EXCLUDED.reasoning,
+            scored_at = CURRENT_TIMESTAMP
+    """, (
+        article_id, model, PROMPT_VERSION,
+        scores['relevance_score'], scores['quality_score'],
+        scores['novelty_score'], scores['overall_score'], scores['reasoning']
+    ))
+    cursor.close()
+
+def upsert_scores(conn, rows: List[Tuple[int, Dict, str]]) -> None:
+    """
+    Write (article_id, scores, model) rows with one multi-row upsert (the caller commits).
+
+    A re-scored article has its row updated in place. Article ids must be unique within `rows`.
+    """
+    params = []
+    for article_id, scores, model in rows:
+        params.extend((
             article_id,
             scores['relevance_score'],
             scores['quality_score'],
             scores['novelty_score'],
             scores['overall_score'],
             scores['reasoning'],
-            MODEL
+            model,
+            PROMPT_VERSION
         ))
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        INSERT INTO article_scores
+        (article_id, relevance_score, quality_score, novelty_score, overall_score, reasoning,
+         ai_model, prompt_version)
+        VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s)'] * len(rows))}
+        ON CONFLICT (article_id) DO UPDATE SET
+            relevance_score = EXCLUDED.relevance_score,
+            quality_score = EXCLUDED.quality_score,
+            novelty_score = EXCLUDED.novelty_score,
+            overall_score = EXCLUDED.overall_score,
+            reasoning = EXCLUDED.reasoning,
+            ai_model = EXCLUDED.ai_model,
+            prompt_version = EXCLUDED.prompt_version,
+            scored_at = CURRENT_TIMESTAMP
+    """, params)
+    cursor.close()
+
+def store_score(conn, article_id: int, scores: Dict, model: str = MODEL) -> bool:
+    """Store article scores in database."""
+    try:
+        upsert_scores(conn, [(article_id, scores, model)])
         conn.commit()
-        cursor.close()
         return True
     except Exception as e:
         print(f"  Error storing score: {e}")
         conn.rollback()
-        cursor.close()
         return False
 
-def main():
+class ScoreWriter:
+    """
+    Buffer scores and persist them with one upsert and one commit per flush.
+
+    Flushes once `max_rows` scores are buffered or the oldest has waited
+    `max_seconds`. Leased articles leave the scoring queue, and their per-model
+    history rows are written, in the same transaction as their scores, so a
+    crash or a failed flush loses neither.
+    """
+
+    def __init__(self, conn, max_rows: int = SCORE_FLUSH_ROWS, max_seconds: float = SCORE_FLUSH_SECONDS):
+        self.conn = conn
+        self.max_rows = max(max_rows, 1)
+        self.max_seconds = max_seconds
+        self.pending: Dict[int, Tuple[Dict, str, List[Tuple[str, Dict]]]] = {}
+        self.oldest = 0.0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def add(self, article_id: int, scores: Dict, model: str,
+            history: Optional[List[Tuple[str, Dict]]] = None) -> None:
+        """Buffer an article's final scores and the (model, scores) history behind them."""
+        if not self.pending:
+            self.oldest = time.monotonic()
+        self.pending[article_id] = (scores, model, history or [])
+        if len(self.pending) >= self.max_rows:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        if self.pending and time.monotonic() - self.oldest >= self.max_seconds:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every buffered score; returns how many were stored."""
+        if not self.pending:
+            return 0
+        pending = self.pending
+        rows = [(article_id, scores, model) for article_id, (scores, model, _) in pending.items()]
+        self.pending = {}
+        self.flushes += 1
+
+        def write_history(article_id):
+            for model, scores in pending[article_id][2]:
+                store_score_history(self.conn, article_id, model, scores)
+
+        try:
+            upsert_scores(self.conn, rows)
+            for row in rows:
+                write_history(row[0])
+            queue_complete(self.conn, [row[0] for row in rows])
+            self.conn.commit()
+            self.written += len(rows)
+            return len(rows)
+        except Exception as e:
+            print(f"  Error storing {len(rows)} scores ({e}), retrying one at a time")
+            self.conn.rollback()
+
+        # One bad row (e.g. an article deleted mid-run) shouldn't lose the rest
+        written = 0
+        for row in rows:
+            try:
+                upsert_scores(self.conn, [row])
+                write_history(row[0])
+                queue_complete(self.conn, [row[0]])
+                self.conn.commit()
+                written += 1
+            except Exception as e:
+                print(f"  Error storing score for article {row[0]}: {e}")
+                self.conn.rollback()
+                self.failed += 1
+        self.written += written
+        return written
+
+def running_backfills(conn) -> int:
+    """Number of backfill runs (backfill.py) that are unfinished and recently checkpointed."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM backfill_runs
+        WHERE finished_at IS NULL AND updated_at > NOW() - make_interval(mins => %s)
+    """, (BACKFILL_ACTIVE_MINUTES,))
+    running = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    return running
+
+def live_rate_limits(conn, rpm: Optional[float], tpm: Optional[float]) -> Tuple[float, float]:
+    """
+    Requests and tokens per minute for live scoring.
+
+    Backfills and the live curator draw on the same API limits. Unless set
+    explicitly, the live limits are the API limits less BACKFILL_RATE_SHARE
+    for each running backfill (checked once, at start).
+    """
+    share = 1.0
+    if rpm is None or tpm is None:
+        running = running_backfills(conn)
+        if running:
+            share = max(1.0 - running * BACKFILL_RATE_SHARE, BACKFILL_RATE_SHARE)
+            print(f"{running} backfill run(s) in progress; live scoring takes {share:.0%} of the API limits")
+    return (rpm if rpm is not None else REQUESTS_PER_MINUTE * share,
+            tpm if tpm is not None else TOKENS_PER_MINUTE * share)
+
+def inherit_duplicate_scores(conn) -> int:
+    """Copy each canonical article's score onto its unscored near-duplicates."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO article_scores
+        (article_id, relevance_score, quality_score, novelty_score, overall_score, reasoning,
+         ai_model, prompt_version)
+        SELECT d.id, s.relevance_score, s.quality_score, s.novelty_score, s.overall_score,
+               s.reasoning, s.ai_model, s.prompt_version
+        FROM articles d
+        JOIN article_scores s ON s.article_id = d.canonical_id
+        LEFT JOIN article_scores existing ON existing.article_id = d.id
+        WHERE existing.id IS NULL
+        ON CONFLICT (article_id) DO NOTHING
+    """)
+    inherited = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    return inherited
+
+async def score_articles(conn, articles: List[Dict], concurrency: int,
+                         limiter: RateLimiter, batch_size: int = BATCH_SIZE,
+                         usage: Optional[UsageTotals] = None,
+                         cache: Optional[ScoreCache] = None,
+                         prefilter: Optional[Prefilter] = None,
+                         prefilter_confidence: float = PREFILTER_CONFIDENCE,
+                         cascade_band: Optional[Tuple[float, float]] = None,
+                         writer: Optional[ScoreWriter] = None,
+                         novelty_index: Optional[NoveltyIndex] = None,
+                         novelty_window_days: float = NOVELTY_WINDOW_DAYS,
+                         client: Optional[AsyncAnthropic] = None) -> Dict[str, int]:
+    """
+    Score articles concurrently in batches, buffering results into batched writes.
+
+    Articles whose content is already in the score cache, or that the local
+    pre-filter confidently rejects, are stored without an API call. With a
+    novelty index, stored novelty (and overall) scores blend in similarity to
+    recent and already-sent coverage; history and cache keep the raw model
+    scores. Permanent failures are dead-lettered; transient ones go back on
+    the queue. Returns counts of scored, high-quality, pre-filtered, escalated
+    and dead-lettered articles. Without a `client`, one is opened for this call
+    and closed before it returns.
+    """
+    writer = writer or ScoreWriter(conn)
+    counts = {'scored': 0, 'high_quality': 0, 'rejected': 0, 'escalated': 0, 'dead_lettered': 0}
+    done = 0
+    local = {}
+    if novelty_index is not None:
+        local = local_novelty(conn, novelty_index, articles, novelty_window_days)
+
+    def record(article: Dict, outcome: Optional[Dict], cached: bool = False) -> None:
+        nonlocal done
+        done += 1
+        print(f"[{done}/{len(articles)}] {'Cached' if cached else 'Scored'}: {article['title'][:60]}...")
+        if not outcome:
+            queue_fail(conn, article['id'], 'scoring failed')
+            return
+        if outcome.get('escalated'):
+            counts['escalated'] += 1
+        if not outcome['final']:
+            # Committed by queue_fail below; scored articles write history with their flush
+            for model, scores in outcome['history']:
+                store_score_history(conn, article['id'], model, scores)
+            error = outcome.get('error') or ScoringError('scoring failed', True)
+            if error.transient:
+                queue_fail(conn, article['id'], str(error))
+            else:
+                # Out of the queue for good, so later runs spend their budget elsewhere
+                model = MODEL if outcome.get('escalated') or not cascade_band else FAST_MODEL
+                dead_letter(conn, article['id'], model, PROMPT_VERSION, str(error), error.raw_response)
+                queue_fail(conn, article['id'], str(error), max_attempts=0)
+                counts['dead_lettered'] += 1
+            return
+
+        model, scores = outcome['final']
+        if cache and not cached:
+            cache.store(article['cache_key'], dict(scores, ai_model=model))
+        scores = blend_novelty(scores, local.get(article['id']))
+        writer.add(article['id'], scores, model, outcome['history'])
+        counts['scored'] += 1
+        if scores['overall_score'] >= 0.70:
+            counts['high_quality'] += 1
+            print(f"  ⭐ Score: {scores['overall_score']:.2f} - {scores['reasoning'][:80]}... ({model})")
+        else:
+            print(f"  Score: {scores['overall_score']:.2f} ({model})")
+
+    if cache:
+        for article in articles:
+            article['cache_key'] = cache.key(article['title'], article['description'][:500]
+                                             if article['description'] else None, article['source_name'])
+        cached_scores = cache.lookup(article['cache_key'] for article in articles)
+        for article in articles:
+            scores = cached_scores.get(article['cache_key'])
+            if scores:
+                record(article, {'final': (scores.pop('ai_model'), scores), 'history': []}, cached=True)
+        articles_to_score = [article for article in articles if article['cache_key'] not in cached_scores]
+    else:
+        articles_to_score = articles
+
+    if prefilter and articles_to_score:
+        relevant_probability = prefilter.predict([article_text(article) for article in articles_to_score])
+        remaining = []
+        for article, probability in zip(articles_to_score, relevant_probability):
+            if probability > 1 - prefilter_confidence:
+                remaining.append(article)
+                continue
+            done += 1
+            print(f"[{done}/{len(articles)}] Pre-filtered: {article['title'][:60]}... (P(relevant) = {probability:.3f})")
+            writer.add(article['id'], rejection_scores(probability), PREFILTER_MODEL)
+            counts['rejected'] += 1
+        articles_to_score = remaining
+
+    own_client = client is None
+    if own_client:
+        client = async_client(ANTHROPIC_API_KEY)
+
+    async def worker(batch):
+        return await score_cascade(client, limiter, batch, usage, cascade_band)
+
+    batch_size = max(batch_size, 1)
+    batches = [articles_to_score[i:i + batch_size] for i in range(0, len(articles_to_score), batch_size)]
+
+    async def flush_periodically():
+        # Scores arriving slowly still reach the database within max_seconds
+        while True:
+            await asyncio.sleep(writer.max_seconds)
+            writer.flush_if_due()
+            if usage is not None and usage.log is not None:
+                usage.log.flush(conn)
+
+    flusher = asyncio.create_task(flush_periodically())
+    try:
+        async for batch, outcomes in run_concurrently(batches, worker, concurrency):
+            for article in batch:
+                record(article, outcomes.get(article['id']) if isinstance(outcomes, dict) else None)
+    finally:
+        flusher.cancel()
+        try:
+            writer.flush()
+            if usage is not None and usage.log is not None:
+                usage.log.flush(conn)
+        finally:
+            if own_client:
+                await client.close()
+
+    return counts
+
+async def follow(conn, args: argparse.Namespace, limiter: RateLimiter, usage: UsageTotals,
+                 cache: Optional[ScoreCache], prefilter: Optional[Prefilter],
+                 cascade_band: Optional[Tuple[float, float]], writer: ScoreWriter,
+                 novelty_index: Optional[NoveltyIndex], totals: Dict[str, int]) -> None:
+    """
+    Score articles as they are queued, until cancelled.
+
+    LISTENs for enqueue notifications and leases micro-batches of up to
+    --limit articles. A micro-batch is cut down to the requests the rate
+    limiter can afford right now, so while the limit is saturated articles
+    stay queued, where other workers can lease them, instead of sitting on
+    this worker's leases. One API client serves every micro-batch. Counts
+    accumulate into `totals`.
+    """
+    owner = worker_id()
+    batch_size = max(args.batch_size, 1)
+    request_tokens = estimate_tokens(build_request(
+        {'title': '', 'source_name': '', 'pub_date': None, 'description': ''}
+    )) + BATCH_TOKENS_PER_ARTICLE * (batch_size - 1)
+
+    listener = await psycopg.AsyncConnection.connect(**DB_CONFIG, autocommit=True)
+    client = async_client(ANTHROPIC_API_KEY)
+    try:
+        await listener.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        print(f"Listening on '{NOTIFY_CHANNEL}' as {owner}. Press Ctrl+C to stop.\n")
+        while True:
+            # Drain the queue one micro-batch at a time
+            while True:
+                requests, wait = limiter.capacity(request_tokens)
+                if not requests:
+                    print(f"Rate limit saturated, waiting {wait:.1f}s before leasing more")
+                    await asyncio.sleep(wait)
+                    continue
+                limit = min(args.limit, requests * batch_size)
+                articles = get_leased_articles(conn, lease(conn, limit, owner, args.lease_seconds))
+                if not articles:
+                    break
+                totals['processed'] += len(articles)
+                counts = await score_articles(conn, articles, args.concurrency, limiter, batch_size, usage,
+                                              cache, prefilter, args.prefilter_confidence, cascade_band, writer,
+                                              novelty_index, args.novelty_window_days, client)
+                for key, value in counts.items():
+                    totals[key] = totals.get(key, 0) + value
+                totals['inherited'] += inherit_duplicate_scores(conn)
+                print(f"[{datetime.now()}] Micro-batch of {len(articles)}: {counts['scored']} scored, "
+                      f"{counts['rejected']} pre-filtered, {counts['dead_lettered']} dead-lettered\n")
+
+            # Sleep until something is queued, then let the rest of the burst land
+            arrived = 0
+            async for _ in listener.notifies(timeout=FOLLOW_IDLE_POLL, stop_after=1):
+                arrived += 1
+            if arrived:
+                async for _ in listener.notifies(timeout=FOLLOW_BATCH_WINDOW, stop_after=max(limit - 1, 1)):
+                    arrived += 1
+    finally:
+        await client.close()
+        await listener.close()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Score unscored articles with Claude.')
+    parser.add_argument('--limit', type=int, default=10,
+                        help='Maximum articles to lease from the scoring queue in this run')
+    parser.add_argument('--follow', action='store_true',
+                        help='Keep running, scoring articles in micro-batches as the RSS monitor queues them')
+    parser.add_argument('--lease-seconds', type=int, default=LEASE_SECONDS,
+                        help='How long leased articles stay reserved for this worker')
+    parser.add_argument('--enqueue-backlog', action='store_true',
+                        help='Queue every unscored article first (once, after upgrading)')
+    parser.add_argument('--concurrency', type=int, default=SCORING_CONCURRENCY,
+                        help='Maximum scoring requests in flight')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help='Articles scored per request (1 = one request per article)')
+    parser.add_argument('--flush-rows', type=int, default=SCORE_FLUSH_ROWS,
+                        help='Buffered scores written per database upsert')
+    parser.add_argument('--flush-seconds', type=float, default=SCORE_FLUSH_SECONDS,
+                        help='Longest a buffered score waits before being written')
+    parser.add_argument('--cache-ttl-days', type=float, default=SCORE_CACHE_TTL_DAYS,
+                        help='Reuse cached scores for identical content scored within this many days')
+    parser.add_argument('--prefilter-confidence', type=float, default=PREFILTER_CONFIDENCE,
+                        help='P(off-topic) at which the local pre-filter rejects without calling Claude')
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help='Send every article to Claude even if a pre-filter model is trained')
+    parser.add_argument('--novelty-window-days', type=float, default=NOVELTY_WINDOW_DAYS,
+                        help='Recent coverage the local novelty signal compares against')
+    parser.add_argument('--no-novelty', action='store_true',
+                        help='Store the model novelty score as-is, without the local novelty index')
+    parser.add_argument('--cascade', action='store_true',
+                        help=f'Score with {FAST_MODEL} first and escalate borderline articles to {MODEL}')
+    parser.add_argument('--band', type=float, nargs=2, default=CASCADE_BAND, metavar=('LOW', 'HIGH'),
+                        help='Fast-tier overall scores escalated in cascade mode')
+    parser.add_argument('--rpm', type=float,
+                        help=f'Requests per minute (default {REQUESTS_PER_MINUTE}, less the share of running backfills)')
+    parser.add_argument('--tpm', type=float,
+                        help=f'Tokens per minute (default {TOKENS_PER_MINUTE}, less the share of running backfills)')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function."""
+    args = parse_args(argv)
     print(f"AI Curator started at {datetime.now()}")
     print("="*60)
 
@@ -170,56 +796,91 @@ def main():
         return 1
 
     try:
-        # Initialize Claude client
-        print("Initializing Claude API...")
-        client = Anthropic(api_key=ANTHROPIC_API_KEY)
-        print("Connected!\n")
-
         # Connect to database
         print("Connecting to database...")
         conn = psycopg.connect(**DB_CONFIG)
         print("Connected!\n")
 
-        # Get unscored articles
-        print("Fetching unscored articles...")
-        articles = get_unscored_articles(conn, limit=10)
-        print(f"Found {len(articles)} articles to score\n")
-
-        if not articles:
-            print("No articles to score. Exiting.")
-            conn.close()
-            return 0
-
-        # Score articles
-        scored_count = 0
-        high_quality_count = 0
+        if args.enqueue_backlog:
+            print(f"Queued {enqueue_backlog(conn)} unscored articles from the backlog")
 
-        for i, article in enumerate(articles, 1):
-            print(f"[{i}/{len(articles)}] Scoring: {article['title'][:60]}...")
+        # Lease articles from the scoring queue
+        if not args.follow:
+            owner = worker_id()
+            print(f"Leasing up to {args.limit} articles as {owner}...")
+            articles = get_leased_articles(conn, lease(conn, args.limit, owner, args.lease_seconds))
+            print(f"Leased {len(articles)} articles to score\n")
 
-            scores = score_article(client, article)
-            if scores:
-                if store_score(conn, article['id'], scores):
-                    scored_count += 1
-                    if scores['overall_score'] >= 0.70:
-                        high_quality_count += 1
-                        print(f"  ⭐ Score: {scores['overall_score']:.2f} - {scores['reasoning'][:80]}...")
-                    else:
-                        print(f"  Score: {scores['overall_score']:.2f}")
-
-            # Rate limiting pause
-            if i < len(articles):
-                import time
-                time.sleep(1)
+            if not articles:
+                inherited_count = inherit_duplicate_scores(conn)
+                print(f"No articles to score ({inherited_count} scores inherited by near-duplicates). Exiting.")
+                conn.close()
+                return 0
 
+        # Score articles
+        args.rpm, args.tpm = live_rate_limits(conn, args.rpm, args.tpm)
+        print(f"Scoring in batches of {args.batch_size} with up to {args.concurrency} concurrent requests "
+              f"({args.rpm:.0f} req/min, {args.tpm:.0f} tokens/min)...")
+        limiter = RateLimiter(args.rpm, args.tpm)
+        usage = UsageTotals(CallLog(new_run_id(), PROMPT_VERSION))
+        cascade_band = tuple(args.band) if args.cascade else None
+        if cascade_band:
+            print(f"Cascade: {FAST_MODEL} first, escalating overall scores "
+                  f"{cascade_band[0]:.2f}-{cascade_band[1]:.2f} to {MODEL}")
+        # Cached scores are only valid for the same model setup
+        cache_model = f"{FAST_MODEL}>{MODEL}@{cascade_band[0]:.2f}-{cascade_band[1]:.2f}" if cascade_band else MODEL
+        cache = ScoreCache(conn, cache_model, PROMPT_VERSION, args.cache_ttl_days)
+        evicted_count = cache.evict()
+        prefilter = None if args.no_prefilter else Prefilter.load()
+        if prefilter:
+            print(f"Pre-filter model trained {prefilter.trained_at} on {prefilter.examples} articles")
+        novelty_index = None if args.no_novelty else NoveltyIndex()
+        if novelty_index is not None:
+            print(f"Novelty index: {len(novelty_index)} articles, comparing against the last "
+                  f"{args.novelty_window_days:g} days and everything sent")
+        writer = ScoreWriter(conn, args.flush_rows, args.flush_seconds)
+        if args.follow:
+            counts = {'processed': 0, 'inherited': 0, 'scored': 0, 'high_quality': 0,
+                      'rejected': 0, 'escalated': 0, 'dead_lettered': 0}
+            try:
+                asyncio.run(follow(conn, args, limiter, usage, cache, prefilter, cascade_band, writer,
+                                   novelty_index, counts))
+            except KeyboardInterrupt:
+                print("\nStopped following the scoring queue")
+            processed = counts['processed']
+            inherited_count = counts['inherited']
+        else:
+            counts = asyncio.run(
+                score_articles(conn, articles, args.concurrency, limiter, args.batch_size, usage, cache,
+                               prefilter, args.prefilter_confidence, cascade_band, writer,
+                               novelty_index, args.novelty_window_days)
+            )
+            processed = len(articles)
+            inherited_count = inherit_duplicate_scores(conn)
+
+        queue = queue_counts(conn)
         conn.close()
 
         # Summary
         print("\n" + "="*60)
         print(f"Summary:")
-        print(f"  Articles processed: {len(articles)}")
-        print(f"  Successfully scored: {scored_count}")
-        print(f"  High-quality articles (≥0.70): {high_quality_count}")
+        print(f"  Articles processed: {processed}")
+        print(f"  Scores inherited by near-duplicates: {inherited_count}")
+        print(f"  Successfully scored: {counts['scored']}")
+        print(f"  Rejected by local pre-filter: {counts['rejected']}")
+        if cascade_band:
+            print(f"  Escalated to {MODEL}: {counts['escalated']}")
+        print(f"  High-quality articles (≥0.70): {counts['high_quality']}")
+        print(f"  Dead-lettered (permanent failures): {counts['dead_lettered']}")
+        print(f"  Score writes: {writer.written} rows in {writer.flushes} flushes"
+              + (f", {writer.failed} failed" if writer.failed else ""))
+        print(f"  Queue: {queue.get('pending', 0)} pending, {queue.get('leased', 0)} leased, "
+              f"{queue.get('dead', 0)} dead")
+        print(f"  Score cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate():.0%} hit rate), "
+              f"{evicted_count} expired entries evicted")
+        print(f"  API calls: {usage.calls} ({usage.input_tokens} input, {usage.output_tokens} output tokens)")
+        print(f"  Logged {usage.log.calls} attempts to scoring_calls as run {usage.log.run_id}, "
+              f"estimated cost ${usage.log.cost:.4f}")
         print(f"Completed at {datetime.now()}")
 
         return 0
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Bulk re-scoring for the AI Ethics Newsletter curator
+Re-scores a slice of already-scored articles under the current PROMPT_VERSION
+(and a chosen model) into article_score_history, next to the older versions.
+Progress is checkpointed in backfill_runs so an interrupted run resumes where it
+stopped; articles that fail are retried once the slice has been paged through.
+The run is throttled to BACKFILL_RATE_SHARE of the API limits, and a live
+curator started while it runs takes only the rest.
+
+Usage:
+    python3 scripts/backfill.py run --name rubric-v2 --since 2025-01-01 --min-score 0.5
+    python3 scripts/backfill.py status
+    python3 scripts/backfill.py compare --old unversioned --new rubric-v2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import psycopg
+
+from ai_curator import (ANTHROPIC_API_KEY, BATCH_SIZE, DB_CONFIG, MODEL, PROMPT_VERSION,
+                        score_batch, store_score_history, upsert_scores)
+from call_log import CallLog
+from novelty import NOVELTY_WINDOW_DAYS, NoveltyIndex, blend_novelty, local_novelty
+from prefilter import PREFILTER_MODEL
+from scoring_engine import (BACKFILL_RATE_SHARE, REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE, RateLimiter,
+                            UsageTotals, async_client, run_concurrently)
+
+BACKFILL_CONCURRENCY = 2        # Requests in flight; live scoring defaults to 8
+PAGE_SIZE = 50                  # Articles scored between checkpoints
+ACCEPT_THRESHOLD = 0.70
+
+def start_run(conn, name: str, model: str, filters: Dict) -> Dict:
+    """Create the named run, or load it to resume; the slice and versions must match."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO backfill_runs (name, ai_model, prompt_version, filters)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (name) DO NOTHING
+    """, (name, model, PROMPT_VERSION, json.dumps(filters)))
+    cursor.execute("""
+        SELECT ai_model, prompt_version, filters, last_article_id, scored, failed, retrying, finished_at
+        FROM backfill_runs WHERE name = %s
+    """, (name,))
+    row = cursor.fetchone()
+    conn.commit()
+    cursor.close()
+
+    run = dict(zip(('ai_model', 'prompt_version', 'filters', 'last_article_id', 'scored', 'failed',
+                    'retrying', 'finished_at'), row))
+    if (run['ai_model'], run['prompt_version'], run['filters']) != (model, PROMPT_VERSION, filters):
+        raise ValueError(f"backfill '{name}' was started for {run['ai_model']} / {run['prompt_version']} "
+                         f"with {run['filters']}; pick a new --name for a different slice")
+    return run
+
+def save_checkpoint(conn, name: str, last_article_id: int, scored: int, failed: int,
+                    finished: bool = False, retrying: bool = False) -> None:
+    """
+    Advance the run's checkpoint (commits, together with the page's scores).
+
+    `retrying` records that the checkpoint belongs to the sweep over failed
+    articles, so a run resumed mid-sweep carries on with the sweep.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE backfill_runs
+        SET last_article_id = %s, scored = scored + %s, failed = failed + %s, retrying = %s,
+            updated_at = NOW(), finished_at = CASE WHEN %s THEN NOW() ELSE NULL END
+        WHERE name = %s
+    """, (last_article_id, scored, failed, retrying, finished, name))
+    conn.commit()
+    cursor.close()
+
+def next_page(conn, after_id: int, model: str, filters: Dict, page_size: int = PAGE_SIZE) -> List[Dict]:
+    """
+    Next scored articles in the slice, by id, without a score for this model and prompt version.
+
+    Pre-filter rejections are skipped unless the slice asks for them.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT a.id, a.title, a.source_name, a.pub_date, a.description, a.link, a.fetched_at
+        FROM articles a
+        JOIN article_scores s ON s.article_id = a.id
+        WHERE a.id > %(after)s
+          AND a.canonical_id IS NULL
+          AND (%(since)s::timestamp IS NULL OR COALESCE(a.pub_date, a.fetched_at) >= %(since)s::timestamp)
+          AND (%(until)s::timestamp IS NULL OR COALESCE(a.pub_date, a.fetched_at) < %(until)s::timestamp)
+          AND (%(source)s::text IS NULL OR a.source_name = %(source)s)
+          AND (%(min_score)s::numeric IS NULL OR s.overall_score >= %(min_score)s)
+          AND (%(max_score)s::numeric IS NULL OR s.overall_score <= %(max_score)s)
+          AND (%(include_prefiltered)s OR s.ai_model IS DISTINCT FROM %(prefilter_model)s)
+          AND NOT EXISTS (
+              SELECT 1 FROM article_score_history h
+              WHERE h.article_id = a.id AND h.ai_model = %(model)s AND h.prompt_version = %(version)s
+          )
+        ORDER BY a.id
+        LIMIT %(limit)s
+    """, dict(filters, after=after_id, model=model, version=PROMPT_VERSION,
+              prefilter_model=PREFILTER_MODEL, limit=page_size))
+
+    articles = [
+        dict(zip(('id', 'title', 'source_name', 'pub_date', 'description', 'link', 'fetched_at'), row))
+        for row in cursor.fetchall()
+    ]
+    cursor.close()
+    return articles
+
+def preserve_live_scores(conn, article_ids: List[int]) -> None:
+    """Copy the current live scores into history before they are replaced (the caller commits)."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO article_score_history
+        (article_id, ai_model, prompt_version, relevance_score, quality_score,
+         novelty_score, overall_score, reasoning, scored_at)
+        SELECT article_id, COALESCE(ai_model, 'unknown'), COALESCE(prompt_version, 'unversioned'),
+               relevance_score, quality_score, novelty_score, overall_score, reasoning, scored_at
+        FROM article_scores
+        WHERE article_id = ANY(%s)
+        ON CONFLICT (article_id, ai_model, prompt_version) DO NOTHING
+    """, (article_ids,))
+    cursor.close()
+
+async def backfill(conn, name: str, model: str, filters: Dict, limiter: RateLimiter, usage: UsageTotals,
+                   concurrency: int = BACKFILL_CONCURRENCY, batch_size: int = BATCH_SIZE,
+                   page_size: int = PAGE_SIZE, limit: Optional[int] = None, promote: bool = False,
+                   novelty_index: Optional[NoveltyIndex] = None) -> Dict:
+    """
+    Re-score the slice page by page, checkpointing after each page.
+
+    New scores go to article_score_history, next to a snapshot of the live
+    score they are compared with. With `promote`, they also replace the live
+    article_scores rows; as in live scoring, the promoted novelty (and overall)
+    scores blend in the local novelty signal when a `novelty_index` is given,
+    while history keeps the raw model scores. Articles that failed stay without a history row, so
+    once the end of the slice is reached one more sweep from the start picks
+    them up; those still failing are left counted as failed.
+    """
+    run = start_run(conn, name, model, filters)
+    if run['finished_at']:
+        print(f"Backfill '{name}' already finished ({run['scored']} scored, {run['failed']} failed)")
+        return run
+    if run['retrying']:
+        print(f"Resuming the retry of {run['failed']} failed articles in '{name}' "
+              f"after article {run['last_article_id']}")
+    elif run['last_article_id']:
+        print(f"Resuming '{name}' after article {run['last_article_id']} ({run['scored']} scored so far)")
+
+    client = async_client(ANTHROPIC_API_KEY)
+    last_id = run['last_article_id']
+    totals = {'scored': 0, 'failed': 0, 'recovered': 0}
+    retrying = run['retrying']
+    batch_size = max(batch_size, 1)
+
+    async def worker(batch):
+        return await score_batch(client, limiter, batch, usage, model)
+
+    try:
+        while limit is None or totals['scored'] + totals['failed'] < limit:
+            size = page_size if limit is None else min(page_size, limit - totals['scored'] - totals['failed'])
+            articles = next_page(conn, last_id, model, filters, size)
+            if not articles:
+                outstanding = run['failed'] + totals['failed'] - totals['recovered']
+                if outstanding > 0 and not retrying:
+                    print(f"Reached the end of the slice; retrying {outstanding} failed articles")
+                    retrying, last_id = True, 0
+                    save_checkpoint(conn, name, last_id, 0, 0, retrying=True)
+                    continue
+                save_checkpoint(conn, name, last_id, 0, 0, finished=True, retrying=retrying)
+                print(f"Backfill '{name}' complete" + (f" ({outstanding} failed)" if outstanding else ""))
+                break
+
+            batches = [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
+            scored = {}
+            async for batch, result in run_concurrently(batches, worker, concurrency):
+                if not isinstance(result, Exception):
+                    scored.update(result[0])
+
+            if scored:
+                preserve_live_scores(conn, list(scored))
+            if promote and scored:
+                local = {}
+                if novelty_index is not None:
+                    promoted = [article for article in articles if article['id'] in scored]
+                    as_of = max((article['fetched_at'] for article in promoted if article['fetched_at']),
+                                default=None)
+                    local = local_novelty(conn, novelty_index, promoted, NOVELTY_WINDOW_DAYS, as_of)
+                upsert_scores(conn, [(article_id, blend_novelty(scores, local.get(article_id)), model)
+                                     for article_id, scores in scored.items()])
+            for article_id, scores in scored.items():
+                store_score_history(conn, article_id, model, scores)
+
+            last_id = articles[-1]['id']
+            if retrying:
+                # Everything in this sweep was already counted as failed
+                failed = 0
+                totals['recovered'] += len(scored)
+                save_checkpoint(conn, name, last_id, len(scored), -len(scored), retrying=True)
+            else:
+                failed = len(articles) - len(scored)
+                save_checkpoint(conn, name, last_id, len(scored), failed)
+            if usage.log is not None:
+                usage.log.flush(conn)
+            totals['scored'] += len(scored)
+            totals['failed'] += failed
+            print(f"[{datetime.now()}] Checkpoint at article {last_id}: {len(scored)} scored, {failed} failed "
+                  f"({totals['scored']} scored this session)")
+    finally:
+        await client.close()
+
+    return totals
+
+def compare_versions(conn, old_version: str, new_version: str, model: Optional[str] = None) -> Dict:
+    """How overall scores moved between two prompt versions on articles scored under both."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*),
+               AVG(o.overall_score), AVG(n.overall_score),
+               AVG(ABS(n.overall_score - o.overall_score)),
+               CORR(o.overall_score, n.overall_score),
+               COUNT(*) FILTER (WHERE o.overall_score < %(t)s AND n.overall_score >= %(t)s),
+               COUNT(*) FILTER (WHERE o.overall_score >= %(t)s AND n.overall_score < %(t)s)
+        FROM article_score_history o
+        JOIN article_score_history n ON n.article_id = o.article_id
+        WHERE o.prompt_version = %(old)s
+          AND n.prompt_version = %(new)s
+          AND (%(model)s::text IS NULL OR n.ai_model = %(model)s)
+    """, {'old': old_version, 'new': new_version, 'model': model, 't': ACCEPT_THRESHOLD})
+    row = cursor.fetchone()
+    cursor.close()
+    return dict(zip(('articles', 'old_mean', 'new_mean', 'mean_abs_change', 'correlation',
+                     'newly_accepted', 'newly_rejected'), row))
+
+def print_status(conn) -> None:
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT name, ai_model, prompt_version, filters, last_article_id, scored, failed, retrying,
+               updated_at, finished_at
+        FROM backfill_runs ORDER BY started_at DESC
+    """)
+    rows = cursor.fetchall()
+    cursor.close()
+    if not rows:
+        print("No backfill runs yet.")
+    for name, model, version, filters, last_id, scored, failed, retrying, updated_at, finished_at in rows:
+        if finished_at:
+            state = f"finished {finished_at:%Y-%m-%d %H:%M}"
+        elif retrying:
+            state = f"retrying failed articles, checkpoint at article {last_id}"
+        else:
+            state = f"checkpoint at article {last_id}"
+        print(f"  {name}: {model} / {version}, {scored} scored, {failed} failed, {state}")
+        print(f"    slice: {json.dumps({k: v for k, v in filters.items() if v not in (None, False)})}")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Re-score a slice of articles under the current prompt version.')
+    parser.add_argument('command', choices=('run', 'status', 'compare'))
+    parser.add_argument('--name', help='run: backfill name; rerun with the same name to resume')
+    parser.add_argument('--model', default=MODEL, help='run: model to re-score with')
+    parser.add_argument('--since', type=datetime.fromisoformat, help='run: articles published on or after')
+    parser.add_argument('--until', type=datetime.fromisoformat, help='run: articles published before')
+    parser.add_argument('--source', help='run: only this source_name')
+    parser.add_argument('--min-score', type=float, help='run: current overall score at least this')
+    parser.add_argument('--max-score', type=float, help='run: current overall score at most this')
+    parser.add_argument('--include-prefiltered', action='store_true',
+                        help='run: also re-score articles the local pre-filter rejected')
+    parser.add_argument('--promote', action='store_true',
+                        help='run: make new scores live in article_scores (old ones stay in history)')
+    parser.add_argument('--no-novelty', action='store_true',
+                        help='run: promote the model novelty score as-is, without the local novelty index')
+    parser.add_argument('--limit', type=int, help='run: stop after this many articles this session')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='run: articles per checkpoint')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='run: articles per request')
+    parser.add_argument('--concurrency', type=int, default=BACKFILL_CONCURRENCY, help='run: requests in flight')
+    parser.add_argument('--rpm', type=float, default=REQUESTS_PER_MINUTE * BACKFILL_RATE_SHARE,
+                        help='run: requests per minute for the backfill (default leaves the rest to live scoring)')
+    parser.add_argument('--tpm', type=float, default=TOKENS_PER_MINUTE * BACKFILL_RATE_SHARE,
+                        help='run: tokens per minute for the backfill')
+    parser.add_argument('--old', default='unversioned', help='compare: baseline prompt version')
+    parser.add_argument('--new', default=PROMPT_VERSION, help='compare: re-scored prompt version')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    print(f"Backfill {args.command} started at {datetime.now()}")
+    print("=" * 60)
+    conn = psycopg.connect(**DB_CONFIG)
+
+    if args.command == 'status':
+        print_status(conn)
+        conn.close()
+        return 0
+
+    if args.command == 'compare':
+        stats = compare_versions(conn, args.old, args.new)
+        conn.close()
+        if not stats['articles']:
+            print(f"No articles scored under both {args.old} and {args.new}")
+            return 0
+        print(f"Articles scored under both {args.old} and {args.new}: {stats['articles']}")
+        print(f"  Mean overall: {stats['old_mean']:.3f} -> {stats['new_mean']:.3f} "
+              f"(mean absolute change {stats['mean_abs_change']:.3f})")
+        if stats['correlation'] is not None:
+            print(f"  Correlation: {stats['correlation']:.3f}")
+        print(f"  Crossing {ACCEPT_THRESHOLD:.2f}: {stats['newly_accepted']} newly accepted, "
+              f"{stats['newly_rejected']} newly rejected")
+        return 0
+
+    if not args.name:
+        print("ERROR: run needs --name (reuse it to resume)")
+        return 1
+    if not ANTHROPIC_API_KEY:
+        print("ERROR: ANTHROPIC_API_KEY environment variable not set")
+        return 1
+
+    filters = {
+        'since': args.since.isoformat() if args.since else None,
+        'until': args.until.isoformat() if args.until else None,
+        'source': args.source,
+        'min_score': args.min_score,
+        'max_score': args.max_score,
+        'include_prefiltered': args.include_prefiltered
+    }
+    print(f"Re-scoring with {args.model} under prompt version {PROMPT_VERSION} at up to {args.concurrency} "
+          f"concurrent requests ({args.rpm:.0f} req/min, {args.tpm:.0f} tokens/min)")
+    usage = UsageTotals(CallLog(f"backfill-{args.name}-{datetime.now():%Y%m%dT%H%M%S}", PROMPT_VERSION))
+    try:
+        totals = asyncio.run(backfill(conn, args.name, args.model, filters, RateLimiter(args.rpm, args.tpm),
+                                      usage, args.concurrency, args.batch_size, args.page_size, args.limit,
+                                      args.promote,
+                                      NoveltyIndex() if args.promote and not args.no_novelty else None))
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        conn.close()
+        return 1
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun with --name {args.name} to resume from the last checkpoint")
+        conn.close()
+        return 1
+
+    conn.close()
+    print(f"Session: {totals['scored']} scored ({totals['recovered']} on retry), {totals['failed']} failed, "
+          f"{usage.calls} API calls, estimated cost ${usage.log.cost:.4f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
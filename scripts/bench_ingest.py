@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Ingestion benchmark for the AI Ethics Newsletter RSS monitor
+Serves synthetic RSS/Atom feeds from a local HTTP server and runs the monitor
+against them and a local Postgres, reporting throughput, DB round trips and
+peak memory. Each run executes in its own fresh process, so the peak RSS
+reported for a run is that run's alone.
+
+Example:
+    python3 scripts/bench_ingest.py --dsn postgresql://localhost/bench --setup \
+        --feeds 1000 --entries 100 --latency-ms 50 --failure-rate 0.02 --runs 2
+
+WARNING: --setup truncates the articles and feed tables of the target database.
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import multiprocessing
+import random
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+import psycopg
+import requests
+
+import rss_monitor
+
+WORDS = (
+    'alignment safety model frontier policy governance audit bias fairness risk '
+    'interpretability evaluation oversight regulation transparency privacy robustness '
+    'benchmark compute deployment incident agent red-team disclosure liability '
+    'accountability research lab release paper framework standard dataset'
+).split()
+
+class FeedFixture:
+    """Deterministic synthetic feeds; each advance() publishes new entries."""
+
+    def __init__(self, feeds: int, entries: int, new_per_run: int, atom_ratio: float, seed: int):
+        self.feeds = feeds
+        self.entries = entries
+        self.new_per_run = new_per_run
+        self.atom_ratio = atom_ratio
+        self.seed = seed
+        self.version = 0
+        self._cache: Dict[int, bytes] = {}
+
+    def advance(self) -> None:
+        self.version += 1
+        self._cache.clear()
+
+    def etag(self, feed_no: int) -> str:
+        return f'"{feed_no}-{self.version}"'
+
+    def _entry(self, feed_no: int, item_no: int) -> Dict:
+        rng = random.Random(f'{self.seed}-{feed_no}-{item_no}')
+        words = rng.sample(WORDS, 8)
+        return {
+            'guid': f'urn:bench:{feed_no}:{item_no}',
+            'title': f"{' '.join(words[:5]).title()} #{feed_no}-{item_no}",
+            'link': f'https://bench.example/{feed_no}/{item_no}?utm_source=bench',
+            'description': f"{' '.join(rng.sample(WORDS, 20))} (feed {feed_no}, item {item_no})",
+            'published': datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=item_no)
+        }
+
+    def document(self, feed_no: int) -> bytes:
+        if feed_no not in self._cache:
+            newest = self.entries + self.version * self.new_per_run
+            entries = [self._entry(feed_no, n) for n in range(newest, newest - self.entries, -1)]
+            atom = random.Random(f'{self.seed}-{feed_no}').random() < self.atom_ratio
+            self._cache[feed_no] = (self._atom(feed_no, entries) if atom else self._rss(feed_no, entries)).encode()
+        return self._cache[feed_no]
+
+    def _rss(self, feed_no: int, entries: List[Dict]) -> str:
+        items = ''.join(
+            f"<item><title>{escape(e['title'])}</title><link>{escape(e['link'])}</link>"
+            f"<guid>{e['guid']}</guid><description>{escape(e['description'])}</description>"
+            f"<pubDate>{format_datetime(e['published'])}</pubDate></item>"
+            for e in entries
+        )
+        return (f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+                f'<title>Bench feed {feed_no}</title>{items}</channel></rss>')
+
+    def _atom(self, feed_no: int, entries: List[Dict]) -> str:
+        items = ''.join(
+            f"<entry><id>{e['guid']}</id><title>{escape(e['title'])}</title>"
+            f"<link rel=\"alternate\" href=\"{escape(e['link'])}\"/>"
+            f"<summary>{escape(e['description'])}</summary>"
+            f"<updated>{e['published'].isoformat()}</updated></entry>"
+            for e in entries
+        )
+        return (f'<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f'<title>Bench feed {feed_no}</title>{items}</feed>')
+
+def _serve(fixture: FeedFixture, latency_ms: float, failure_rate: float, hang_rate: float,
+           port_queue: multiprocessing.Queue) -> None:
+    """Run the fixture server (in a child process so it doesn't skew RSS)."""
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            if self.path == '/_advance':
+                fixture.advance()
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            try:
+                feed_no = int(self.path.rsplit('/', 1)[-1].split('.')[0])
+            except ValueError:
+                self.send_error(404)
+                return
+
+            time.sleep(latency_ms / 1000 * random.uniform(0.5, 1.5))
+            roll = random.Random(f'{fixture.seed}-{feed_no}-fail').random()
+            if roll < hang_rate:
+                time.sleep(3600)
+            if roll < hang_rate + failure_rate:
+                self.send_error(500)
+                return
+
+            etag = fixture.etag(feed_no)
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            body = fixture.document(feed_no)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/xml')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    server.daemon_threads = True
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+class CountingCursor:
+    """Cursor proxy counting statements sent to the server."""
+
+    def __init__(self, cursor, counter: Dict[str, int]):
+        self._cursor = cursor
+        self._counter = counter
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+    def execute(self, *args, **kwargs):
+        self._counter['round_trips'] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._counter['round_trips'] += 1
+        return self._cursor.executemany(*args, **kwargs)
+
+    def copy(self, *args, **kwargs):
+        self._counter['round_trips'] += 1
+        return self._cursor.copy(*args, **kwargs)
+
+class CountingConnection:
+    """Connection proxy counting statements, commits and savepoints."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.counter = {'round_trips': 0}
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return CountingCursor(self._conn.cursor(*args, **kwargs), self.counter)
+
+    def execute(self, *args, **kwargs):
+        self.counter['round_trips'] += 1
+        return self._conn.execute(*args, **kwargs)
+
+    def commit(self):
+        self.counter['round_trips'] += 1
+        return self._conn.commit()
+
+    def rollback(self):
+        self.counter['round_trips'] += 1
+        return self._conn.rollback()
+
+    @contextmanager
+    def transaction(self, *args, **kwargs):
+        self.counter['round_trips'] += 1
+        try:
+            with self._conn.transaction(*args, **kwargs) as tx:
+                yield tx
+        finally:
+            self.counter['round_trips'] += 1
+
+def _measure_run(dsn: str, feeds: List[Dict], workers: int, per_host: int, timeout: float,
+                 budget) -> Dict:
+    """Ingest once (in a spawned child process) and report totals, timing and peak RSS."""
+    conn = CountingConnection(psycopg.connect(dsn))
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        totals = rss_monitor.ingest_feeds(conn, feeds, workers, per_host, timeout, budget=budget)
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return {
+        'totals': totals,
+        'elapsed': elapsed,
+        'round_trips': conn.counter['round_trips'],
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+def setup_database(dsn: str) -> None:
+    """Apply the schema and empty the tables the monitor writes to."""
+    schema = (Path(__file__).parent / 'schema.sql').read_text()
+    with psycopg.connect(dsn) as conn:
+        conn.execute(schema)
+        conn.execute("TRUNCATE articles, feed_state, feed_registry RESTART IDENTITY CASCADE")
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark RSS ingestion against local synthetic feeds.')
+    parser.add_argument('--dsn', help='Postgres connection string (default: rss_monitor.DB_CONFIG)')
+    parser.add_argument('--setup', action='store_true', help='Apply schema.sql and TRUNCATE monitor tables first')
+    parser.add_argument('--feeds', type=int, default=1000)
+    parser.add_argument('--entries', type=int, default=100, help='Entries per feed document')
+    parser.add_argument('--new-per-run', type=int, default=2, help='Entries published to each feed between runs')
+    parser.add_argument('--atom-ratio', type=float, default=0.3, help='Fraction of feeds served as Atom')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Mean server response latency')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of feeds answering 500')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='Fraction of feeds that never answer')
+    parser.add_argument('--runs', type=int, default=2, help='Runs (later runs measure steady state)')
+    parser.add_argument('--workers', type=int, default=rss_monitor.MAX_CONCURRENT_FETCHES)
+    parser.add_argument('--per-host', type=int, default=rss_monitor.MAX_CONCURRENT_FETCHES,
+                        help='All fixture feeds share one host, so this defaults to --workers')
+    parser.add_argument('--timeout', type=float, default=rss_monitor.FEED_TIMEOUT)
+    parser.add_argument('--budget', type=float, default=None)
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    dsn = args.dsn or ' '.join(f'{key}={value}' for key, value in rss_monitor.DB_CONFIG.items())
+
+    if args.setup:
+        setup_database(dsn)
+
+    fixture = FeedFixture(args.feeds, args.entries, args.new_per_run, args.atom_ratio, args.seed)
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=_serve, args=(fixture, args.latency_ms, args.failure_rate, args.hang_rate, port_queue),
+        daemon=True
+    )
+    server.start()
+    base_url = f'http://127.0.0.1:{port_queue.get(timeout=10)}'
+
+    feeds = [
+        {'url': f'{base_url}/feed/{n}.xml', 'name': f'Bench feed {n}', 'category': 'bench'}
+        for n in range(args.feeds)
+    ]
+
+    print(f"Benchmark: {args.feeds} feeds x {args.entries} entries, "
+          f"{args.latency_ms:.0f} ms latency, {args.failure_rate:.0%} failures, {args.hang_rate:.0%} hangs")
+    print("=" * 60)
+
+    try:
+        for run in range(1, args.runs + 1):
+            if run > 1:
+                requests.post(f'{base_url}/_advance', timeout=10)
+
+            # ru_maxrss is a process-lifetime maximum, so give every run a fresh
+            # (spawned, not forked) process to keep earlier runs out of its peak
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn')
+            ) as pool:
+                result = pool.submit(_measure_run, dsn, feeds, args.workers, args.per_host,
+                                     args.timeout, args.budget).result()
+            totals, elapsed = result['totals'], result['elapsed']
+
+            print(f"Run {run}: {elapsed:.2f}s")
+            print(f"  Feeds/sec:        {totals['feeds'] / elapsed:,.1f} ({totals['feeds']} completed)")
+            print(f"  Entries/sec:      {totals['articles'] / elapsed:,.1f} ({totals['articles']} new entries parsed)")
+            print(f"  Articles stored:  {totals['stored']} ({totals['duplicates']} near-duplicates linked)")
+            print(f"  DB round trips:   {result['round_trips']}")
+            print(f"  Peak RSS:         {result['peak_rss_mb']:,.1f} MB")
+    finally:
+        server.terminate()
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Per-call token, latency and cost log for the AI Ethics Newsletter curators
+Every Messages API attempt is recorded in scoring_calls with its usage, wall
+latency, model, prompt version and outcome, so concurrency, batching and model
+choice can be tuned against real numbers.
+
+Usage:
+    python3 scripts/call_log.py report                  # last 10 runs plus totals
+    python3 scripts/call_log.py report --since 2025-01-01 --runs 20
+"""
+
+import argparse
+import os
+import socket
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import psycopg
+
+# USD per million tokens: (input, output). Prompt cache writes cost 1.25x input, reads 0.1x.
+MODEL_PRICES = {
+    'claude-sonnet-4-20250514': (3.00, 15.00),
+    'claude-3-5-sonnet-20241022': (3.00, 15.00),
+    'claude-3-5-haiku-20241022': (0.80, 4.00)
+}
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.10
+ACCEPT_THRESHOLD = 0.70     # Overall score at which an article counts as accepted
+
+def new_run_id() -> str:
+    """Identify one curator run across its logged calls."""
+    return f"{datetime.now():%Y%m%dT%H%M%S}-{socket.gethostname()}:{os.getpid()}"
+
+def call_cost(model: str, input_tokens: int, output_tokens: int,
+              cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> Optional[float]:
+    """USD cost of one call, or None for a model without a price entry."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    input_price, output_price = prices
+    return (input_tokens * input_price
+            + cache_write_tokens * input_price * CACHE_WRITE_MULTIPLIER
+            + cache_read_tokens * input_price * CACHE_READ_MULTIPLIER
+            + output_tokens * output_price) / 1_000_000
+
+class CallLog:
+    """Buffer call records for one run and write them to scoring_calls."""
+
+    def __init__(self, run_id: str, prompt_version: str):
+        self.run_id = run_id
+        self.prompt_version = prompt_version
+        self.pending: List[tuple] = []
+        self.calls = 0
+        self.cost = 0.0
+
+    def add(self, model: str, article_ids: Iterable[int], latency_ms: float,
+            outcome: str, message=None) -> None:
+        """Record one API attempt; `message` is the response when there was one."""
+        usage = message.usage if message is not None else None
+        input_tokens = usage.input_tokens if usage else 0
+        output_tokens = usage.output_tokens if usage else 0
+        cache_read = (getattr(usage, 'cache_read_input_tokens', None) or 0) if usage else 0
+        cache_write = (getattr(usage, 'cache_creation_input_tokens', None) or 0) if usage else 0
+        cost = call_cost(model, input_tokens, output_tokens, cache_read, cache_write)
+
+        self.calls += 1
+        self.cost += cost or 0.0
+        self.pending.append((
+            self.run_id, datetime.now(), model, self.prompt_version, list(article_ids),
+            input_tokens, output_tokens, cache_read, cache_write, latency_ms, outcome, cost
+        ))
+
+    def flush(self, conn) -> int:
+        """Write buffered records and commit; returns how many were written."""
+        if not self.pending:
+            return 0
+        rows, self.pending = self.pending, []
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO scoring_calls
+            (run_id, called_at, ai_model, prompt_version, article_ids, input_tokens, output_tokens,
+             cache_read_tokens, cache_write_tokens, latency_ms, outcome, cost_usd)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, rows)
+        conn.commit()
+        cursor.close()
+        return len(rows)
+
+def run_stats(conn, since: Optional[datetime] = None, runs: int = 10) -> List[Dict]:
+    """Per-run latency percentiles, tokens and cost for the most recent runs."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        WITH runs AS (
+            SELECT run_id,
+                   MIN(called_at) AS started_at,
+                   COUNT(*) AS calls,
+                   COUNT(*) FILTER (WHERE outcome <> 'ok') AS failed_calls,
+                   PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY latency_ms) FILTER (WHERE outcome = 'ok') AS p50,
+                   PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY latency_ms) FILTER (WHERE outcome = 'ok') AS p95,
+                   SUM(input_tokens + cache_read_tokens + cache_write_tokens) AS input_tokens,
+                   SUM(output_tokens) AS output_tokens,
+                   SUM(cost_usd) AS cost
+            FROM scoring_calls
+            WHERE %s::timestamp IS NULL OR called_at >= %s
+            GROUP BY run_id
+            ORDER BY started_at DESC
+            LIMIT %s
+        ),
+        run_articles AS (
+            SELECT DISTINCT c.run_id, a.article_id
+            FROM scoring_calls c
+            CROSS JOIN LATERAL UNNEST(c.article_ids) AS a(article_id)
+            WHERE c.run_id IN (SELECT run_id FROM runs)
+              AND c.outcome = 'ok'
+        )
+        SELECT r.run_id, r.started_at, r.calls, r.failed_calls, r.p50, r.p95,
+               r.input_tokens, r.output_tokens, r.cost,
+               COUNT(ra.article_id) AS articles,
+               COUNT(s.id) FILTER (WHERE s.overall_score >= %s) AS accepted
+        FROM runs r
+        LEFT JOIN run_articles ra ON ra.run_id = r.run_id
+        LEFT JOIN article_scores s ON s.article_id = ra.article_id
+        GROUP BY r.run_id, r.started_at, r.calls, r.failed_calls, r.p50, r.p95,
+                 r.input_tokens, r.output_tokens, r.cost
+        ORDER BY r.started_at DESC
+    """, (since, since, runs, ACCEPT_THRESHOLD))
+
+    columns = [column.name for column in cursor.description]
+    stats = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    cursor.close()
+    return stats
+
+def model_stats(conn, since: Optional[datetime] = None) -> List[Dict]:
+    """Latency percentiles, tokens per article and outcome counts for each model."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT ai_model,
+               COUNT(*) AS calls,
+               COUNT(*) FILTER (WHERE outcome = 'ok') AS ok_calls,
+               PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY latency_ms) FILTER (WHERE outcome = 'ok') AS p50,
+               PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY latency_ms) FILTER (WHERE outcome = 'ok') AS p95,
+               SUM(input_tokens + cache_read_tokens + cache_write_tokens) AS input_tokens,
+               SUM(cache_read_tokens) AS cache_read_tokens,
+               SUM(output_tokens) AS output_tokens,
+               SUM(CARDINALITY(article_ids)) FILTER (WHERE outcome = 'ok') AS articles,
+               SUM(cost_usd) AS cost
+        FROM scoring_calls
+        WHERE %s::timestamp IS NULL OR called_at >= %s
+        GROUP BY ai_model
+        ORDER BY ai_model
+    """, (since, since))
+
+    columns = [column.name for column in cursor.description]
+    stats = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    cursor.close()
+    return stats
+
+def _per(numerator, denominator) -> Optional[float]:
+    return float(numerator) / denominator if numerator is not None and denominator else None
+
+def _fmt(value, spec: str, missing: str = '-') -> str:
+    return missing if value is None else format(value, spec)
+
+def print_report(runs: List[Dict], models: List[Dict]) -> None:
+    print(f"Recent runs ({len(runs)}):")
+    print(f"  {'run':<40} {'calls':>5} {'fail':>4} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'articles':>8} {'tok/art':>7} {'cost $':>8} {'accepted':>8} {'$/accept':>8}")
+    for run in runs:
+        tokens = (run['input_tokens'] or 0) + (run['output_tokens'] or 0)
+        print(f"  {run['run_id'][:40]:<40} {run['calls']:>5} {run['failed_calls']:>4} "
+              f"{_fmt(run['p50'], '7.0f'):>7} {_fmt(run['p95'], '7.0f'):>7} {run['articles']:>8} "
+              f"{_fmt(_per(tokens, run['articles']), '7.0f'):>7} {_fmt(run['cost'], '8.4f'):>8} "
+              f"{run['accepted']:>8} {_fmt(_per(run['cost'], run['accepted']), '8.4f'):>8}")
+
+    if runs:
+        total_cost = sum(float(run['cost'] or 0) for run in runs)
+        accepted = sum(run['accepted'] for run in runs)
+        print(f"  Mean cost per run: ${total_cost / len(runs):.4f}; "
+              f"cost per accepted article: ${_fmt(_per(total_cost, accepted), '.4f', 'n/a')}")
+
+    print("\nBy model:")
+    for model in models:
+        tokens = (model['input_tokens'] or 0) + (model['output_tokens'] or 0)
+        print(f"  {model['ai_model']}: {model['ok_calls']}/{model['calls']} calls ok, "
+              f"p50 {_fmt(model['p50'], '.0f')} ms, p95 {_fmt(model['p95'], '.0f')} ms, "
+              f"{_fmt(_per(tokens, model['articles']), '.0f')} tokens/article "
+              f"({_fmt(_per(model['cache_read_tokens'], model['input_tokens']), '.0%')} of input from prompt cache), "
+              f"${_fmt(model['cost'], '.4f')}")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Report scoring latency, tokens and cost.')
+    parser.add_argument('command', choices=('report',))
+    parser.add_argument('--since', type=datetime.fromisoformat, default=None,
+                        help='Only include calls made on or after this date')
+    parser.add_argument('--runs', type=int, default=10, help='Number of recent runs to list')
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help='Report on this database (e.g. the Render pipeline) instead of the local one')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    print(f"Scoring call report at {datetime.now()}")
+    print("=" * 60)
+
+    if args.database_url:
+        conn = psycopg.connect(args.database_url)
+    else:
+        from ai_curator import DB_CONFIG
+        conn = psycopg.connect(**DB_CONFIG)
+
+    runs = run_stats(conn, args.since, args.runs)
+    models = model_stats(conn, args.since)
+    conn.close()
+
+    if not runs:
+        print("No scoring calls recorded yet.")
+        return 0
+    print_report(runs, models)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Feed health registry for the AI Ethics Newsletter monitors
+Records per-feed latency and failures, trips a circuit breaker on feeds that
+keep failing, and enforces hard wall-clock deadlines on downloads.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from urllib3.exceptions import ReadTimeoutError
+
+BREAKER_THRESHOLD = 3                  # Consecutive failures before a feed is skipped
+BREAKER_COOLDOWN = timedelta(hours=1)  # First skip period, doubled for each further failure
+BREAKER_MAX_COOLDOWN = timedelta(days=7)
+LATENCY_SMOOTHING = 0.2                # Weight of the newest sample in the latency average
+READ_CHUNK_BYTES = 16 * 1024
+READ_STALL_TIMEOUT = 5.0               # Longest one socket read may wait; a download overruns its deadline by at most this
+
+class FeedTimeout(Exception):
+    """A feed did not finish downloading before its deadline."""
+
+class BudgetExhausted(FeedTimeout):
+    """The run ran out of time before a feed's fetch could start (not the feed's fault)."""
+
+def request_timeout(deadline: float, stall_timeout: float = READ_STALL_TIMEOUT) -> Tuple[float, float]:
+    """(connect, read) timeout for requests: connect within the time left, and never let one read stall longer."""
+    remaining = max(deadline - time.monotonic(), 0.1)
+    return remaining, min(stall_timeout, remaining)
+
+class DeadlineReader:
+    """
+    File-like wrapper that fails reads once a monotonic deadline has passed.
+
+    The deadline is checked between chunks. A read in progress is bounded by
+    the read timeout of the request (see request_timeout), so a stalled
+    download gives up at most that long after the deadline.
+    """
+
+    def __init__(self, raw, deadline: float):
+        self.raw = raw
+        self.deadline = deadline
+
+    def read(self, size: int = READ_CHUNK_BYTES) -> bytes:
+        if time.monotonic() >= self.deadline:
+            raise FeedTimeout('deadline exceeded while downloading feed')
+        if size is None or size < 0 or size > READ_CHUNK_BYTES:
+            size = READ_CHUNK_BYTES
+        try:
+            return self.raw.read(size)
+        except ReadTimeoutError as e:
+            raise FeedTimeout('feed stalled while downloading') from e
+        except Exception as e:
+            if time.monotonic() >= self.deadline:
+                raise FeedTimeout('deadline exceeded while downloading feed') from e
+            raise
+
+    def read_all(self) -> bytes:
+        chunks = []
+        while True:
+            chunk = self.read()
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+def load_registry(conn) -> Dict[str, Dict]:
+    """Load every feed's health record, keyed by feed URL."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT feed_url, feed_name, last_attempt_at, last_success_at, avg_latency_ms,
+               consecutive_failures, total_fetches, total_failures, last_error, open_until
+        FROM feed_registry
+    """)
+
+    columns = [column.name for column in cursor.description]
+    registry = {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+    cursor.close()
+    return registry
+
+def registry_entry(registry: Dict[str, Dict], feed_url: str, feed_name: str) -> Dict:
+    """Return a feed's health record, creating an empty one for new feeds."""
+    return registry.setdefault(feed_url, {
+        'feed_url': feed_url,
+        'feed_name': feed_name,
+        'last_attempt_at': None,
+        'last_success_at': None,
+        'avg_latency_ms': None,
+        'consecutive_failures': 0,
+        'total_fetches': 0,
+        'total_failures': 0,
+        'last_error': None,
+        'open_until': None
+    })
+
+def circuit_open(entry: Dict, now: Optional[datetime] = None) -> bool:
+    """True while a failing feed is in its cool-down period and should be skipped."""
+    now = now or datetime.now()
+    return entry.get('open_until') is not None and entry['open_until'] > now
+
+def _record_attempt(entry: Dict, latency: float, now: datetime) -> None:
+    latency_ms = latency * 1000
+    if entry['avg_latency_ms'] is None:
+        entry['avg_latency_ms'] = latency_ms
+    else:
+        entry['avg_latency_ms'] += LATENCY_SMOOTHING * (latency_ms - float(entry['avg_latency_ms']))
+    entry['last_attempt_at'] = now
+    entry['total_fetches'] += 1
+
+def record_success(entry: Dict, latency: float, now: Optional[datetime] = None) -> None:
+    """Record a successful fetch and close the breaker."""
+    now = now or datetime.now()
+    _record_attempt(entry, latency, now)
+    entry['last_success_at'] = now
+    entry['consecutive_failures'] = 0
+    entry['open_until'] = None
+
+def record_failure(entry: Dict, latency: float, error: str, now: Optional[datetime] = None) -> None:
+    """Record a failed fetch, opening the breaker after repeated failures."""
+    now = now or datetime.now()
+    _record_attempt(entry, latency, now)
+    entry['consecutive_failures'] += 1
+    entry['total_failures'] += 1
+    entry['last_error'] = error[:1000]
+
+    excess = entry['consecutive_failures'] - BREAKER_THRESHOLD
+    if excess >= 0:
+        cooldown = min(BREAKER_COOLDOWN * (2 ** min(excess, 10)), BREAKER_MAX_COOLDOWN)
+        entry['open_until'] = now + cooldown
+
+def save_registry(conn, entries: List[Dict]) -> None:
+    """Upsert health records."""
+    if not entries:
+        return
+
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT INTO feed_registry
+        (feed_url, feed_name, last_attempt_at, last_success_at, avg_latency_ms,
+         consecutive_failures, total_fetches, total_failures, last_error, open_until)
+        VALUES (%(feed_url)s, %(feed_name)s, %(last_attempt_at)s, %(last_success_at)s, %(avg_latency_ms)s,
+                %(consecutive_failures)s, %(total_fetches)s, %(total_failures)s, %(last_error)s, %(open_until)s)
+        ON CONFLICT (feed_url) DO UPDATE SET
+            feed_name = EXCLUDED.feed_name,
+            last_attempt_at = EXCLUDED.last_attempt_at,
+            last_success_at = EXCLUDED.last_success_at,
+            avg_latency_ms = EXCLUDED.avg_latency_ms,
+            consecutive_failures = EXCLUDED.consecutive_failures,
+            total_fetches = EXCLUDED.total_fetches,
+            total_failures = EXCLUDED.total_failures,
+            last_error = EXCLUDED.last_error,
+            open_until = EXCLUDED.open_until
+    """, entries)
+    conn.commit()
+    cursor.close()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Streaming RSS/Atom parser for the AI Ethics Newsletter monitor.
+Yields entries one at a time while the document is still being read, so large
+archive feeds can be abandoned as soon as enough entries have been seen.
+"""
+
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import BinaryIO, Dict, Iterator, Optional
+
+ParseError = ET.ParseError
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+RSS1_NS = '{http://purl.org/rss/1.0/}'
+CONTENT_NS = '{http://purl.org/rss/1.0/modules/content/}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+
+ENTRY_TAGS = {'item', f'{RSS1_NS}item', f'{ATOM_NS}entry'}
+
+def _text(element: Optional[ET.Element]) -> str:
+    """Return all text inside an element (handles XHTML content)."""
+    if element is None:
+        return ''
+    return ''.join(element.itertext()).strip()
+
+def _parse_date(value: str) -> Optional[datetime]:
+    """Parse an RFC 822 or ISO 8601 date into a naive UTC datetime."""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _atom_link(entry: ET.Element) -> str:
+    """Pick the alternate link of an Atom entry."""
+    fallback = ''
+    for link in entry.findall(f'{ATOM_NS}link'):
+        rel = link.get('rel', 'alternate')
+        if rel == 'alternate':
+            return link.get('href', '')
+        fallback = fallback or link.get('href', '')
+    return fallback
+
+def _entry_fields(entry: ET.Element) -> Dict:
+    """Extract the fields the monitor stores from an <item> or <entry>."""
+    if entry.tag == f'{ATOM_NS}entry':
+        return {
+            'guid': _text(entry.find(f'{ATOM_NS}id')),
+            'title': _text(entry.find(f'{ATOM_NS}title')),
+            'link': _atom_link(entry),
+            'description': _text(entry.find(f'{ATOM_NS}summary')),
+            'content': _text(entry.find(f'{ATOM_NS}content')),
+            'pub_date': _parse_date(_text(entry.find(f'{ATOM_NS}published'))
+                                    or _text(entry.find(f'{ATOM_NS}updated')))
+        }
+
+    ns = RSS1_NS if entry.tag.startswith(RSS1_NS) else ''
+    return {
+        'guid': _text(entry.find('guid')) or entry.get('{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about', ''),
+        'title': _text(entry.find(f'{ns}title')),
+        'link': _text(entry.find(f'{ns}link')),
+        'description': _text(entry.find(f'{ns}description')),
+        'content': _text(entry.find(f'{CONTENT_NS}encoded')),
+        'pub_date': _parse_date(_text(entry.find('pubDate')) or _text(entry.find(f'{DC_NS}date')))
+    }
+
+def iter_entries(stream: BinaryIO, limit: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Incrementally parse an RSS 2.0, RSS 1.0 or Atom document from a byte stream.
+
+    Each entry is yielded as soon as its closing tag has been read and is then
+    discarded, so memory stays flat however long the feed is. Reading stops
+    after `limit` entries, or as soon as the caller stops iterating.
+    Raises ParseError on malformed XML.
+    """
+    parents = []
+    count = 0
+
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+
+        parents.pop()
+        if element.tag not in ENTRY_TAGS:
+            continue
+
+        yield _entry_fields(element)
+
+        # Drop the finished entry so the tree never grows
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+
+        count += 1
+        if limit is not None and count >= limit:
+            return
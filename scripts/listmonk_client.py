@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Listmonk API client for the AI Ethics Newsletter
+One pooled keep-alive session with bounded timeouts and retries with backoff.
+Campaigns are keyed by newsletter date and list, so rerunning the assembler
+after a failure reuses the campaign it already created instead of adding a
+duplicate.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = 3.05      # Seconds to establish a connection
+READ_TIMEOUT = 30.0         # Seconds to wait for a response
+MAX_RETRIES = 4
+BACKOFF_FACTOR = 0.5        # Retry sleeps 0.5s, 1s, 2s, ... between attempts
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POOL_SIZE = 4
+
+# Statuses after which a campaign is no longer reused or started again
+DELIVERED_STATUSES = ('running', 'finished')
+REUSABLE_STATUSES = ('draft', 'scheduled', 'paused') + DELIVERED_STATUSES
+
+class ListmonkError(Exception):
+    """A Listmonk request that failed after retries, or an unexpected response."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+def campaign_key(newsletter_date: str, list_ids: List[int]) -> str:
+    """Stable campaign name for one issue sent to a set of lists."""
+    lists = '-'.join(str(list_id) for list_id in sorted(list_ids))
+    return f"ai-ethics-{newsletter_date}-lists-{lists}"
+
+class ListmonkClient:
+    """Pooled client for the parts of the Listmonk API the assembler uses."""
+
+    def __init__(self, url: str, username: str, password: str,
+                 timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT),
+                 max_retries: int = MAX_RETRIES, backoff_factor: float = BACKOFF_FACTOR):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        # GET and PUT are retried by urllib3; POST is retried in create_campaign after a lookup
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor,
+                      status_forcelist=RETRY_STATUSES, allowed_methods=frozenset({'GET', 'PUT'}),
+                      respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict:
+        """Make one API call and return its `data` payload."""
+        try:
+            response = self.session.request(method, f'{self.url}{path}', timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise ListmonkError(f"{method} {path} failed: {e}") from e
+        if response.status_code >= 400:
+            raise ListmonkError(f"{method} {path} returned {response.status_code}: {response.text[:200]}",
+                                response.status_code)
+        try:
+            return response.json()['data']
+        except (ValueError, KeyError) as e:
+            raise ListmonkError(f"{method} {path} returned an unexpected body: {response.text[:200]}") from e
+
+    def find_campaign(self, name: str) -> Optional[Dict]:
+        """Most recent non-cancelled campaign with exactly this name, if any."""
+        data = self._request('GET', '/api/campaigns',
+                             params={'query': name, 'per_page': 'all', 'order_by': 'created_at', 'order': 'desc'})
+        for campaign in data.get('results') or []:
+            if campaign['name'] == name and campaign['status'] in REUSABLE_STATUSES:
+                return campaign
+        return None
+
+    def get_campaign(self, campaign_id: int) -> Dict:
+        return self._request('GET', f'/api/campaigns/{campaign_id}')
+
+    def create_campaign(self, newsletter_date: str, subject: str, html_body: str,
+                        list_ids: List[int]) -> Dict:
+        """Create the campaign for an issue, or reuse the one a previous run created.
+
+        A reused draft gets the new subject and body; a campaign that is already
+        sending or sent is returned unchanged.
+        """
+        name = campaign_key(newsletter_date, list_ids)
+        payload = {
+            'name': name,
+            'subject': subject,
+            'lists': list_ids,
+            'type': 'regular',
+            'content_type': 'html',
+            'body': html_body,
+            'messenger': 'email'
+        }
+
+        for attempt in range(self.max_retries + 1):
+            # A POST that timed out or failed may still have created the campaign
+            existing = self.find_campaign(name)
+            if existing is not None:
+                if existing['status'] in DELIVERED_STATUSES:
+                    return existing
+                return self._request('PUT', f"/api/campaigns/{existing['id']}", json=payload)
+            try:
+                return self._request('POST', '/api/campaigns', json=payload)
+            except ListmonkError as e:
+                if e.status is not None and e.status not in RETRY_STATUSES:
+                    raise
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff_factor * (2 ** attempt))
+
+    def send_campaign(self, campaign_id: int) -> Dict:
+        """Start sending a campaign; a campaign already sending or sent is left alone."""
+        campaign = self.get_campaign(campaign_id)
+        if campaign['status'] in DELIVERED_STATUSES:
+            return campaign
+        return self._request('PUT', f'/api/campaigns/{campaign_id}/status', json={'status': 'running'})
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for AI Ethics Newsletter ingestion
+Fingerprints title + description with SimHash and clusters syndicated copies
+of the same story so only one representative is sent for scoring.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+SIMHASH_BITS = 64
+MAX_DISTANCE = 3        # Fingerprints within this many differing bits are duplicates
+BAND_BITS = 16          # 4 bands of 16 bits: any pair within 3 bits shares a band
+DEDUP_WINDOW_DAYS = 14  # How far back to look for the canonical copy
+
+def _features(text: str) -> List[str]:
+    """Word bigrams of the normalized text (unigrams for one-word texts)."""
+    words = re.findall(r'[a-z0-9]+', text.lower())
+    if len(words) < 2:
+        return words
+    return [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+def simhash(text: str) -> Optional[int]:
+    """Compute a 64-bit SimHash as a signed integer (fits a BIGINT column)."""
+    features = _features(text)
+    if not features:
+        return None
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    fingerprint = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    if fingerprint >= 1 << (SIMHASH_BITS - 1):
+        fingerprint -= 1 << SIMHASH_BITS
+    return fingerprint
+
+def article_fingerprint(article: Dict) -> Optional[int]:
+    """Fingerprint an article from its title and description."""
+    return simhash(f"{article.get('title') or ''} {article.get('description') or ''}")
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return bin((a ^ b) & ((1 << SIMHASH_BITS) - 1)).count('1')
+
+class SimHashIndex:
+    """Banded LSH index over canonical article fingerprints."""
+
+    def __init__(self, max_distance: int = MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+
+    def _keys(self, fingerprint: int):
+        for band in range(SIMHASH_BITS // BAND_BITS):
+            yield band, (fingerprint >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1)
+
+    def add(self, article_id: int, fingerprint: int) -> None:
+        for key in self._keys(fingerprint):
+            self.bands.setdefault(key, []).append((article_id, fingerprint))
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Return the id of the closest indexed article within max_distance, if any."""
+        best = None
+        for key in self._keys(fingerprint):
+            for article_id, candidate in self.bands.get(key, []):
+                distance = hamming_distance(fingerprint, candidate)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, article_id)
+        return best[1] if best else None
+
+def load_simhash_index(conn, days: int = DEDUP_WINDOW_DAYS) -> SimHashIndex:
+    """Index the fingerprints of recent canonical articles."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, simhash
+        FROM articles
+        WHERE simhash IS NOT NULL
+          AND canonical_id IS NULL
+          AND fetched_at > NOW() - make_interval(days => %s)
+    """, (days,))
+
+    index = SimHashIndex()
+    for article_id, fingerprint in cursor:
+        index.add(article_id, fingerprint)
+
+    cursor.close()
+    return index
+
+def mark_near_duplicates(conn, index: SimHashIndex, new_articles: List[Tuple[int, Optional[int]]]) -> int:
+    """
+    Link newly stored (id, simhash) pairs to an existing canonical copy.
+
+    Articles with no near match become canonical themselves and are added to
+    the index. Returns the number of articles marked as duplicates.
+    """
+    duplicate_ids = []
+    canonical_ids = []
+
+    for article_id, fingerprint in new_articles:
+        if fingerprint is None:
+            continue
+        canonical_id = index.find(fingerprint)
+        if canonical_id is None:
+            index.add(article_id, fingerprint)
+        else:
+            duplicate_ids.append(article_id)
+            canonical_ids.append(canonical_id)
+
+    if duplicate_ids:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE articles a
+            SET canonical_id = d.canonical_id
+            FROM unnest(%s::int[], %s::int[]) AS d(id, canonical_id)
+            WHERE a.id = d.id
+        """, (duplicate_ids, canonical_ids))
+        conn.commit()
+        cursor.close()
+
+    return len(duplicate_ids)
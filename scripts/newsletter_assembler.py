@@ -8,10 +8,12 @@ import json
 import sys
 from datetime import datetime, date
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
+from urllib.parse import urlparse
 import psycopg
-import requests
-from requests.auth import HTTPBasicAuth
+
+from listmonk_client import ListmonkClient
+from template_engine import Markup, Template, load_template
 
 # Database connection parameters
 DB_CONFIG = {
@@ -28,6 +30,37 @@ LISTMONK_USERNAME = 'admin'
 LISTMONK_PASSWORD = 'listmonk'
 LISTMONK_LIST_ID = 3  # AI Ethics Newsletter list ID
 
+# Links and Listmonk template tags filled into the issue template
+ARCHIVE_URL = 'http://localhost:9000/archive'
+WEBSITE_URL = 'http://localhost:3000'
+UNSUBSCRIBE_TAG = Markup('{{ UnsubscribeURL }}')
+MANAGE_TAG = Markup('{{ ManageURL }}')
+
+TEMPLATE_PATH = Path(__file__).parent / 'newsletter_template.html'
+
+ARTICLE_TEMPLATE = Template('''
+    <div class="article">
+        <div class="article-header">
+            <span class="score-badge">Score: {{ score }}</span>
+            {{ category_tag }}
+        </div>
+        <h2><a href="{{ link }}" target="_blank">{{ title }}</a></h2>
+        <div class="article-meta">
+            <span>{{ source_name }}</span>
+            <span>•</span>
+            <span>{{ pub_date }}</span>
+        </div>
+        <div class="article-description">
+            {{ description }}
+        </div>
+        <div class="article-reasoning">
+            <strong>Why this matters:</strong> {{ reasoning }}
+        </div>
+        <a href="{{ link }}" target="_blank" class="read-more">Read Full Article →</a>
+    </div>
+    ''')
+CATEGORY_TEMPLATE = Template('<span class="article-category">{{ category }}</span>')
+
 def get_approved_articles(conn, newsletter_date: str = None) -> List[Dict]:
     """Fetch approved articles for a newsletter date."""
     if not newsletter_date:
@@ -75,8 +108,14 @@ def get_approved_articles(conn, newsletter_date: str = None) -> List[Dict]:
     cursor.close()
     return articles
 
-def format_article_html(article: Dict) -> str:
-    """Format a single article as HTML."""
+def safe_link(url: Optional[str]) -> str:
+    """Keep http(s) links only, so a feed cannot inject javascript: or data: URLs."""
+    if url and urlparse(url).scheme.lower() in ('http', 'https'):
+        return url
+    return '#'
+
+def format_article_html(article: Dict) -> Markup:
+    """Format a single article as HTML, with every field escaped."""
     pub_date_str = article['pub_date'].strftime('%b %d, %Y') if article['pub_date'] else 'Date unknown'
 
     # Truncate description if too long
@@ -85,92 +124,44 @@ def format_article_html(article: Dict) -> str:
         description = description[:297] + '...'
 
     # Category badge
-    category_tag = f'<span class="article-category">{article["category"].upper()}</span>' if article['category'] else ''
-
-    html = f'''
-    <div class="article">
-        <div class="article-header">
-            <span class="score-badge">Score: {article["overall_score"]:.2f}</span>
-            {category_tag}
-        </div>
-        <h2><a href="{article['link']}" target="_blank">{article['title']}</a></h2>
-        <div class="article-meta">
-            <span>{article['source_name']}</span>
-            <span>•</span>
-            <span>{pub_date_str}</span>
-        </div>
-        <div class="article-description">
-            {description}
-        </div>
-        <div class="article-reasoning">
-            <strong>Why this matters:</strong> {article['reasoning']}
-        </div>
-        <a href="{article['link']}" target="_blank" class="read-more">Read Full Article →</a>
-    </div>
-    '''
-    return html
-
-def assemble_newsletter(articles: List[Dict], newsletter_date: str) -> str:
-    """Assemble the complete newsletter HTML."""
-    script_dir = Path(__file__).parent
-    template_path = script_dir / 'newsletter_template.html'
-
-    with open(template_path, 'r') as f:
-        template = f.read()
+    category_tag = CATEGORY_TEMPLATE.render({'category': article['category'].upper()}) if article['category'] else ''
+
+    return ARTICLE_TEMPLATE.render({
+        'score': f"{article['overall_score']:.2f}",
+        'category_tag': category_tag,
+        'link': safe_link(article['link']),
+        'title': article['title'],
+        'source_name': article['source_name'],
+        'pub_date': pub_date_str,
+        'description': description,
+        'reasoning': article['reasoning']
+    })
+
+def assemble_newsletter(articles: List[Dict], newsletter_date: str, **overrides) -> str:
+    """Assemble the complete newsletter HTML in one pass over the compiled template.
+
+    Keyword overrides replace template fields (e.g. archive_url) for per-segment variants.
+    """
+    template = load_template(str(TEMPLATE_PATH))
 
     # Format all articles
-    articles_html = '\n'.join([format_article_html(article) for article in articles])
+    articles_html = Markup('\n'.join(format_article_html(article) for article in articles))
 
     # Format date
     date_obj = datetime.strptime(newsletter_date, '%Y-%m-%d')
     formatted_date = date_obj.strftime('%B %d, %Y')
 
-    # Replace template variables
-    newsletter_html = template.replace('{{ date }}', formatted_date)
-    newsletter_html = newsletter_html.replace('{{ article_count }}', str(len(articles)))
-    newsletter_html = newsletter_html.replace('{{ articles }}', articles_html)
-
-    # Listmonk placeholders
-    newsletter_html = newsletter_html.replace('{{ archive_url }}', 'http://localhost:9000/archive')
-    newsletter_html = newsletter_html.replace('{{ website_url }}', 'http://localhost:3000')
-    newsletter_html = newsletter_html.replace('{{ unsubscribe_url }}', '{{ UnsubscribeURL }}')
-    newsletter_html = newsletter_html.replace('{{ manage_url }}', '{{ ManageURL }}')
-
-    return newsletter_html
-
-def create_listmonk_campaign(subject: str, html_body: str, list_ids: List[int], send_now: bool = False) -> Dict:
-    """Create a campaign in Listmonk."""
-    url = f'{LISTMONK_URL}/api/campaigns'
-    auth = HTTPBasicAuth(LISTMONK_USERNAME, LISTMONK_PASSWORD)
-
-    payload = {
-        'name': subject,
-        'subject': subject,
-        'lists': list_ids,
-        'type': 'regular',
-        'content_type': 'html',
-        'body': html_body,
-        'send_at': None if send_now else None,
-        'messenger': 'email'
+    context = {
+        'date': formatted_date,
+        'article_count': len(articles),
+        'articles': articles_html,
+        'archive_url': ARCHIVE_URL,
+        'website_url': WEBSITE_URL,
+        'unsubscribe_url': UNSUBSCRIBE_TAG,
+        'manage_url': MANAGE_TAG
     }
-
-    response = requests.post(url, json=payload, auth=auth)
-    response.raise_for_status()
-
-    campaign_data = response.json()
-    return campaign_data['data']
-
-def send_campaign(campaign_id: int) -> bool:
-    """Send a campaign immediately."""
-    url = f'{LISTMONK_URL}/api/campaigns/{campaign_id}/status'
-    auth = HTTPBasicAuth(LISTMONK_USERNAME, LISTMONK_PASSWORD)
-
-    payload = {'status': 'running'}
-
-    response = requests.put(url, json=payload, auth=auth)
-    response.raise_for_status()
-
-    return True
+    context.update(overrides)
+    return str(template.render(context))
 
 def mark_articles_sent(conn, article_ids: List[int]) -> None:
     """Mark articles as included in sent newsletter."""
@@ -224,30 +215,31 @@ def main():
         date_obj = datetime.strptime(newsletter_date, '%Y-%m-%d')
         subject = f"AI Ethics Newsletter • {date_obj.strftime('%B %d, %Y')} • {len(articles)} Key Insights"
 
-        # Create campaign in Listmonk
+        # Create campaign in Listmonk (reruns for the same date reuse it)
         print("Creating campaign in Listmonk...")
-        campaign = create_listmonk_campaign(
-            subject=subject,
-            html_body=newsletter_html,
-            list_ids=[LISTMONK_LIST_ID],
-            send_now=False
-        )
-        campaign_id = campaign['id']
-        print(f"Campaign created! ID: {campaign_id}\n")
-
-        if send_now:
-            print("Sending newsletter...")
-            send_campaign(campaign_id)
-            print("Newsletter sent!\n")
-
-            # Mark articles as sent
-            article_ids = [a['id'] for a in articles]
-            mark_articles_sent(conn, article_ids)
-            print("Articles marked as sent")
-        else:
-            print(f"Campaign created but NOT sent.")
-            print(f"To send, visit: {LISTMONK_URL}/campaigns/{campaign_id}")
-            print("Or run with --send flag to send immediately")
+        with ListmonkClient(LISTMONK_URL, LISTMONK_USERNAME, LISTMONK_PASSWORD) as listmonk:
+            campaign = listmonk.create_campaign(
+                newsletter_date=newsletter_date,
+                subject=subject,
+                html_body=newsletter_html,
+                list_ids=[LISTMONK_LIST_ID]
+            )
+            campaign_id = campaign['id']
+            print(f"Campaign ready! ID: {campaign_id} (status: {campaign['status']})\n")
+
+            if send_now:
+                print("Sending newsletter...")
+                listmonk.send_campaign(campaign_id)
+                print("Newsletter sent!\n")
+
+                # Mark articles as sent
+                article_ids = [a['id'] for a in articles]
+                mark_articles_sent(conn, article_ids)
+                print("Articles marked as sent")
+            else:
+                print(f"Campaign created but NOT sent.")
+                print(f"To send, visit: {LISTMONK_URL}/campaigns/{campaign_id}")
+                print("Or run with --send flag to send immediately")
 
         conn.close()
 
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Local novelty engine for the AI Ethics Newsletter curator
+Keeps a compact hashed TF-IDF vector for every canonical article in memory-mapped
+NumPy files and measures how close a new article is to what we ingested
+recently and to everything already sent, without any API call.
+
+Usage:
+    python3 scripts/novelty.py build                 # index every article not yet indexed
+    python3 scripts/novelty.py bench --rows 1000000  # time queries against a synthetic index
+"""
+
+import argparse
+import fcntl
+import json
+import sys
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import psycopg
+
+from prefilter import article_text, tokenize
+
+VECTOR_DIM = 256                # Signed feature hashing into this many float16 dimensions
+DF_BITS = 18                    # Document-frequency buckets used for IDF weights
+INDEX_DIR = Path(__file__).parent / 'novelty_index'
+NOVELTY_WINDOW_DAYS = 30        # "Recent" coverage compared against
+SIM_UNRELATED = 0.20            # Cosine similarity at or below which an article is fully novel
+SIM_DUPLICATE = 0.80            # ...and at or above which it is already covered
+NOVELTY_WEIGHT = 0.5            # Share of the stored novelty_score taken from the local signal
+OVERALL_NOVELTY_WEIGHT = 0.2    # How much a novelty change moves overall_score
+SCAN_ROWS = 65536               # Index rows compared per matrix product
+SYNC_BATCH = 5000
+
+class NoveltyIndex:
+    """
+    Append-only vector store: ids.i64, times.f64 and vectors.f16 hold one row per
+    article in id order, plus IDF document frequencies in df.npy.
+    """
+
+    def __init__(self, path: Path = INDEX_DIR, dim: int = VECTOR_DIM):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self._open()
+
+    def _file(self, name: str) -> Path:
+        return self.path / name
+
+    def _open(self) -> None:
+        meta_path = self._file('meta.json')
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        self.dim = meta.get('dim', self.dim)
+        self.documents = meta.get('documents', 0)
+        df_path = self._file('df.npy')
+        self.doc_freq = np.load(df_path) if df_path.exists() else np.zeros(1 << DF_BITS, dtype=np.int64)
+
+        # ids are written last, so their length is the number of complete rows
+        rows = self._file('ids.i64').stat().st_size // 8 if self._file('ids.i64').exists() else 0
+        if rows:
+            self.ids = np.memmap(self._file('ids.i64'), dtype=np.int64, mode='r', shape=(rows,))
+            self.times = np.memmap(self._file('times.f64'), dtype=np.float64, mode='r', shape=(rows,))
+            self.vectors = np.memmap(self._file('vectors.f16'), dtype=np.float16, mode='r', shape=(rows, self.dim))
+        else:
+            self.ids = np.zeros(0, dtype=np.int64)
+            self.times = np.zeros(0, dtype=np.float64)
+            self.vectors = np.zeros((0, self.dim), dtype=np.float16)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def last_id(self) -> int:
+        return int(self.ids[-1]) if len(self.ids) else 0
+
+    @contextmanager
+    def _locked(self):
+        with open(self._file('lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Unit-length hashed TF-IDF vectors, one row per text."""
+        idf = np.log((1 + self.documents) / (1 + self.doc_freq)) + 1.0
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        df_mask = (1 << DF_BITS) - 1
+        for row, text in enumerate(texts):
+            counts: Dict[int, int] = {}
+            for token in tokenize(text):
+                token_hash = zlib.crc32(token.encode())
+                counts[token_hash] = counts.get(token_hash, 0) + 1
+            if not counts:
+                continue
+            hashes = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            weights = np.log1p(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+            weights *= idf[hashes & df_mask]
+            signs = np.where((hashes >> 31) & 1, -1.0, 1.0)
+            np.add.at(vectors[row], (hashes >> DF_BITS) % self.dim, signs * weights)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, ids: List[int], texts: List[str], times: List[float]) -> int:
+        """Append articles with ids above the last indexed one; returns how many were added."""
+        with self._locked():
+            self._open()
+            keep = [i for i, article_id in enumerate(ids) if article_id > self.last_id]
+            if not keep:
+                return 0
+            texts = [texts[i] for i in keep]
+            df_mask = (1 << DF_BITS) - 1
+            for text in texts:
+                buckets = {zlib.crc32(token.encode()) & df_mask for token in tokenize(text)}
+                self.doc_freq[list(buckets)] += 1
+            self.documents += len(texts)
+
+            vectors = self.embed(texts).astype(np.float16)
+            with open(self._file('vectors.f16'), 'ab') as f:
+                f.write(vectors.tobytes())
+            with open(self._file('times.f64'), 'ab') as f:
+                f.write(np.asarray([times[i] for i in keep], dtype=np.float64).tobytes())
+            with open(self._file('ids.i64'), 'ab') as f:
+                f.write(np.asarray([ids[i] for i in keep], dtype=np.int64).tobytes())
+
+            np.save(self._file('df.npy'), self.doc_freq)
+            self._file('meta.json').write_text(json.dumps({'dim': self.dim, 'documents': self.documents}))
+            self._open()
+            return len(keep)
+
+    def _scan(self, queries: np.ndarray, query_ids: np.ndarray, rows) -> Tuple[np.ndarray, np.ndarray]:
+        """Best similarity and matching article id per query over `rows`, earlier articles only."""
+        best = np.full(len(queries), -1.0, dtype=np.float32)
+        best_id = np.zeros(len(queries), dtype=np.int64)
+        for chunk in rows:
+            ids = np.asarray(self.ids[chunk])
+            if not len(ids):
+                continue
+            similarity = queries @ np.asarray(self.vectors[chunk], dtype=np.float32).T
+            similarity[ids[None, :] >= query_ids[:, None]] = -1.0
+            column = similarity.argmax(axis=1)
+            value = similarity[np.arange(len(queries)), column]
+            better = value > best
+            best[better] = value[better]
+            best_id[better] = ids[column[better]]
+        return best, best_id
+
+    def max_similarity(self, query_ids: List[int], queries: np.ndarray, since: float,
+                       sent_ids: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Max cosine similarity of each query to earlier articles fetched since
+        `since` (epoch seconds) and to earlier sent articles.
+
+        Rows are appended in id order, so fetch times are not sorted; the
+        window is picked from the (small) times column, and only its vectors
+        and the sent rows are read, so the cost follows the window and the
+        send history, not the whole archive.
+        """
+        query_ids = np.asarray(query_ids, dtype=np.int64)
+        queries = np.asarray(queries, dtype=np.float32)
+        in_window = np.flatnonzero(np.asarray(self.times) >= since)
+        recent_rows = (in_window[i:i + SCAN_ROWS] for i in range(0, len(in_window), SCAN_ROWS))
+        recent, recent_id = self._scan(queries, query_ids, recent_rows)
+
+        positions = np.searchsorted(self.ids, sent_ids)
+        found = positions < len(self)
+        found[found] = np.asarray(self.ids[positions[found]]) == sent_ids[found]
+        positions = positions[found]
+        sent_rows = (positions[i:i + SCAN_ROWS] for i in range(0, len(positions), SCAN_ROWS))
+        sent, sent_id = self._scan(queries, query_ids, sent_rows)
+
+        return {'recent': recent, 'recent_id': recent_id, 'sent': sent, 'sent_id': sent_id}
+
+def novelty_from_similarity(similarity: np.ndarray) -> np.ndarray:
+    """Map max similarity to a 0-1 novelty score (1 = nothing like it seen before)."""
+    return np.clip((SIM_DUPLICATE - similarity) / (SIM_DUPLICATE - SIM_UNRELATED), 0.0, 1.0)
+
+def sync_index(conn, index: NoveltyIndex, batch: int = SYNC_BATCH) -> int:
+    """Index canonical articles added since the last sync; returns how many were added."""
+    added = 0
+    with conn.cursor(name='novelty_sync') as cursor:
+        cursor.itersize = batch
+        cursor.execute("""
+            SELECT id, title, description, source_name, fetched_at
+            FROM articles
+            WHERE id > %s
+              AND canonical_id IS NULL
+            ORDER BY id
+        """, (index.last_id,))
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+            added += index.add(
+                [row[0] for row in rows],
+                [article_text({'title': row[1], 'description': row[2], 'source_name': row[3]}) for row in rows],
+                [row[4].timestamp() if row[4] else time.time() for row in rows]
+            )
+    conn.commit()
+    return added
+
+def sent_article_ids(conn) -> np.ndarray:
+    """Sorted ids of every article included in a sent newsletter."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT article_id FROM newsletter_items WHERE included_in_sent ORDER BY article_id")
+    ids = np.asarray([row[0] for row in cursor.fetchall()], dtype=np.int64)
+    conn.commit()
+    cursor.close()
+    return ids
+
+def local_novelty(conn, index: NoveltyIndex, articles: List[Dict],
+                  window_days: float = NOVELTY_WINDOW_DAYS,
+                  as_of: Optional[datetime] = None) -> Dict[int, Dict]:
+    """
+    Novelty of each article against recent and sent coverage.
+
+    The recent window ends at `as_of` (default now); re-scoring old articles
+    passes their fetch time so they are compared as they were when live.
+    Returns {article_id: {'novelty', 'similarity', 'nearest_id', 'sent'}}, where
+    `sent` says whether the closest match went out in a newsletter.
+    """
+    if not articles:
+        return {}
+    sync_index(conn, index)
+    since = ((as_of or datetime.now()) - timedelta(days=window_days)).timestamp()
+    matches = index.max_similarity([article['id'] for article in articles],
+                                   index.embed([article_text(article) for article in articles]),
+                                   since, sent_article_ids(conn))
+
+    # The same row scanned in a differently shaped product can differ in the last float bits
+    sent_closer = matches['sent'] >= matches['recent'] - 1e-4
+    similarity = np.maximum(matches['recent'], matches['sent'])
+    nearest = np.where(sent_closer, matches['sent_id'], matches['recent_id'])
+    novelty = novelty_from_similarity(similarity)
+    return {
+        article['id']: {
+            'novelty': float(novelty[i]),
+            'similarity': float(similarity[i]),
+            'nearest_id': int(nearest[i]) if similarity[i] > -1 else None,
+            'sent': bool(sent_closer[i]) and similarity[i] > -1
+        }
+        for i, article in enumerate(articles)
+    }
+
+def blend_novelty(scores: Dict, local: Optional[Dict], weight: float = NOVELTY_WEIGHT) -> Dict:
+    """Fold the local novelty signal into a model's scores, adjusting overall to match."""
+    if not local or scores.get('novelty_score') is None:
+        return scores
+    novelty = round(weight * local['novelty'] + (1 - weight) * scores['novelty_score'], 2)
+    overall = scores['overall_score'] + OVERALL_NOVELTY_WEIGHT * (novelty - scores['novelty_score'])
+    reasoning = scores['reasoning']
+    if local['nearest_id'] is not None:
+        reasoning += (f" [Local novelty {local['novelty']:.2f}: closest earlier "
+                      f"{'sent ' if local['sent'] else ''}article #{local['nearest_id']}, "
+                      f"similarity {local['similarity']:.2f}]")
+    return dict(scores, novelty_score=novelty, overall_score=round(min(max(overall, 0.0), 1.0), 2),
+                reasoning=reasoning)
+
+def bench(rows: int, queries: int, window_days: float, sent: int, seed: int = 0) -> None:
+    """Time a batch of queries against a synthetic index of `rows` random articles."""
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        index = NoveltyIndex(Path(directory))
+        started = time.perf_counter()
+        now = time.time()
+        span = 365 * 86400
+        with open(index._file('vectors.f16'), 'ab') as vf, open(index._file('times.f64'), 'ab') as tf, \
+                open(index._file('ids.i64'), 'ab') as idf:
+            for first in range(0, rows, SCAN_ROWS):
+                count = min(SCAN_ROWS, rows - first)
+                vectors = rng.standard_normal((count, index.dim)).astype(np.float32)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                vf.write(vectors.astype(np.float16).tobytes())
+                tf.write(np.linspace(now - span + span * first / rows, now - span + span * (first + count) / rows,
+                                     count, endpoint=False).tobytes())
+                idf.write(np.arange(first + 1, first + count + 1, dtype=np.int64).tobytes())
+        index._open()
+        print(f"Built {rows:,} synthetic rows in {time.perf_counter() - started:.1f}s "
+              f"({index.vectors.nbytes / 1e6:.0f} MB of vectors)")
+
+        query_vectors = rng.standard_normal((queries, index.dim)).astype(np.float32)
+        query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+        sent_ids = np.sort(rng.choice(rows, size=min(sent, rows), replace=False) + 1)
+        started = time.perf_counter()
+        index.max_similarity(list(range(rows + 1, rows + queries + 1)), query_vectors,
+                             now - window_days * 86400, sent_ids)
+        elapsed = time.perf_counter() - started
+        window_rows = int(rows * min(window_days * 86400 / span, 1.0))
+        print(f"{queries} queries vs {window_rows:,} rows in a {window_days:g}-day window "
+              f"and {len(sent_ids):,} sent articles: {elapsed * 1000:.0f} ms "
+              f"({elapsed * 1000 / queries:.1f} ms per article)")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Build and benchmark the local novelty index.')
+    parser.add_argument('command', choices=('build', 'bench'))
+    parser.add_argument('--index', type=Path, default=INDEX_DIR, help='Index directory')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='bench: synthetic index size')
+    parser.add_argument('--queries', type=int, default=100, help='bench: articles scored per batch')
+    parser.add_argument('--sent', type=int, default=5000, help='bench: articles marked as sent')
+    parser.add_argument('--window-days', type=float, default=NOVELTY_WINDOW_DAYS,
+                        help='Recent coverage window')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    args = parse_args(argv)
+    print(f"Novelty index {args.command} started at {datetime.now()}")
+    print("=" * 60)
+
+    if args.command == 'bench':
+        bench(args.rows, args.queries, args.window_days, args.sent)
+        return 0
+
+    from ai_curator import DB_CONFIG
+    conn = psycopg.connect(**DB_CONFIG)
+    index = NoveltyIndex(args.index)
+    started = time.perf_counter()
+    added = sync_index(conn, index)
+    conn.close()
+    print(f"Indexed {added} new articles in {time.perf_counter() - started:.1f}s "
+          f"({len(index)} total in {args.index})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Local pre-filter for the AI Ethics Newsletter curator
+A hashed TF-IDF + logistic regression model, trained on past Claude scores,
+that rejects clearly off-topic articles before they cost an API call.
+
+Usage:
+    python3 scripts/prefilter.py train     # fit on article_scores history and save the model
+    python3 scripts/prefilter.py report    # precision/recall of the saved model vs Claude labels
+"""
+
+import argparse
+import re
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import psycopg
+
+HASH_BITS = 18                  # 262,144 hashed feature buckets
+RELEVANCE_THRESHOLD = 0.40      # Claude relevance below this counts as off-topic
+PREFILTER_CONFIDENCE = 0.95     # Reject only when P(off-topic) is at least this
+PREFILTER_MODEL = 'prefilter'   # ai_model recorded on rows the pre-filter rejects
+MODEL_PATH = Path(__file__).parent / 'prefilter_model.npz'
+
+L2_PENALTY = 1e-4
+LEARNING_RATE = 10.0            # Rows are L2-normalized, so large steps stay stable
+TRAIN_ITERATIONS = 300
+HOLDOUT_FRACTION = 0.2          # Most recent share of labels held out for the train report
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word unigrams and bigrams."""
+    words = re.findall(r'[a-z0-9]+', text.lower())
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+def article_text(article: Dict) -> str:
+    return f"{article.get('title') or ''} {(article.get('description') or '')[:500]} {article.get('source_name') or ''}"
+
+def hash_counts(texts: List[str], hash_bits: int = HASH_BITS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hash texts into a sparse CSR term-frequency matrix.
+
+    Returns (indptr, indices, data) with log-scaled term counts.
+    """
+    mask = (1 << hash_bits) - 1
+    indptr = [0]
+    indices = []
+    data = []
+    for text in texts:
+        counts: Dict[int, int] = {}
+        for token in tokenize(text):
+            bucket = zlib.crc32(token.encode()) & mask
+            counts[bucket] = counts.get(bucket, 0) + 1
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+
+    return (np.asarray(indptr, dtype=np.int64),
+            np.asarray(indices, dtype=np.int64),
+            np.log1p(np.asarray(data, dtype=np.float64)))
+
+class SparseRows:
+    """Row-normalized TF-IDF rows in CSR form, with the two products logistic regression needs."""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, dim: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.dim = dim
+        self.rows = len(indptr) - 1
+        self.row_of = np.repeat(np.arange(self.rows), np.diff(indptr))
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """X @ w"""
+        return np.bincount(self.row_of, weights=self.data * weights[self.indices], minlength=self.rows)
+
+    def transpose_dot(self, values: np.ndarray) -> np.ndarray:
+        """X.T @ v"""
+        return np.bincount(self.indices, weights=self.data * values[self.row_of], minlength=self.dim)
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+class Prefilter:
+    """Hashed TF-IDF features with a logistic model of P(relevant)."""
+
+    def __init__(self, weights: np.ndarray, bias: float, idf: np.ndarray,
+                 hash_bits: int = HASH_BITS, trained_at: str = '', examples: int = 0):
+        self.weights = weights
+        self.bias = bias
+        self.idf = idf
+        self.hash_bits = hash_bits
+        self.trained_at = trained_at
+        self.examples = examples
+
+    @staticmethod
+    def _features(texts: List[str], idf: np.ndarray, hash_bits: int) -> SparseRows:
+        indptr, indices, data = hash_counts(texts, hash_bits)
+        data = data * idf[indices]
+        rows = SparseRows(indptr, indices, data, 1 << hash_bits)
+        norms = np.sqrt(np.bincount(rows.row_of, weights=data * data, minlength=rows.rows))
+        norms[norms == 0] = 1.0
+        rows.data = data / norms[rows.row_of]
+        return rows
+
+    @classmethod
+    def train(cls, texts: List[str], labels: np.ndarray, hash_bits: int = HASH_BITS,
+              iterations: int = TRAIN_ITERATIONS) -> 'Prefilter':
+        """Fit by full-batch gradient descent with class-balanced log loss."""
+        dim = 1 << hash_bits
+        indptr, indices, _ = hash_counts(texts, hash_bits)
+        doc_freq = np.bincount(indices, minlength=dim)
+        idf = np.log((1 + len(texts)) / (1 + doc_freq)) + 1.0
+
+        rows = cls._features(texts, idf, hash_bits)
+        labels = labels.astype(np.float64)
+        positives = max(labels.sum(), 1.0)
+        negatives = max(len(labels) - labels.sum(), 1.0)
+        sample_weight = np.where(labels == 1, len(labels) / (2 * positives), len(labels) / (2 * negatives))
+
+        weights = np.zeros(dim)
+        bias = 0.0
+        for _ in range(iterations):
+            error = (_sigmoid(rows.dot(weights) + bias) - labels) * sample_weight / len(labels)
+            weights -= LEARNING_RATE * (rows.transpose_dot(error) + L2_PENALTY * weights)
+            bias -= LEARNING_RATE * error.sum()
+
+        return cls(weights, bias, idf, hash_bits, datetime.now().isoformat(timespec='seconds'), len(texts))
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        """P(relevant) for each text."""
+        if not texts:
+            return np.zeros(0)
+        rows = self._features(texts, self.idf, self.hash_bits)
+        return _sigmoid(rows.dot(self.weights) + self.bias)
+
+    def save(self, path: Path = MODEL_PATH) -> None:
+        np.savez_compressed(path, weights=self.weights.astype(np.float32), bias=self.bias,
+                            idf=self.idf.astype(np.float32), hash_bits=self.hash_bits,
+                            trained_at=self.trained_at, examples=self.examples)
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> Optional['Prefilter']:
+        """Load a saved model, or None if none has been trained yet."""
+        if not Path(path).exists():
+            return None
+        saved = np.load(path)
+        return cls(saved['weights'].astype(np.float64), float(saved['bias']),
+                   saved['idf'].astype(np.float64), int(saved['hash_bits']),
+                   str(saved['trained_at']), int(saved['examples']))
+
+def rejection_scores(probability: float) -> Dict:
+    """Score row recorded for an article the pre-filter rejects.
+
+    Quality and novelty are not assessed, but the review app reads every score
+    as a number, so they are recorded as 0.
+    """
+    relevance = round(float(probability), 2)
+    return {
+        'relevance_score': relevance,
+        'quality_score': 0.0,
+        'novelty_score': 0.0,
+        'overall_score': relevance,
+        'reasoning': f"Auto-rejected by the local pre-filter (P(relevant) = {probability:.3f})"
+    }
+
+def load_labeled_articles(conn, since: Optional[datetime] = None) -> Tuple[List[str], np.ndarray]:
+    """Claude-scored articles, oldest first, as (texts, relevant labels).
+
+    Near-duplicates that inherited their canonical article's score, and later
+    copies of a text already labeled (score cache hits), are left out so each
+    Claude call counts once.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT a.title, a.description, a.source_name, s.relevance_score
+        FROM article_scores s
+        JOIN articles a ON a.id = s.article_id
+        WHERE s.ai_model IS DISTINCT FROM %s
+          AND s.relevance_score IS NOT NULL
+          AND a.canonical_id IS NULL
+          AND (%s::timestamp IS NULL OR s.scored_at >= %s)
+        ORDER BY s.scored_at, s.id
+    """, (PREFILTER_MODEL, since, since))
+
+    texts = []
+    labels = []
+    seen = set()
+    for title, description, source_name, relevance in cursor.fetchall():
+        text = article_text({'title': title, 'description': description, 'source_name': source_name})
+        normalized = ' '.join(text.lower().split())
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        texts.append(text)
+        labels.append(float(relevance) >= RELEVANCE_THRESHOLD)
+
+    cursor.close()
+    return texts, np.asarray(labels, dtype=bool)
+
+def evaluate(model: Prefilter, texts: List[str], labels: np.ndarray,
+             confidence: float = PREFILTER_CONFIDENCE) -> Dict:
+    """Precision/recall of the reject decision and of the relevant class at 0.5."""
+    relevant_probability = model.predict(texts)
+    rejected = relevant_probability <= 1 - confidence
+    predicted_relevant = relevant_probability >= 0.5
+    off_topic = ~labels
+
+    def ratio(numerator, denominator):
+        return float(numerator) / float(denominator) if denominator else 0.0
+
+    return {
+        'examples': len(labels),
+        'off_topic': int(off_topic.sum()),
+        'rejected': int(rejected.sum()),
+        'reject_precision': ratio((rejected & off_topic).sum(), rejected.sum()),
+        'reject_recall': ratio((rejected & off_topic).sum(), off_topic.sum()),
+        'relevant_rejected': int((rejected & labels).sum()),
+        'relevant_precision': ratio((predicted_relevant & labels).sum(), predicted_relevant.sum()),
+        'relevant_recall': ratio((predicted_relevant & labels).sum(), labels.sum())
+    }
+
+def print_report(metrics: Dict, confidence: float) -> None:
+    print(f"  Labeled articles: {metrics['examples']} ({metrics['off_topic']} off-topic per Claude)")
+    print(f"  Auto-reject at {confidence:.0%} confidence: {metrics['rejected']} articles")
+    print(f"    Precision: {metrics['reject_precision']:.1%} (rejected articles Claude also found off-topic)")
+    print(f"    Recall:    {metrics['reject_recall']:.1%} (off-topic articles caught before the API)")
+    print(f"    Relevant articles wrongly rejected: {metrics['relevant_rejected']}")
+    print(f"  Relevant class at P >= 0.5: precision {metrics['relevant_precision']:.1%}, "
+          f"recall {metrics['relevant_recall']:.1%}")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Train and evaluate the local scoring pre-filter.')
+    parser.add_argument('command', choices=('train', 'report'))
+    parser.add_argument('--model', type=Path, default=MODEL_PATH, help='Model file')
+    parser.add_argument('--confidence', type=float, default=PREFILTER_CONFIDENCE,
+                        help='P(off-topic) required to auto-reject')
+    parser.add_argument('--since', type=datetime.fromisoformat, default=None,
+                        help='report: only evaluate scores recorded on or after this date')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    from ai_curator import DB_CONFIG
+
+    args = parse_args(argv)
+    print(f"Pre-filter {args.command} started at {datetime.now()}")
+    print("=" * 60)
+
+    conn = psycopg.connect(**DB_CONFIG)
+    texts, labels = load_labeled_articles(conn, args.since if args.command == 'report' else None)
+    conn.close()
+
+    if args.command == 'train':
+        if len(labels) < 20 or labels.all() or not labels.any():
+            print(f"ERROR: need at least 20 Claude-scored articles of both classes (have {len(labels)})")
+            return 1
+
+        # Report on the most recent scores before refitting on everything
+        split = int(len(labels) * (1 - HOLDOUT_FRACTION))
+        holdout_model = Prefilter.train(texts[:split], labels[:split])
+        print(f"Holdout evaluation ({len(labels) - split} most recent articles):")
+        print_report(evaluate(holdout_model, texts[split:], labels[split:], args.confidence), args.confidence)
+
+        model = Prefilter.train(texts, labels)
+        model.save(args.model)
+        print(f"\nTrained on {len(labels)} articles, saved to {args.model}")
+        return 0
+
+    model = Prefilter.load(args.model)
+    if model is None:
+        print(f"ERROR: no model at {args.model}; run `prefilter.py train` first")
+        return 1
+
+    print(f"Model trained {model.trained_at} on {model.examples} articles:")
+    print_report(evaluate(model, texts, labels, args.confidence), args.confidence)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,15 +4,29 @@ RSS Feed Monitor for AI Ethics Newsletter
 Fetches articles from configured RSS feeds and stores them in the database.
 """
 
+import argparse
 import json
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse
 import feedparser
 import psycopg
-from typing import List, Dict, Optional
+import requests
+from typing import Iterator, List, Dict, Optional, Set, Tuple, Union
 import hashlib
 
+from feed_health import (BudgetExhausted, DeadlineReader, circuit_open, load_registry,
+                         record_failure, record_success, registry_entry, request_timeout, save_registry)
+from feed_stream import ParseError, iter_entries
+from near_dup import article_fingerprint, load_simhash_index, mark_near_duplicates
+from scoring_queue import enqueue
+from url_canon import drop_unique_constraints, url_key
+
 # Database connection parameters
 DB_CONFIG = {
     'host': 'localhost',
@@ -22,6 +36,20 @@ DB_CONFIG = {
     'password': 'listmonk'
 }
 
+# Fetch concurrency configuration
+MAX_CONCURRENT_FETCHES = 16  # Feeds downloaded at the same time
+MAX_FETCHES_PER_HOST = 2     # Simultaneous requests against a single host
+FEED_TIMEOUT = 20            # Hard limit in seconds for downloading one feed
+RUN_BUDGET = 300             # Hard limit in seconds for fetching all feeds
+RUN_BUDGET_GRACE = 5         # Extra wait for fetches stuck outside the socket timeouts
+USER_AGENT = 'AI-Ethics-Newsletter-RSS-Monitor/1.0'
+
+# Stop walking a feed after this many consecutive already-stored entries
+KNOWN_STREAK_LIMIT = 5
+
+# Feeds larger than this are parsed incrementally instead of buffered
+STREAM_THRESHOLD_BYTES = 1_000_000
+
 def load_feeds(feeds_file: str = '../rss-feeds.json') -> List[Dict]:
     """Load RSS feed configuration from JSON file."""
     script_dir = Path(__file__).parent
@@ -36,90 +64,527 @@ def generate_guid(link: str, title: str) -> str:
     content = f"{link}|{title}"
     return hashlib.sha256(content.encode()).hexdigest()
 
-def parse_feed(feed_url: str, feed_name: str, category: str) -> List[Dict]:
-    """Parse an RSS feed and extract article information."""
-    print(f"Fetching {feed_name}...")
+class HostLimiter:
+    """Caps the number of simultaneous fetches against a single host."""
 
-    try:
-        feed = feedparser.parse(feed_url)
-        articles = []
-
-        for entry in feed.entries:
-            # Generate or use existing GUID
-            guid = entry.get('id') or entry.get('guid') or generate_guid(
-                entry.get('link', ''),
-                entry.get('title', '')
-            )
-
-            # Parse publication date
-            pub_date = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                pub_date = datetime(*entry.published_parsed[:6])
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                pub_date = datetime(*entry.updated_parsed[:6])
-
-            article = {
+    def __init__(self, per_host: int):
+        self.per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+
+    @contextmanager
+    def slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.Semaphore(self.per_host))
+        with semaphore:
+            yield
+
+def load_known_guids(conn) -> Dict[str, Set[str]]:
+    """Load the GUIDs already stored for each feed, keyed by feed URL."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT source_url, guid FROM articles")
+
+    known: Dict[str, Set[str]] = {}
+    for source_url, guid in cursor:
+        known.setdefault(source_url, set()).add(guid)
+
+    cursor.close()
+    return known
+
+def load_feed_states(conn) -> Dict[str, Dict]:
+    """Load the stored HTTP cache validators for every feed."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT feed_url, etag, last_modified, content_hash, last_fetched_at
+        FROM feed_state
+    """)
+
+    states = {}
+    for row in cursor.fetchall():
+        states[row[0]] = {
+            'feed_url': row[0],
+            'etag': row[1],
+            'last_modified': row[2],
+            'content_hash': row[3],
+            'last_fetched_at': row[4]
+        }
+
+    cursor.close()
+    return states
+
+def save_feed_state(conn, state: Dict) -> None:
+    """Persist a feed's cache validators after its articles have been stored."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO feed_state (feed_url, etag, last_modified, content_hash, last_fetched_at)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (feed_url) DO UPDATE SET
+            etag = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            content_hash = EXCLUDED.content_hash,
+            last_fetched_at = EXCLUDED.last_fetched_at
+    """, (
+        state['feed_url'],
+        state.get('etag'),
+        state.get('last_modified'),
+        state.get('content_hash'),
+        state.get('last_fetched_at')
+    ))
+    conn.commit()
+    cursor.close()
+
+def open_feed(feed_url: str, timeout: Union[float, Tuple[float, float]] = FEED_TIMEOUT,
+              state: Optional[Dict] = None) -> Optional[requests.Response]:
+    """
+    Start downloading a feed, failing if the host does not answer in time.
+
+    When a cache state is given, the request is sent with If-None-Match /
+    If-Modified-Since and the state's validators are updated in place.
+    Returns None when the server answers 304, otherwise the open response.
+    """
+    headers = {'User-Agent': USER_AGENT}
+    if state:
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+
+    response = requests.get(feed_url, timeout=timeout, headers=headers, stream=True)
+    response.raw.decode_content = True
+    if state is not None:
+        state['last_fetched_at'] = datetime.now()
+
+    if response.status_code == 304:
+        response.close()
+        return None
+    if not response.ok:
+        response.close()
+        response.raise_for_status()
+
+    if state is not None:
+        state['etag'] = response.headers.get('ETag')
+        state['last_modified'] = response.headers.get('Last-Modified')
+    return response
+
+def read_feed_body(response: requests.Response, state: Optional[Dict] = None,
+                   deadline: Optional[float] = None) -> Optional[bytes]:
+    """Read the whole body, returning None if it hashes to the last seen content."""
+    with response:
+        if deadline is None:
+            body = response.content
+        else:
+            body = DeadlineReader(response.raw, deadline).read_all()
+    if state is None:
+        return body
+
+    content_hash = hashlib.sha256(body).hexdigest()
+    unchanged = content_hash == state.get('content_hash')
+    state['content_hash'] = content_hash
+    return None if unchanged else body
+
+def should_stream(response: requests.Response, stream: bool = False) -> bool:
+    """Decide whether a feed is large enough to be parsed incrementally."""
+    length = response.headers.get('Content-Length', '')
+    return stream or (length.isdigit() and int(length) > STREAM_THRESHOLD_BYTES)
+
+def feedparser_entries(body: bytes) -> Iterator[Dict]:
+    """Parse a buffered document with feedparser into the monitor's entry fields."""
+    for entry in feedparser.parse(body).entries:
+        pub_date = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            pub_date = datetime(*entry.published_parsed[:6])
+        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+            pub_date = datetime(*entry.updated_parsed[:6])
+
+        yield {
+            'guid': entry.get('id') or entry.get('guid'),
+            'title': entry.get('title'),
+            'link': entry.get('link', ''),
+            'description': entry.get('summary', ''),
+            'content': entry.get('content', [{}])[0].get('value', '') if hasattr(entry, 'content') else '',
+            'pub_date': pub_date
+        }
+
+def collect_articles(entries: Iterator[Dict], feed_url: str, feed_name: str, category: str,
+                     known_guids: Optional[Set[str]] = None,
+                     known_streak_limit: int = KNOWN_STREAK_LIMIT,
+                     max_entries: Optional[int] = None) -> List[Dict]:
+    """
+    Turn parsed entries into article rows, stopping early where possible.
+
+    Entries whose GUID is in `known_guids` are skipped, and since feeds list
+    newest first, iteration stops after `known_streak_limit` known entries in
+    a row or after `max_entries` entries, leaving the rest of a stream unread.
+    """
+    articles = []
+    known_streak = 0
+
+    for seen, entry in enumerate(entries, 1):
+        # Generate or use existing GUID
+        guid = entry['guid'] or generate_guid(entry['link'], entry['title'] or '')
+
+        if known_guids is not None and guid in known_guids:
+            known_streak += 1
+            if known_streak >= known_streak_limit:
+                break
+        else:
+            known_streak = 0
+            articles.append({
                 'guid': guid,
-                'title': entry.get('title', 'No title'),
-                'link': entry.get('link', ''),
-                'description': entry.get('summary', ''),
-                'content': entry.get('content', [{}])[0].get('value', '') if hasattr(entry, 'content') else '',
-                'pub_date': pub_date,
+                'title': entry['title'] or 'No title',
+                'link': entry['link'],
+                'description': entry['description'],
+                'content': entry['content'],
+                'pub_date': entry['pub_date'],
                 'source_name': feed_name,
                 'source_url': feed_url,
-                'category': category
-            }
-            articles.append(article)
+                'category': category,
+                'simhash': article_fingerprint(entry),
+                'url_key': url_key(entry['link'] or guid)
+            })
+
+        if max_entries is not None and seen >= max_entries:
+            break
+
+    return articles
 
-        print(f"  Found {len(articles)} articles")
+def _fetch_articles(feed_url: str, feed_name: str, category: str, deadline: float,
+                    host_limiter: Optional[HostLimiter], state: Optional[Dict],
+                    known_guids: Optional[Set[str]], stream: bool,
+                    max_entries: Optional[int]) -> List[Dict]:
+    """Download and parse one feed, raising FeedTimeout once `deadline` passes."""
+    with host_limiter.slot(feed_url) if host_limiter else nullcontext():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise BudgetExhausted('no time left before the fetch could start')
+        response = open_feed(feed_url, request_timeout(deadline), state)
+
+        if response is not None and should_stream(response, stream):
+            try:
+                with response:
+                    if state is not None:
+                        state['content_hash'] = None
+                    entries = iter_entries(DeadlineReader(response.raw, deadline))
+                    articles = collect_articles(entries, feed_url, feed_name,
+                                                category, known_guids, max_entries=max_entries)
+                print(f"  {feed_name}: found {len(articles)} new articles (streamed)")
+                return articles
+            except ParseError as e:
+                # feedparser copes with markup the strict XML parser rejects
+                print(f"  {feed_name}: streaming parse failed ({e}), retrying with feedparser")
+                response = open_feed(feed_url, request_timeout(deadline))
+
+        body = read_feed_body(response, state, deadline) if response is not None else None
+
+    if body is None:
+        print(f"  {feed_name}: not modified since last fetch")
+        return []
+
+    articles = collect_articles(feedparser_entries(body), feed_url, feed_name,
+                                category, known_guids, max_entries=max_entries)
+
+    print(f"  {feed_name}: found {len(articles)} new articles")
+    return articles
+
+def parse_feed(feed_url: str, feed_name: str, category: str,
+               timeout: float = FEED_TIMEOUT,
+               host_limiter: Optional[HostLimiter] = None,
+               state: Optional[Dict] = None,
+               known_guids: Optional[Set[str]] = None,
+               stream: bool = False,
+               max_entries: Optional[int] = None,
+               run_deadline: Optional[float] = None,
+               health: Optional[Dict] = None) -> List[Dict]:
+    """
+    Parse an RSS feed and extract article information.
+
+    Feeds flagged with `stream` or larger than STREAM_THRESHOLD_BYTES are
+    parsed incrementally and stop downloading as soon as collection stops.
+    The whole fetch must finish within `timeout` seconds and before the
+    monotonic `run_deadline`; the outcome is recorded in `health` if given.
+    """
+    print(f"Fetching {feed_name}...")
+    started = time.monotonic()
+    deadline = started + timeout
+    if run_deadline is not None:
+        deadline = min(deadline, run_deadline)
+
+    try:
+        articles = _fetch_articles(feed_url, feed_name, category, deadline, host_limiter,
+                                   state, known_guids, stream, max_entries)
+        if health is not None:
+            record_success(health, time.monotonic() - started)
         return articles
 
+    except BudgetExhausted:
+        print(f"  {feed_name}: skipped, run budget exhausted")
+        return []
+
     except Exception as e:
         print(f"  Error parsing {feed_name}: {e}")
+        if health is not None:
+            record_failure(health, time.monotonic() - started, f"{type(e).__name__}: {e}")
+        if state is not None:
+            # Forget the validators so the next run downloads the feed in full
+            state.update(etag=None, last_modified=None, content_hash=None)
         return []
 
-def store_articles(articles: List[Dict], conn) -> int:
-    """Store articles in the database, skipping duplicates."""
-    if not articles:
-        return 0
+def fetch_feeds_concurrently(feeds: List[Dict],
+                             max_workers: int = MAX_CONCURRENT_FETCHES,
+                             per_host: int = MAX_FETCHES_PER_HOST,
+                             timeout: float = FEED_TIMEOUT,
+                             states: Optional[Dict[str, Dict]] = None,
+                             known_guids: Optional[Dict[str, Set[str]]] = None,
+                             max_entries: Optional[int] = None,
+                             registry: Optional[Dict[str, Dict]] = None,
+                             budget: Optional[float] = None) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """
+    Fetch and parse feeds on a thread pool, yielding (feed, articles) as each
+    one finishes so the caller can store results while slow feeds download.
+
+    If `states` is given, each feed's conditional GET state is looked up (and
+    created if missing) by URL and updated in place by its fetch. If
+    `known_guids` is given, entries already stored for a feed are skipped.
+    Feeds with `"stream": true` in their configuration are always streamed.
+    If `registry` is given, feeds whose circuit breaker is open are skipped and
+    every fetch outcome is recorded. With a `budget`, feeds still unfinished
+    after that many seconds are abandoned.
+    """
+    host_limiter = HostLimiter(per_host)
+    run_deadline = time.monotonic() + budget if budget else None
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+
+    try:
+        futures = {}
+        for feed in feeds:
+            health = None
+            if registry is not None:
+                health = registry_entry(registry, feed['url'], feed['name'])
+                if circuit_open(health):
+                    print(f"  {feed['name']}: skipped after {health['consecutive_failures']} failures"
+                          f" (circuit open until {health['open_until']:%Y-%m-%d %H:%M})")
+                    continue
+            state = None
+            if states is not None:
+                state = states.setdefault(feed['url'], {'feed_url': feed['url']})
+            known = None
+            if known_guids is not None:
+                known = known_guids.setdefault(feed['url'], set())
+            future = executor.submit(parse_feed, feed['url'], feed['name'], feed['category'],
+                                     timeout, host_limiter, state, known,
+                                     feed.get('stream', False), max_entries, run_deadline, health)
+            futures[future] = feed
+
+        wait = None if run_deadline is None else max(run_deadline - time.monotonic(), 0) + RUN_BUDGET_GRACE
+        try:
+            for future in as_completed(futures, timeout=wait):
+                yield futures[future], future.result()
+        except FuturesTimeout:
+            unfinished = [futures[future]['name'] for future in futures if not future.done()]
+            print(f"Run budget exhausted, abandoning {len(unfinished)} feeds: {', '.join(unfinished)}")
+
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+ARTICLE_COLUMNS = (
+    'guid', 'title', 'link', 'description', 'content',
+    'pub_date', 'source_name', 'source_url', 'category', 'simhash', 'url_key'
+)
 
+def _bulk_insert_articles(conn, articles: List[Dict]) -> Dict[bytes, int]:
+    """COPY a batch into a staging table and merge it with one INSERT ... SELECT."""
+    columns = ', '.join(ARTICLE_COLUMNS)
     cursor = conn.cursor()
-    stored_count = 0
+
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS articles_staging (
+            guid TEXT,
+            title TEXT,
+            link TEXT,
+            description TEXT,
+            content TEXT,
+            pub_date TIMESTAMP,
+            source_name TEXT,
+            source_url TEXT,
+            category TEXT,
+            simhash BIGINT,
+            url_key BYTEA
+        )
+    """)
+    cursor.execute("TRUNCATE articles_staging")
+
+    with cursor.copy(f"COPY articles_staging ({columns}) FROM STDIN") as copy:
+        for article in articles:
+            copy.write_row([article[column] for column in ARTICLE_COLUMNS])
+
+    cursor.execute(f"""
+        INSERT INTO articles ({columns})
+        SELECT {columns} FROM articles_staging
+        ON CONFLICT (url_key) DO NOTHING
+        RETURNING url_key, id
+    """)
+    new_ids = {bytes(key): article_id for key, article_id in cursor.fetchall()}
+    cursor.close()
+    return new_ids
+
+def _insert_articles_individually(conn, articles: List[Dict]) -> Dict[bytes, int]:
+    """Insert row by row, each in its own savepoint, so bad rows are skipped alone."""
+    columns = ', '.join(ARTICLE_COLUMNS)
+    placeholders = ', '.join(['%s'] * len(ARTICLE_COLUMNS))
+    cursor = conn.cursor()
+    new_ids = {}
 
     for article in articles:
         try:
-            cursor.execute("""
-                INSERT INTO articles
-                (guid, title, link, description, content, pub_date, source_name, source_url, category)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (guid) DO NOTHING
-                RETURNING id
-            """, (
-                article['guid'],
-                article['title'],
-                article['link'],
-                article['description'],
-                article['content'],
-                article['pub_date'],
-                article['source_name'],
-                article['source_url'],
-                article['category']
-            ))
-
-            if cursor.fetchone():
-                stored_count += 1
+            with conn.transaction():
+                cursor.execute(f"""
+                    INSERT INTO articles ({columns})
+                    VALUES ({placeholders})
+                    ON CONFLICT (url_key) DO NOTHING
+                    RETURNING id
+                """, [article[column] for column in ARTICLE_COLUMNS])
+                row = cursor.fetchone()
+                if row:
+                    new_ids[article['url_key']] = row[0]
 
         except Exception as e:
             print(f"  Error storing article '{article['title'][:50]}...': {e}")
-            conn.rollback()
             continue
 
+    cursor.close()
+    return new_ids
+
+def insert_articles(conn, articles: List[Dict]) -> Dict[bytes, int]:
+    """
+    Store a batch of articles and return the new rows' ids keyed by url_key.
+
+    The whole batch goes through COPY and a single set-based merge. If that
+    fails, the batch is retried row by row so only the offending rows are lost.
+    """
+    if not articles:
+        return {}
+
+    try:
+        with conn.transaction():
+            new_ids = _bulk_insert_articles(conn, articles)
+    except Exception as e:
+        print(f"  Bulk insert failed ({e}), retrying row by row")
+        new_ids = _insert_articles_individually(conn, articles)
+
+    conn.commit()
+    return new_ids
+
+def store_articles(articles: List[Dict], conn) -> int:
+    """Store articles in the database, skipping duplicates."""
+    return len(insert_articles(conn, articles))
+
+def backfill_url_keys(conn) -> Tuple[int, int]:
+    """
+    Compute url_key for articles stored before it existed.
+
+    Rows whose canonical URL is already taken are left without a key and
+    counted as duplicates. Once every row has been visited, the old unique
+    constraint on guid (whatever it is named) is dropped so url_key alone
+    carries uniqueness.
+    Returns (keyed, duplicates).
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, link, guid FROM articles WHERE url_key IS NULL ORDER BY id")
+
+    ids, keys, seen = [], [], set()
+    duplicates = 0
+    for article_id, link, guid in cursor.fetchall():
+        key = url_key(link or guid)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        ids.append(article_id)
+        keys.append(key)
+
+    cursor.execute("""
+        UPDATE articles a
+        SET url_key = d.url_key
+        FROM unnest(%s::int[], %s::bytea[]) AS d(id, url_key)
+        WHERE a.id = d.id
+          AND NOT EXISTS (SELECT 1 FROM articles b WHERE b.url_key = d.url_key)
+    """, (ids, keys))
+    keyed = cursor.rowcount
+    duplicates += len(ids) - keyed
+
+    drop_unique_constraints(cursor, 'articles', 'guid')
     conn.commit()
     cursor.close()
-    return stored_count
+    return keyed, duplicates
+
+def ingest_feeds(conn, feeds: List[Dict],
+                 workers: int = MAX_CONCURRENT_FETCHES,
+                 per_host: int = MAX_FETCHES_PER_HOST,
+                 timeout: float = FEED_TIMEOUT,
+                 max_entries: Optional[int] = None,
+                 budget: Optional[float] = RUN_BUDGET) -> Dict[str, int]:
+    """Fetch every feed and store its new articles, returning run totals."""
+    totals = {'feeds': 0, 'articles': 0, 'stored': 0, 'duplicates': 0, 'queued': 0}
+
+    states = load_feed_states(conn)
+    known_guids = load_known_guids(conn)
+    simhash_index = load_simhash_index(conn)
+    registry = load_registry(conn)
+    results = fetch_feeds_concurrently(feeds, workers, per_host, timeout,
+                                       states, known_guids, max_entries,
+                                       registry, budget)
+    for feed, articles in results:
+        new_ids = insert_articles(conn, articles)
+        stored = len(new_ids)
+        known_guids[feed['url']].update(article['guid'] for article in articles)
+
+        # Link syndicated copies to the story we already have (first article per stored row)
+        new_fingerprints = {}
+        for article in articles:
+            if article['url_key'] in new_ids:
+                new_fingerprints.setdefault(new_ids[article['url_key']], article['simhash'])
+        totals['duplicates'] += mark_near_duplicates(conn, simhash_index, list(new_fingerprints.items()))
+
+        # Hand the canonical copies to the curators
+        totals['queued'] += enqueue(conn, new_ids.values())
+        conn.commit()
+
+        # Only remember the validators once the articles are safely stored
+        if states[feed['url']].get('last_fetched_at'):
+            save_feed_state(conn, states[feed['url']])
+        save_registry(conn, [registry[feed['url']]])
+        totals['feeds'] += 1
+        totals['articles'] += len(articles)
+        totals['stored'] += stored
 
-def main():
+        if stored > 0:
+            print(f"  {feed['name']}: stored {stored} new articles\n")
+        else:
+            print(f"  {feed['name']}: no new articles\n")
+
+    return totals
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Fetch RSS feeds into the newsletter database.')
+    parser.add_argument('--workers', type=int, default=MAX_CONCURRENT_FETCHES,
+                        help='Maximum feeds fetched at the same time (1 = sequential)')
+    parser.add_argument('--per-host', type=int, default=MAX_FETCHES_PER_HOST,
+                        help='Maximum simultaneous requests against one host')
+    parser.add_argument('--timeout', type=float, default=FEED_TIMEOUT,
+                        help='Seconds allowed to download each feed')
+    parser.add_argument('--budget', type=float, default=RUN_BUDGET,
+                        help='Seconds allowed for the whole fetch run')
+    parser.add_argument('--max-entries', type=int, default=None,
+                        help='Stop reading each feed after this many entries')
+    parser.add_argument('--backfill-url-keys', action='store_true',
+                        help='Compute canonical URL keys for existing articles and exit')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function."""
+    args = parse_args(argv)
     print(f"RSS Monitor started at {datetime.now()}")
     print("="*60)
 
@@ -133,28 +598,23 @@ def main():
         conn = psycopg.connect(**DB_CONFIG)
         print("Connected!\n")
 
-        # Process each feed
-        total_articles = 0
-        total_stored = 0
-
-        for feed in feeds:
-            articles = parse_feed(feed['url'], feed['name'], feed['category'])
-            stored = store_articles(articles, conn)
-            total_articles += len(articles)
-            total_stored += stored
-
-            if stored > 0:
-                print(f"  Stored {stored} new articles\n")
-            else:
-                print(f"  No new articles\n")
+        if args.backfill_url_keys:
+            keyed, duplicates = backfill_url_keys(conn)
+            print(f"Backfilled url_key for {keyed} articles ({duplicates} duplicate URLs left unkeyed)")
+            conn.close()
+            return 0
 
+        totals = ingest_feeds(conn, feeds, args.workers, args.per_host, args.timeout,
+                              args.max_entries, args.budget)
         conn.close()
 
         # Summary
         print("="*60)
         print(f"Summary:")
-        print(f"  Total articles found: {total_articles}")
-        print(f"  New articles stored: {total_stored}")
+        print(f"  Total articles found: {totals['articles']}")
+        print(f"  New articles stored: {totals['stored']}")
+        print(f"  Near-duplicates linked: {totals['duplicates']}")
+        print(f"  Queued for scoring: {totals['queued']}")
         print(f"Completed at {datetime.now()}")
 
         return 0
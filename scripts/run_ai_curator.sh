@@ -1,7 +1,7 @@
 #!/bin/bash
 # AI Curator Runner Script
 # Scores articles using Claude API
-# Run after RSS monitor completes
+# Run after RSS monitor completes, or with --follow to score articles as they arrive
 
 cd "$(dirname "$0")/.."
 
@@ -14,4 +14,4 @@ if [ -z "$ANTHROPIC_API_KEY" ]; then
 fi
 
 source venv/bin/activate
-python3 scripts/ai_curator.py >> logs/ai_curator.log 2>&1
+python3 scripts/ai_curator.py "$@" >> logs/ai_curator.log 2>&1
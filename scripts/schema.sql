@@ -1,15 +1,18 @@
 -- Articles table to store fetched RSS items
 CREATE TABLE IF NOT EXISTS articles (
     id SERIAL PRIMARY KEY,
-    guid VARCHAR(500) UNIQUE NOT NULL,
+    guid VARCHAR(500) NOT NULL,
     title TEXT NOT NULL,
     link TEXT NOT NULL,
+    url_key BYTEA NOT NULL, -- 16-byte hash of the canonical link (unique index below)
     description TEXT,
     content TEXT,
     pub_date TIMESTAMP,
     source_name VARCHAR(200) NOT NULL,
     source_url TEXT NOT NULL,
     category VARCHAR(100),
+    simhash BIGINT, -- SimHash of title + description for near-duplicate detection
+    canonical_id INTEGER REFERENCES articles(id) ON DELETE SET NULL, -- set on syndicated copies
     fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -24,10 +27,82 @@ CREATE TABLE IF NOT EXISTS article_scores (
     overall_score DECIMAL(3,2),
     reasoning TEXT,
     ai_model VARCHAR(100),
+    prompt_version VARCHAR(50), -- NULL for scores stored before prompts were versioned
     scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(article_id)
 );
 
+-- Every model result per article and prompt version (article_scores holds the final one)
+CREATE TABLE IF NOT EXISTS article_score_history (
+    id SERIAL PRIMARY KEY,
+    article_id INTEGER REFERENCES articles(id) ON DELETE CASCADE,
+    ai_model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(50) NOT NULL,
+    relevance_score DECIMAL(3,2),
+    quality_score DECIMAL(3,2),
+    novelty_score DECIMAL(3,2),
+    overall_score DECIMAL(3,2),
+    reasoning TEXT,
+    scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(article_id, ai_model, prompt_version)
+);
+
+-- Articles waiting to be scored, leased to curator workers with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS scoring_queue (
+    article_id INTEGER PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending', -- pending, leased or dead
+    priority TIMESTAMP, -- pub_date: newest articles are leased first
+    attempts INTEGER NOT NULL DEFAULT 0,
+    leased_by TEXT,
+    lease_expires_at TIMESTAMP,
+    last_error TEXT,
+    enqueued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Articles that failed permanently (e.g. unparseable output), kept with the raw response
+CREATE TABLE IF NOT EXISTS scoring_dead_letters (
+    id SERIAL PRIMARY KEY,
+    article_id INTEGER REFERENCES articles(id) ON DELETE CASCADE,
+    ai_model VARCHAR(100),
+    prompt_version VARCHAR(50),
+    error TEXT NOT NULL,
+    raw_response TEXT,
+    failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One row per Messages API attempt: usage, wall latency and outcome for tuning and cost reports
+CREATE TABLE IF NOT EXISTS scoring_calls (
+    id BIGSERIAL PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    called_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ai_model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(50),
+    article_ids INTEGER[] NOT NULL, -- articles in the request (several for batched calls)
+    input_tokens INTEGER DEFAULT 0, -- uncached prompt tokens
+    output_tokens INTEGER DEFAULT 0,
+    cache_read_tokens INTEGER DEFAULT 0,
+    cache_write_tokens INTEGER DEFAULT 0,
+    latency_ms DOUBLE PRECISION,
+    outcome VARCHAR(20) NOT NULL, -- ok, rate_limited, timeout, connection_error, server_error, client_error
+    cost_usd NUMERIC(12,6) -- NULL for models without a price in call_log.MODEL_PRICES
+);
+
+-- Progress of each bulk re-scoring run (`backfill.py run --name ...`), for resuming
+CREATE TABLE IF NOT EXISTS backfill_runs (
+    name TEXT PRIMARY KEY,
+    ai_model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(50) NOT NULL,
+    filters JSONB NOT NULL, -- the slice being re-scored
+    last_article_id INTEGER NOT NULL DEFAULT 0, -- checkpoint: every article up to here was attempted; failures are retried at the end
+    scored INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    retrying BOOLEAN NOT NULL DEFAULT false, -- in the end-of-slice sweep over failed articles
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
 -- Newsletter items table
 CREATE TABLE IF NOT EXISTS newsletter_items (
     id SERIAL PRIMARY KEY,
@@ -42,10 +117,66 @@ CREATE TABLE IF NOT EXISTS newsletter_items (
     UNIQUE(article_id, newsletter_date)
 );
 
+-- Per-feed HTTP cache state for conditional GETs
+CREATE TABLE IF NOT EXISTS feed_state (
+    feed_url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash CHAR(64), -- sha256 of the last downloaded body
+    last_fetched_at TIMESTAMP
+);
+
+-- Per-feed health and circuit breaker state
+CREATE TABLE IF NOT EXISTS feed_registry (
+    feed_url TEXT PRIMARY KEY,
+    feed_name VARCHAR(200),
+    last_attempt_at TIMESTAMP,
+    last_success_at TIMESTAMP,
+    avg_latency_ms DOUBLE PRECISION, -- smoothed fetch latency
+    consecutive_failures INTEGER DEFAULT 0,
+    total_fetches INTEGER DEFAULT 0,
+    total_failures INTEGER DEFAULT 0,
+    last_error TEXT,
+    open_until TIMESTAMP -- circuit breaker: feed is skipped until this time
+);
+
+-- Scores keyed by a hash of (normalized title, description, source, model, prompt version)
+CREATE TABLE IF NOT EXISTS score_cache (
+    cache_key BYTEA PRIMARY KEY, -- 16-byte BLAKE2b digest
+    ai_model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(50) NOT NULL,
+    relevance_score DECIMAL(3,2),
+    quality_score DECIMAL(3,2),
+    novelty_score DECIMAL(3,2),
+    overall_score DECIMAL(3,2),
+    reasoning TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- entries expire after the TTL
+    last_hit_at TIMESTAMP,
+    hits INTEGER DEFAULT 0
+);
+
+-- Migrations for databases created before the columns above existed
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS simhash BIGINT;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS canonical_id INTEGER REFERENCES articles(id) ON DELETE SET NULL;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS url_key BYTEA;
+ALTER TABLE article_scores ADD COLUMN IF NOT EXISTS prompt_version VARCHAR(50);
+ALTER TABLE backfill_runs ADD COLUMN IF NOT EXISTS retrying BOOLEAN NOT NULL DEFAULT false;
+-- Existing rows: run `rss_monitor.py --backfill-url-keys` to key them and drop the guid constraint
+-- Unscored articles from before the queue existed: run `ai_curator.py --enqueue-backlog` once
+
+-- Deduplication is enforced on the canonical URL key
+CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_url_key ON articles(url_key);
+
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_articles_pub_date ON articles(pub_date DESC);
 CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source_name);
 CREATE INDEX IF NOT EXISTS idx_articles_fetched ON articles(fetched_at DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_canonical ON articles(canonical_id) WHERE canonical_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_score_cache_created ON score_cache(created_at);
+CREATE INDEX IF NOT EXISTS idx_scoring_queue_ready ON scoring_queue(priority DESC) WHERE status <> 'dead';
+CREATE INDEX IF NOT EXISTS idx_dead_letters_article ON scoring_dead_letters(article_id);
+CREATE INDEX IF NOT EXISTS idx_scoring_calls_called ON scoring_calls(called_at);
+CREATE INDEX IF NOT EXISTS idx_scoring_calls_run ON scoring_calls(run_id);
 CREATE INDEX IF NOT EXISTS idx_scores_overall ON article_scores(overall_score DESC);
 CREATE INDEX IF NOT EXISTS idx_newsletter_date ON newsletter_items(newsletter_date);
 CREATE INDEX IF NOT EXISTS idx_newsletter_approved ON newsletter_items(human_approved);
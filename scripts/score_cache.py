@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Content-hash score cache for the AI Ethics Newsletter curators
+Keys scores on the normalized article text plus model and prompt version, so an
+item re-ingested under a new URL/GUID is scored once within the TTL.
+Each pipeline keeps its own score_cache in its own database (Render's
+DATABASE_URL for the root curator, the local DB_CONFIG here), and their keys
+differ in model, prompt version and text (the root curator has no
+descriptions), so the two curators never share entries.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, Optional
+
+CACHE_KEY_BYTES = 16
+SCORE_CACHE_TTL_DAYS = 90          # Entries older than this are ignored and evicted
+SCORE_CACHE_MAX_ENTRIES = None     # Optional cap; least recently used rows are evicted first
+
+def _normalize(text: Optional[str]) -> str:
+    return re.sub(r'\s+', ' ', (text or '').lower()).strip()
+
+def score_cache_key(title: str, description: Optional[str], source: str,
+                    model: str, prompt_version: str) -> bytes:
+    """Hash the article text the model sees together with what produced the score."""
+    parts = (_normalize(title), _normalize(description), _normalize(source), model, prompt_version)
+    return hashlib.blake2b('\x1f'.join(parts).encode(), digest_size=CACHE_KEY_BYTES).digest()
+
+class ScoreCache:
+    """Look up and record scores for one model and prompt version, counting hits."""
+
+    def __init__(self, conn, model: str, prompt_version: str,
+                 ttl_days: float = SCORE_CACHE_TTL_DAYS,
+                 max_entries: Optional[int] = SCORE_CACHE_MAX_ENTRIES):
+        self.conn = conn
+        self.model = model
+        self.prompt_version = prompt_version
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, title: str, description: Optional[str], source: str) -> bytes:
+        return score_cache_key(title, description, source, self.model, self.prompt_version)
+
+    def lookup(self, keys: Iterable[bytes]) -> Dict[bytes, Dict]:
+        """Return fresh cached scores for the given keys, counting hits and misses."""
+        keys = list(set(keys))
+        if not keys:
+            return {}
+
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            UPDATE score_cache
+            SET hits = hits + 1, last_hit_at = NOW()
+            WHERE cache_key = ANY(%s)
+              AND created_at > NOW() - %s * INTERVAL '1 day'
+            RETURNING cache_key, ai_model, relevance_score, quality_score, novelty_score, overall_score, reasoning
+        """, (keys, self.ttl_days))
+
+        found = {}
+        for key, ai_model, relevance, quality, novelty, overall, reasoning in cursor.fetchall():
+            found[bytes(key)] = {
+                'ai_model': ai_model,
+                'relevance_score': float(relevance),
+                'quality_score': float(quality),
+                'novelty_score': float(novelty),
+                'overall_score': float(overall),
+                'reasoning': reasoning
+            }
+        self.conn.commit()
+        cursor.close()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def store(self, key: bytes, scores: Dict) -> None:
+        """
+        Record freshly computed scores (the caller commits).
+
+        scores may carry an 'ai_model' naming the model that produced them when
+        it differs from the cache's model setup (e.g. one tier of a cascade).
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO score_cache
+            (cache_key, ai_model, prompt_version, relevance_score, quality_score,
+             novelty_score, overall_score, reasoning)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (cache_key) DO UPDATE SET
+                relevance_score = EXCLUDED.relevance_score,
+                quality_score = EXCLUDED.quality_score,
+                novelty_score = EXCLUDED.novelty_score,
+                overall_score = EXCLUDED.overall_score,
+                reasoning = EXCLUDED.reasoning,
+                ai_model = EXCLUDED.ai_model,
+                created_at = NOW()
+        """, (
+            key, scores.get('ai_model', self.model), self.prompt_version,
+            scores['relevance_score'], scores['quality_score'],
+            scores['novelty_score'], scores['overall_score'], scores['reasoning']
+        ))
+        cursor.close()
+
+    def evict(self) -> int:
+        """Delete expired entries and, when capped, the least recently used excess."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            DELETE FROM score_cache
+            WHERE created_at <= NOW() - %s * INTERVAL '1 day'
+        """, (self.ttl_days,))
+        evicted = cursor.rowcount
+
+        if self.max_entries is not None:
+            cursor.execute("""
+                DELETE FROM score_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM score_cache
+                    ORDER BY COALESCE(last_hit_at, created_at) DESC
+                    OFFSET %s
+                )
+            """, (self.max_entries,))
+            evicted += cursor.rowcount
+
+        self.conn.commit()
+        cursor.close()
+        return evicted
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Concurrent scoring engine for the AI Ethics Newsletter curators
+Runs Claude calls on asyncio with bounded concurrency behind a token-bucket
+limiter on requests/min and tokens/min, pausing on 429 retry-after. Transient
+API errors are retried with exponential backoff and jitter; anything else is
+left to the caller as permanent.
+"""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from anthropic import APIConnectionError, APIStatusError, APITimeoutError, AsyncAnthropic, RateLimitError
+
+SCORING_CONCURRENCY = 8
+REQUESTS_PER_MINUTE = 50
+TOKENS_PER_MINUTE = 40000
+BACKFILL_RATE_SHARE = 0.25    # Share of the API rate limits a backfill may use; live scoring keeps the rest
+MAX_RETRIES = 5               # Retries of a transient error before giving up
+BACKOFF_BASE = 1.0            # First retry waits up to this many seconds, doubling each time
+BACKOFF_CAP = 60.0
+DEFAULT_RETRY_AFTER = 10.0    # Seconds to pause on a 429 without a retry-after header
+CHARS_PER_TOKEN = 4           # Rough prompt size estimate before usage is known
+
+class TokenBucket:
+    """Continuously refilling bucket holding at most `per_minute` units."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill(now)
+        # Requests larger than the bucket may go once it is full
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+class RateLimiter:
+    """Gate calls on both requests/min and tokens/min, plus server-requested pauses."""
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+        self.refunded = asyncio.Event()
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and `tokens` tokens can be spent, then spend them."""
+        # Holding the lock while sleeping keeps waiters in FIFO order
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now)
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return
+                # Wake early if a finished call hands back unused tokens
+                self.refunded.clear()
+                try:
+                    await asyncio.wait_for(self.refunded.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once a call's real usage is known."""
+        if actual < estimated:
+            self.tokens.give(estimated - actual)
+            self.refunded.set()
+        else:
+            self.tokens.take(actual - estimated)
+
+    def capacity(self, tokens_per_request: int) -> Tuple[int, float]:
+        """
+        Requests of this size that could start right now without waiting.
+
+        Returns (requests, 0) when there is room, or (0, seconds until one fits).
+        """
+        now = time.monotonic()
+        wait = max(
+            self.paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens_per_request, now)
+        )
+        if wait > 0:
+            return 0, wait
+        return max(int(min(self.requests.level, self.tokens.level / max(tokens_per_request, 1))), 1), 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Stop issuing requests for `seconds` (e.g. from a 429 retry-after)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+def estimate_tokens(request: Dict) -> int:
+    """Upper-bound a request's token cost: prompt size estimate plus max_tokens."""
+    system = request.get('system', '')
+    if isinstance(system, list):
+        system = ''.join(block['text'] for block in system)
+    chars = len(system)
+    for message in request['messages']:
+        chars += len(str(message['content']))
+    return chars // CHARS_PER_TOKEN + request['max_tokens']
+
+class UsageTotals:
+    """Running token counts across a run's API calls, optionally logging each attempt."""
+
+    def __init__(self, log=None):
+        self.log = log  # call_log.CallLog recording every attempt, if given
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def add(self, message) -> None:
+        usage = message.usage
+        self.calls += 1
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+
+def usage_tokens(message) -> int:
+    """Tokens a response actually consumed."""
+    usage = message.usage
+    return (usage.input_tokens + usage.output_tokens
+            + (getattr(usage, 'cache_creation_input_tokens', None) or 0)
+            + (getattr(usage, 'cache_read_input_tokens', None) or 0))
+
+class ScoringError(Exception):
+    """A failed scoring attempt; permanent failures keep the raw model output for the dead-letter table."""
+
+    def __init__(self, message: str, transient: bool, raw_response: Optional[str] = None):
+        super().__init__(message)
+        self.transient = transient
+        self.raw_response = raw_response
+
+def is_transient(error: Exception) -> bool:
+    """True for errors worth retrying: timeouts, dropped connections, 408/409/429 and 5xx."""
+    if isinstance(error, ScoringError):
+        return error.transient
+    if isinstance(error, APIConnectionError):  # includes APITimeoutError
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+def call_outcome(error: Exception) -> str:
+    """Outcome label logged for a failed API attempt."""
+    if isinstance(error, RateLimitError):
+        return 'rate_limited'
+    if isinstance(error, APITimeoutError):
+        return 'timeout'
+    if isinstance(error, APIConnectionError):
+        return 'connection_error'
+    if isinstance(error, APIStatusError):
+        return 'server_error' if error.status_code >= 500 else 'client_error'
+    return 'error'
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def _retry_after(error: RateLimitError) -> float:
+    try:
+        return float(error.response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+def async_client(api_key: str) -> AsyncAnthropic:
+    """Client whose retries are left to create_message instead of the SDK."""
+    return AsyncAnthropic(api_key=api_key, max_retries=0)
+
+async def create_message(client: AsyncAnthropic, limiter: RateLimiter, request: Dict,
+                         usage: Optional[UsageTotals] = None,
+                         max_retries: int = MAX_RETRIES, article_ids: Sequence[int] = ()):
+    """
+    Send one Messages API request through the limiter, retrying transient errors.
+
+    A 429 pauses every caller for its retry-after; other transient errors back
+    off this call alone. Permanent errors (e.g. 400s) are raised immediately.
+    Each attempt is recorded, against `article_ids`, in the usage call log if any.
+    """
+    calls = usage.log if usage is not None else None
+    estimated = estimate_tokens(request)
+    for attempt in range(max_retries + 1):
+        await limiter.acquire(estimated)
+        started = time.monotonic()
+        try:
+            message = await client.messages.create(**request)
+        except Exception as e:
+            limiter.settle(estimated, 0)
+            if calls is not None:
+                calls.add(request['model'], article_ids, (time.monotonic() - started) * 1000, call_outcome(e))
+            if attempt == max_retries or not is_transient(e):
+                raise
+            if isinstance(e, RateLimitError):
+                limiter.pause(_retry_after(e))
+            # Jitter spreads the retries of calls that failed together
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+
+        limiter.settle(estimated, usage_tokens(message))
+        if usage is not None:
+            usage.add(message)
+        if calls is not None:
+            calls.add(request['model'], article_ids, (time.monotonic() - started) * 1000, 'ok', message)
+        return message
+
+async def run_concurrently(items: Iterable, worker: Callable[..., Awaitable],
+                           concurrency: int = SCORING_CONCURRENCY):
+    """
+    Run `worker(item)` over items with at most `concurrency` in flight.
+
+    Yields (item, result) pairs as they complete; an exception raised by the
+    worker is yielded as the result.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def guarded(item) -> Tuple[object, object]:
+        async with semaphore:
+            try:
+                return item, await worker(item)
+            except Exception as e:
+                return item, e
+
+    tasks = [asyncio.create_task(guarded(item)) for item in items]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Scoring work queue for the AI Ethics Newsletter curators
+Articles are enqueued at ingest and leased with FOR UPDATE SKIP LOCKED, so any
+number of curator processes can share the backlog without scoring an article
+twice. Leases expire if a worker dies; articles that keep failing are marked
+dead instead of being handed out again. Permanent failures go straight to the
+dead-letter table with the model output that broke them. Every enqueue sends
+a NOTIFY so a following curator (`ai_curator.py --follow`) can start at once.
+"""
+
+import os
+import socket
+from typing import Dict, Iterable, List, Optional
+
+LEASE_SECONDS = 600     # A leased article is handed out again if not finished by then
+MAX_ATTEMPTS = 3        # Leases before an article is marked dead
+NOTIFY_CHANNEL = 'scoring_queue'  # Payload is the queued article id, delivered on commit
+
+def worker_id() -> str:
+    """Identify this process in lease records."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def enqueue(conn, article_ids: Iterable[int]) -> int:
+    """Queue canonical articles for scoring and notify listeners (the caller commits)."""
+    article_ids = list(article_ids)
+    if not article_ids:
+        return 0
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        WITH queued AS (
+            INSERT INTO scoring_queue (article_id, priority)
+            SELECT id, COALESCE(pub_date, fetched_at)
+            FROM articles
+            WHERE id = ANY(%s)
+              AND canonical_id IS NULL
+            ON CONFLICT (article_id) DO NOTHING
+            RETURNING article_id
+        )
+        SELECT pg_notify(%s, article_id::text) FROM queued
+    """, (article_ids, NOTIFY_CHANNEL))
+    queued = len(cursor.fetchall())
+    cursor.close()
+    return queued
+
+def enqueue_backlog(conn) -> int:
+    """One-off sweep queuing every unscored canonical article not already queued."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO scoring_queue (article_id, priority)
+        SELECT a.id, COALESCE(a.pub_date, a.fetched_at)
+        FROM articles a
+        LEFT JOIN article_scores s ON a.id = s.article_id
+        WHERE s.id IS NULL
+          AND a.canonical_id IS NULL
+        ON CONFLICT (article_id) DO NOTHING
+    """)
+    queued = cursor.rowcount
+    if queued:
+        cursor.execute("SELECT pg_notify(%s, 'backlog')", (NOTIFY_CHANNEL,))
+    conn.commit()
+    cursor.close()
+    return queued
+
+def lease(conn, limit: int, owner: str, lease_seconds: int = LEASE_SECONDS,
+          max_attempts: int = MAX_ATTEMPTS) -> List[int]:
+    """
+    Claim up to `limit` articles, newest first, skipping rows other workers hold.
+
+    Expired leases that have used up their attempts are marked dead first.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE scoring_queue
+        SET status = 'dead', leased_by = NULL, lease_expires_at = NULL, updated_at = NOW(),
+            last_error = COALESCE(last_error, 'lease expired')
+        WHERE status = 'leased'
+          AND lease_expires_at < NOW()
+          AND attempts >= %s
+    """, (max_attempts,))
+
+    cursor.execute("""
+        UPDATE scoring_queue q
+        SET status = 'leased',
+            leased_by = %s,
+            lease_expires_at = NOW() + %s * INTERVAL '1 second',
+            attempts = q.attempts + 1,
+            updated_at = NOW()
+        FROM (
+            SELECT article_id
+            FROM scoring_queue
+            WHERE status = 'pending'
+               OR (status = 'leased' AND lease_expires_at < NOW())
+            ORDER BY priority DESC NULLS LAST
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        ) claimed
+        WHERE q.article_id = claimed.article_id
+        RETURNING q.article_id
+    """, (owner, lease_seconds, limit))
+
+    article_ids = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+    cursor.close()
+    return article_ids
+
+def complete(conn, article_ids: Iterable[int]) -> None:
+    """Remove finished articles from the queue (the caller commits with their scores)."""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM scoring_queue WHERE article_id = ANY(%s)", (list(article_ids),))
+    cursor.close()
+
+def fail(conn, article_id: int, error: str, max_attempts: int = MAX_ATTEMPTS) -> None:
+    """Release a failed lease, marking the article dead once it is out of attempts."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE scoring_queue
+        SET status = CASE WHEN attempts >= %s THEN 'dead' ELSE 'pending' END,
+            leased_by = NULL,
+            lease_expires_at = NULL,
+            last_error = %s,
+            updated_at = NOW()
+        WHERE article_id = %s
+    """, (max_attempts, error[:1000], article_id))
+    conn.commit()
+    cursor.close()
+
+def dead_letter(conn, article_id: int, ai_model: str, prompt_version: str,
+                error: str, raw_response: Optional[str] = None) -> None:
+    """Record an article that cannot be scored, with the raw response (the caller commits)."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO scoring_dead_letters (article_id, ai_model, prompt_version, error, raw_response)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (article_id, ai_model, prompt_version, error[:1000], raw_response))
+    cursor.close()
+
+def queue_counts(conn) -> Dict[str, int]:
+    """Number of queued articles in each status."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT status, COUNT(*) FROM scoring_queue GROUP BY status")
+    counts = dict(cursor.fetchall())
+    conn.commit()
+    cursor.close()
+    return counts
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Minimal compiled template engine for the AI Ethics Newsletter
+Templates use `{{ name }}` placeholders. Each template is parsed once into
+alternating literal and field parts, so rendering is a single join with every
+field HTML-escaped unless it is already Markup (a rendered fragment).
+"""
+
+import html
+import os
+import re
+from typing import Dict, List, Tuple
+
+PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+class Markup(str):
+    """A string that is already safe HTML and is inserted without escaping."""
+
+def escape(value) -> str:
+    """HTML-escape a value for element text or a quoted attribute.
+
+    `{{` is escaped too, so article text cannot reach Listmonk as a template tag.
+    """
+    if isinstance(value, Markup):
+        return value
+    return html.escape('' if value is None else str(value), quote=True).replace('{{', '&#123;&#123;')
+
+class Template:
+    """A template parsed once into literal text and field names."""
+
+    def __init__(self, source: str):
+        self.literals: List[str] = []
+        self.fields: List[str] = []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            self.literals.append(source[position:match.start()])
+            self.fields.append(match.group(1))
+            position = match.end()
+        self.literals.append(source[position:])
+
+    def render(self, context: Dict) -> Markup:
+        """Fill every field in one pass; a missing field raises KeyError."""
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            parts.append(escape(context[field]))
+            parts.append(literal)
+        return Markup(''.join(parts))
+
+_templates: Dict[str, Tuple[float, Template]] = {}
+
+def load_template(path: str) -> Template:
+    """Compile a template file, reusing the compiled form until the file changes."""
+    mtime = os.path.getmtime(path)
+    cached = _templates.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'r') as f:
+            cached = (mtime, Template(f.read()))
+        _templates[path] = cached
+    return cached[1]
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Tests for listmonk_client against a local stand-in Listmonk server
+Run: python3 scripts/test_listmonk_client.py   (or with pytest)
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from listmonk_client import ListmonkClient, ListmonkError, campaign_key
+
+USERNAME = 'admin'
+PASSWORD = 'listmonk'
+
+class StandInListmonk(ThreadingHTTPServer):
+    """Just enough of the Listmonk campaigns API, with injectable faults.
+
+    `faults` maps (method, path) to a list of actions consumed one per request:
+    ('status', code) replies with an error and does nothing, ('after', code)
+    does the work and then replies with an error, ('sleep', seconds) delays the reply.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.campaigns = {}
+        self.next_id = 1
+        self.faults = {}
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def handle_error(self, request, client_address):
+        pass    # clients that time out close the socket before the delayed reply
+
+    def fault(self, method: str, path: str, *actions) -> None:
+        self.faults.setdefault((method, path), []).extend(actions)
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, so connection reuse is observable
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method: str) -> None:
+        server = self.server
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        with server.lock:
+            server.requests.append((method, url.path))
+            server.connections.add(self.client_address)
+            actions = server.faults.get((method, url.path))
+            action = actions.pop(0) if actions else None
+
+        if self.headers.get('Authorization') is None:
+            return self._reply(401, {'message': 'unauthorized'})
+        if action and action[0] == 'sleep':
+            time.sleep(action[1])
+        if action and action[0] == 'status':
+            return self._reply(action[1], {'message': 'injected failure'})
+
+        status, data = self._route(method, url, body)
+        if action and action[0] == 'after':
+            return self._reply(action[1], {'message': 'injected failure after the work was done'})
+        self._reply(status, {'data': data} if status < 400 else {'message': data})
+
+    def _route(self, method: str, url, body):
+        server = self.server
+        parts = url.path.strip('/').split('/')   # api, campaigns[, id[, status]]
+        with server.lock:
+            if parts == ['api', 'campaigns'] and method == 'GET':
+                query = parse_qs(url.query).get('query', [''])[0]
+                results = [c for c in server.campaigns.values() if query in c['name'] or query in c['subject']]
+                results.sort(key=lambda c: c['id'], reverse=True)
+                return 200, {'results': results, 'total': len(results)}
+            if parts == ['api', 'campaigns'] and method == 'POST':
+                campaign = dict(body, id=server.next_id, status='draft',
+                                lists=[{'id': list_id} for list_id in body['lists']])
+                server.campaigns[campaign['id']] = campaign
+                server.next_id += 1
+                return 200, campaign
+
+            campaign = server.campaigns.get(int(parts[2])) if len(parts) > 2 else None
+            if campaign is None:
+                return 404, 'campaign not found'
+            if len(parts) == 3 and method == 'GET':
+                return 200, campaign
+            if len(parts) == 3 and method == 'PUT':
+                campaign.update({key: body[key] for key in ('subject', 'body')})
+                return 200, campaign
+            if len(parts) == 4 and parts[3] == 'status' and method == 'PUT':
+                if campaign['status'] == 'running':
+                    return 400, 'campaign is already running'
+                campaign['status'] = body['status']
+                return 200, campaign
+        return 404, 'not found'
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+def start_server() -> StandInListmonk:
+    server = StandInListmonk()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_client(server: StandInListmonk, **kwargs) -> ListmonkClient:
+    kwargs.setdefault('backoff_factor', 0.01)
+    return ListmonkClient(server.url, USERNAME, PASSWORD, **kwargs)
+
+def create(client: ListmonkClient, subject: str = 'Issue', body: str = '<p>hi</p>'):
+    return client.create_campaign('2025-02-03', subject, body, [3])
+
+def test_create_then_rerun_reuses_campaign():
+    server = start_server()
+    with make_client(server) as client:
+        first = create(client, body='<p>v1</p>')
+        second = create(client, subject='Issue (corrected)', body='<p>v2</p>')
+    assert first['id'] == second['id']
+    assert len(server.campaigns) == 1
+    campaign = server.campaigns[first['id']]
+    assert campaign['name'] == campaign_key('2025-02-03', [3])
+    assert (campaign['subject'], campaign['body']) == ('Issue (corrected)', '<p>v2</p>')
+    server.shutdown()
+
+def test_failure_after_create_does_not_duplicate():
+    server = start_server()
+    server.fault('POST', '/api/campaigns', ('after', 502))
+    with make_client(server) as client:
+        campaign = create(client)
+    assert len(server.campaigns) == 1
+    assert campaign['id'] == 1
+    assert [r for r in server.requests if r[0] == 'POST'] == [('POST', '/api/campaigns')]
+    server.shutdown()
+
+def test_transient_errors_are_retried():
+    server = start_server()
+    server.fault('GET', '/api/campaigns', ('status', 503), ('status', 429))
+    server.fault('POST', '/api/campaigns', ('status', 500))
+    with make_client(server) as client:
+        campaign = create(client)
+    assert campaign['status'] == 'draft'
+    assert len(server.campaigns) == 1
+    server.shutdown()
+
+def test_client_errors_are_not_retried():
+    server = start_server()
+    server.fault('POST', '/api/campaigns', ('status', 400), ('status', 400))
+    with make_client(server) as client:
+        try:
+            create(client)
+            assert False, 'expected ListmonkError'
+        except ListmonkError as e:
+            assert e.status == 400
+    assert sum(1 for r in server.requests if r[0] == 'POST') == 1
+    server.shutdown()
+
+def test_retries_are_bounded():
+    server = start_server()
+    server.fault('GET', '/api/campaigns', *[('status', 503)] * 10)
+    with make_client(server, max_retries=2) as client:
+        try:
+            create(client)
+            assert False, 'expected ListmonkError'
+        except ListmonkError as e:
+            assert e.status == 503
+    assert len(server.requests) == 3
+    server.shutdown()
+
+def test_read_timeout_is_bounded_and_retried():
+    server = start_server()
+    server.fault('GET', '/api/campaigns/1', ('sleep', 1.0))
+    with make_client(server, timeout=(1.0, 0.2)) as client:
+        create(client)
+        started = time.monotonic()
+        assert client.get_campaign(1)['id'] == 1
+        assert time.monotonic() - started < 1.0
+    with make_client(server, timeout=(1.0, 0.2), max_retries=0) as client:
+        server.fault('GET', '/api/campaigns/1', ('sleep', 1.0))
+        try:
+            client.get_campaign(1)
+            assert False, 'expected ListmonkError'
+        except ListmonkError:
+            pass
+    server.shutdown()
+
+def test_send_is_idempotent():
+    server = start_server()
+    with make_client(server) as client:
+        campaign = create(client)
+        assert client.send_campaign(campaign['id'])['status'] == 'running'
+        assert client.send_campaign(campaign['id'])['status'] == 'running'
+        # A rerun after sending returns the sent campaign untouched
+        rerun = create(client, body='<p>changed</p>')
+    assert rerun['id'] == campaign['id']
+    assert server.campaigns[campaign['id']]['body'] == '<p>hi</p>'
+    assert sum(1 for r in server.requests if r == ('PUT', '/api/campaigns/1/status')) == 1
+    server.shutdown()
+
+def test_session_reuses_connection():
+    server = start_server()
+    with make_client(server) as client:
+        campaign = create(client)
+        for _ in range(5):
+            client.get_campaign(campaign['id'])
+    assert len(server.requests) >= 7
+    assert len(server.connections) == 1
+    server.shutdown()
+
+def test_separate_lists_get_separate_campaigns():
+    server = start_server()
+    with make_client(server) as client:
+        first = client.create_campaign('2025-02-03', 'Issue', '<p>hi</p>', [3])
+        second = client.create_campaign('2025-02-03', 'Issue', '<p>hi</p>', [4])
+        third = client.create_campaign('2025-02-06', 'Issue', '<p>hi</p>', [3])
+    assert len({first['id'], second['id'], third['id']}) == 3
+    server.shutdown()
+
+if __name__ == '__main__':
+    tests = [(name, test) for name, test in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    sys.exit(1 if failed else 0)
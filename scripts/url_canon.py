@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+URL canonicalization for AI Ethics Newsletter deduplication
+Normalizes article URLs and derives the fixed-width key that carries the
+articles table's uniqueness constraint.
+"""
+
+import hashlib
+from typing import List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from psycopg import sql
+
+URL_KEY_BYTES = 16
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'ref', 'ref_src', 'ref_url', 'fbclid', 'gclid', 'dclid', 'msclkid',
+    'mc_cid', 'mc_eid', 'igshid', 'yclid', '_hsenc', '_hsmi', 'cmpid', 'ncid'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different links to one article compare equal.
+
+    http/https and a leading "www." are folded together, default ports,
+    fragments, tracking parameters and trailing slashes are dropped, and the
+    remaining query parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url.strip()
+
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f'{host}:{parts.port}'
+
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ))
+
+    return urlunsplit(('https', host, path, query, ''))
+
+def url_key(url: str) -> bytes:
+    """16-byte hash of the canonical URL, used as the dedup key."""
+    return hashlib.blake2b(canonicalize_url(url).encode(), digest_size=URL_KEY_BYTES).digest()
+
+def unique_constraints(cursor, table: str, column: str) -> List[str]:
+    """Names of the single-column unique constraints on table.column, from pg_constraint."""
+    cursor.execute("""
+        SELECT c.conname
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+        WHERE c.conrelid = %s::regclass
+          AND c.contype = 'u'
+          AND cardinality(c.conkey) = 1
+          AND a.attname = %s
+    """, (table, column))
+    return [row[0] for row in cursor.fetchall()]
+
+def drop_unique_constraints(cursor, table: str, column: str) -> List[str]:
+    """Drop the single-column unique constraints on table.column, looked up by name."""
+    names = unique_constraints(cursor, table, column)
+    for name in names:
+        cursor.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(
+            sql.Identifier(table), sql.Identifier(name)))
+    return names
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the ingestion helpers in scripts/
+Run: python3 test_ingest.py   (or with pytest)
+"""
+
+import io
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from scripts.feed_health import DeadlineReader, FeedTimeout, request_timeout
+from scripts.feed_stream import ParseError, iter_entries
+
+from scripts.near_dup import (MAX_DISTANCE, SIMHASH_BITS, SimHashIndex, article_fingerprint,
+                              hamming_distance, simhash)
+from scripts.url_canon import URL_KEY_BYTES, canonicalize_url, url_key
+
+RSS_ITEM = '''<item>
+  <title>Item {n}</title><link>https://example.org/{n}</link><guid>g{n}</guid>
+  <description>About {n}</description><pubDate>Tue, 04 Feb 2025 10:00:00 +0100</pubDate>
+</item>'''
+
+class CountingStream(io.BytesIO):
+    """Byte stream that records how much of the document was read."""
+
+    def read(self, size=-1):
+        return super().read(min(size, 256) if size and size > 0 else 256)
+
+def _rss(items: int) -> bytes:
+    body = ''.join(RSS_ITEM.format(n=n) for n in range(items))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>{body}</channel></rss>'.encode()
+
+def _flip(fingerprint: int, bits) -> int:
+    """Flip the given bit positions of a signed 64-bit fingerprint."""
+    unsigned = fingerprint & ((1 << SIMHASH_BITS) - 1)
+    for bit in bits:
+        unsigned ^= 1 << bit
+    return unsigned - (1 << SIMHASH_BITS) if unsigned >= 1 << (SIMHASH_BITS - 1) else unsigned
+
+def test_simhash_fits_bigint_and_ignores_case_and_punctuation():
+    fingerprint = simhash('OpenAI publishes a new safety framework')
+    assert -(1 << 63) <= fingerprint < (1 << 63)
+    assert simhash('openai publishes, a NEW safety framework!') == fingerprint
+    assert simhash('') is None and simhash('!!!') is None
+
+def test_article_fingerprint_uses_title_and_description():
+    article = {'title': 'Regulators weigh AI audit rules', 'description': None}
+    assert article_fingerprint(article) == simhash('Regulators weigh AI audit rules ')
+    assert article_fingerprint({'title': None, 'description': None}) is None
+
+def test_band_index_finds_every_pair_within_max_distance():
+    rng = random.Random(7)
+    for _ in range(200):
+        base = _flip(0, [bit for bit in range(SIMHASH_BITS) if rng.random() < 0.5])
+        near = _flip(base, rng.sample(range(SIMHASH_BITS), MAX_DISTANCE))
+        index = SimHashIndex()
+        index.add(1, base)
+        assert hamming_distance(base, near) == MAX_DISTANCE
+        assert index.find(near) == 1
+
+def test_band_index_rejects_pairs_beyond_max_distance():
+    index = SimHashIndex()
+    index.add(1, 0)
+    # Four flipped bits in one band still share the other three bands, but are too far apart
+    assert index.find(_flip(0, [0, 1, 2, 3])) is None
+    # One flipped bit in every band shares no band at all
+    assert index.find(_flip(0, [0, 16, 32, 48])) is None
+
+def test_band_index_prefers_the_closest_match():
+    index = SimHashIndex()
+    index.add(1, _flip(0, [1, 2, 3]))
+    index.add(2, _flip(0, [1]))
+    assert index.find(0) == 2
+
+def test_syndicated_copy_is_a_near_duplicate():
+    original = {'title': 'EU lawmakers agree on final text of the AI Act',
+                'description': 'The regulation sets obligations for providers of general-purpose '
+                               'AI models and bans several uses of biometric surveillance in public spaces.'}
+    copy = dict(original, title=original['title'] + ' | Reuters')
+    other = {'title': 'New benchmark measures deceptive behaviour in language models',
+             'description': 'Researchers release an evaluation suite for sycophancy and strategic deception.'}
+    index = SimHashIndex()
+    index.add(1, article_fingerprint(original))
+    assert index.find(article_fingerprint(copy)) == 1
+    assert index.find(article_fingerprint(other)) is None
+
+def test_canonicalize_folds_trivial_url_differences():
+    canonical = canonicalize_url('https://example.org/post')
+    for variant in ('http://example.org/post', 'https://www.example.org/post/', 'HTTPS://Example.ORG:443/post',
+                    'https://example.org/post#comments', '  https://example.org/post  '):
+        assert canonicalize_url(variant) == canonical, variant
+
+def test_canonicalize_drops_tracking_params_and_sorts_the_rest():
+    url = 'https://example.org/a?utm_source=x&b=2&fbclid=abc&a=1&UTM_Medium=y&ref=feed'
+    assert canonicalize_url(url) == 'https://example.org/a?a=1&b=2'
+
+def test_canonicalize_keeps_meaningful_params():
+    # "source" and friends can select different content, so they are not tracking noise
+    assert canonicalize_url('https://example.org/a?source=rss') != canonicalize_url('https://example.org/a?source=email')
+    assert canonicalize_url('https://example.org/a?id=1') != canonicalize_url('https://example.org/a?id=2')
+    assert canonicalize_url('https://example.org:8443/a') != canonicalize_url('https://example.org/a')
+    assert canonicalize_url('https://example.org/A') != canonicalize_url('https://example.org/a')
+
+def test_canonicalize_leaves_non_http_urls_alone():
+    assert canonicalize_url(' urn:uuid:1234 ') == 'urn:uuid:1234'
+
+def test_url_key_is_fixed_width_and_follows_canonical_form():
+    key = url_key('https://www.example.org/post/?utm_campaign=x')
+    assert len(key) == URL_KEY_BYTES
+    assert key == url_key('http://example.org/post')
+    assert key != url_key('https://example.org/other')
+
+def test_iter_entries_reads_rss2_fields():
+    entries = list(iter_entries(io.BytesIO(_rss(2))))
+    assert [entry['guid'] for entry in entries] == ['g0', 'g1']
+    assert entries[0]['title'] == 'Item 0' and entries[0]['link'] == 'https://example.org/0'
+    assert entries[0]['description'] == 'About 0'
+    assert entries[0]['pub_date'] == datetime(2025, 2, 4, 9, 0)   # converted to naive UTC
+
+def test_iter_entries_reads_atom_and_rss1():
+    atom = b'''<feed xmlns="http://www.w3.org/2005/Atom"><title>F</title>
+      <entry><id>urn:1</id><title>Atom</title>
+        <link rel="self" href="https://example.org/self"/><link href="https://example.org/post"/>
+        <summary>S</summary><updated>2025-02-04T10:00:00Z</updated></entry></feed>'''
+    entry, = iter_entries(io.BytesIO(atom))
+    assert (entry['guid'], entry['link'], entry['description']) == ('urn:1', 'https://example.org/post', 'S')
+    assert entry['pub_date'] == datetime(2025, 2, 4, 10, 0)
+
+    rss1 = b'''<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+                 xmlns:dc="http://purl.org/dc/elements/1.1/">
+      <item rdf:about="https://example.org/r1"><title>R1</title><link>https://example.org/r1</link>
+        <dc:date>2025-02-04T10:00:00+00:00</dc:date></item></rdf:RDF>'''
+    entry, = iter_entries(io.BytesIO(rss1))
+    assert (entry['guid'], entry['title'], entry['link']) == ('https://example.org/r1', 'R1', 'https://example.org/r1')
+    assert entry['pub_date'] == datetime(2025, 2, 4, 10, 0)
+
+def test_iter_entries_stops_reading_at_the_limit():
+    document = _rss(2000)
+    stream = CountingStream(document)
+    assert len(list(iter_entries(stream, limit=3))) == 3
+    assert stream.tell() < len(document) // 100
+
+def test_iter_entries_tolerates_missing_fields():
+    entry, = iter_entries(io.BytesIO(b'<rss><channel><item><title>Only a title</title></item></channel></rss>'))
+    assert entry['link'] == '' and entry['guid'] == '' and entry['pub_date'] is None
+
+def test_iter_entries_raises_parse_error_on_malformed_xml():
+    try:
+        list(iter_entries(io.BytesIO(b'<rss><channel><item><title>A & B</title></item></channel></rss>')))
+        assert False, 'expected ParseError'
+    except ParseError:
+        pass
+
+class StallingHandler(BaseHTTPRequestHandler):
+    """Sends the start of a body, then stalls without closing the connection."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '1000')
+        self.end_headers()
+        self.wfile.write(b'<rss>')
+        self.wfile.flush()
+        time.sleep(3)
+
+    def log_message(self, *args):
+        pass
+
+def test_deadline_reader_stops_a_stalled_read_at_the_deadline():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StallingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        started = time.monotonic()
+        deadline = started + 0.5
+        response = requests.get(f'http://127.0.0.1:{server.server_address[1]}/', stream=True,
+                                timeout=request_timeout(deadline))
+        try:
+            DeadlineReader(response.raw, deadline).read_all()
+            assert False, 'expected FeedTimeout'
+        except FeedTimeout:
+            pass
+        assert time.monotonic() - started < 1.5
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    tests = [(name, test) for name, test in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the scoring helpers in scripts/
+Run: python3 test_scoring.py   (or with pytest)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+from scripts.scoring_engine import RateLimiter, TokenBucket, estimate_tokens
+
+# scripts/ai_curator imports its siblings by bare name (it runs as a script). Appending
+# scripts/ keeps the root modules of the same name first on the path.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+import scripts.ai_curator as ai_curator
+from scripts.ai_curator import (SCORING_SYSTEM, build_batch_request, build_request, parse_batch_scores,
+                                score_articles, score_batch, valid_scores)
+
+def _scores(**overrides):
+    scores = {'relevance_score': 0.9, 'quality_score': 0.8, 'novelty_score': 0.7,
+              'overall_score': 0.8, 'reasoning': 'Relevant.'}
+    scores.update(overrides)
+    return scores
+
+def _elapsed(coroutine) -> float:
+    started = time.monotonic()
+    asyncio.run(coroutine)
+    return time.monotonic() - started
+
+def test_token_bucket_starts_full_and_refills_at_its_rate():
+    bucket = TokenBucket(600)              # 10 per second
+    now = bucket.updated
+    assert bucket.wait_time(600, now) == 0
+    bucket.take(600)
+    assert abs(bucket.wait_time(50, now) - 5.0) < 1e-6
+    assert bucket.wait_time(50, now + 5.0) == 0
+    # A request larger than the bucket goes once the bucket is full
+    assert bucket.wait_time(10_000, now + 60.0) == 0
+
+def test_acquire_waits_for_tokens_per_minute():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=60_000)   # 1000 tokens/s
+        await limiter.acquire(60_000)
+        await limiter.acquire(200)
+    assert 0.15 < _elapsed(run()) < 0.6
+
+def test_acquire_waits_for_requests_per_minute():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=1_000_000)  # 10 requests/s
+        for _ in range(602):
+            await limiter.acquire(1)
+    assert 0.15 < _elapsed(run()) < 0.6
+
+def test_refund_wakes_a_waiting_call_early():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=6_000)     # 100 tokens/s
+        await limiter.acquire(6_000)
+        waiter = asyncio.create_task(limiter.acquire(500))                           # ~5s without a refund
+        await asyncio.sleep(0.05)
+        limiter.settle(estimated=6_000, actual=1_000)
+        await waiter
+    assert _elapsed(run()) < 0.5
+
+def test_settle_charges_calls_that_used_more_than_estimated():
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=6_000)
+    limiter.tokens.take(1_000)
+    limiter.settle(estimated=1_000, actual=3_000)
+    assert 2_999 < limiter.tokens.level < 3_100
+
+def test_pause_holds_every_call():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1_000_000)
+        limiter.pause(0.2)
+        await asyncio.gather(limiter.acquire(1), limiter.acquire(1))
+    assert 0.2 <= _elapsed(run()) < 0.6
+
+def test_capacity_reports_room_or_wait():
+    limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=4_000)
+    assert limiter.capacity(1_000) == (4, 0.0)
+    assert limiter.capacity(100) == (10, 0.0)
+    limiter.tokens.take(4_000)
+    requests, wait = limiter.capacity(1_000)
+    assert requests == 0 and 14 < wait <= 15
+    limiter.tokens.give(4_000)
+    limiter.pause(30)
+    requests, wait = limiter.capacity(1_000)
+    assert requests == 0 and 29 < wait <= 30
+
+def test_estimate_tokens_counts_system_blocks_and_max_tokens():
+    request = {
+        'system': [{'type': 'text', 'text': 'x' * 400}, {'type': 'text', 'text': 'y' * 400}],
+        'messages': [{'role': 'user', 'content': 'z' * 800}],
+        'max_tokens': 500
+    }
+    assert estimate_tokens(request) == 1600 // 4 + 500
+    assert estimate_tokens(dict(request, system='s' * 40)) == 840 // 4 + 500
+
+def test_requests_share_the_rubric_as_system_prompt():
+    article = {'id': 1, 'title': 'T', 'source_name': 'S', 'pub_date': None, 'description': None}
+    for request in (build_request(article), build_batch_request([article])):
+        assert request['system'] == SCORING_SYSTEM
+        assert 'Relevance Score' not in request['messages'][0]['content']
+
+def test_valid_scores_rejects_out_of_range_boolean_and_missing_values():
+    assert valid_scores(_scores())
+    assert valid_scores(_scores(relevance_score=0, overall_score=1))
+    for bad in (_scores(quality_score=1.2), _scores(novelty_score=-0.1), _scores(overall_score=True),
+                _scores(relevance_score=False), _scores(quality_score='0.8'), _scores(novelty_score=None),
+                _scores(reasoning=None), _scores(reasoning=3)):
+        assert not valid_scores(bad), bad
+    incomplete = _scores()
+    del incomplete['overall_score']
+    assert not valid_scores(incomplete)
+    assert not valid_scores([_scores()]) and not valid_scores('0.8')
+
+def test_parse_batch_scores_keeps_valid_items_by_id():
+    text = json.dumps([dict(_scores(), id=1), dict(_scores(overall_score=0.4), id=2)])
+    results = parse_batch_scores(text, [1, 2])
+    assert results == {1: _scores(), 2: _scores(overall_score=0.4)}
+
+def test_parse_batch_scores_accepts_numeric_string_ids():
+    text = json.dumps([dict(_scores(), id='7'), dict(_scores(), id='seven'), dict(_scores(), id=' 8')])
+    assert list(parse_batch_scores(text, [7, 8])) == [7]
+
+def test_parse_batch_scores_rejects_boolean_and_float_ids():
+    text = json.dumps([dict(_scores(), id=True), dict(_scores(), id=2.0), dict(_scores(), id=3)])
+    assert list(parse_batch_scores(text, [1, 2, 3])) == [3]
+
+def test_parse_batch_scores_drops_unknown_and_repeated_ids():
+    text = json.dumps([dict(_scores(), id=1), dict(_scores(), id=99), dict(_scores(), id=2),
+                       dict(_scores(overall_score=0.1), id=2), dict(_scores(), id=None), _scores()])
+    assert list(parse_batch_scores(text, [1, 2, 3])) == [1]
+
+def test_parse_batch_scores_drops_invalid_scores():
+    text = json.dumps([dict(_scores(relevance_score=1.5), id=1), dict(_scores(quality_score=True), id=2),
+                       dict(_scores(), id=3)])
+    assert list(parse_batch_scores(text, [1, 2, 3])) == [3]
+
+def test_parse_batch_scores_reads_fenced_json():
+    items = json.dumps([dict(_scores(), id=1)])
+    for text in (f"Here are the scores:\n```json\n{items}\n```", f"```\n{items}\n```\nDone."):
+        assert list(parse_batch_scores(text, [1])) == [1]
+
+def test_parse_batch_scores_returns_nothing_for_non_list_output():
+    for text in (json.dumps(dict(_scores(), id=1)), json.dumps({'results': [dict(_scores(), id=1)]}),
+                 '"scores"', 'null', 'I cannot score these articles.', ''):
+        assert parse_batch_scores(text, [1]) == {}, text
+
+class FakeClient:
+    """Stands in for AsyncAnthropic: returns canned texts for batch and single requests."""
+
+    def __init__(self, batch_text, single_text):
+        self.batch_text = batch_text
+        self.single_text = single_text
+        self.requests = []
+        self.messages = self
+        self.closed = 0
+
+    async def create(self, **request):
+        self.requests.append(request)
+        batched = 'ARTICLES TO EVALUATE' in request['messages'][0]['content']
+        text = self.batch_text if batched else self.single_text
+        return SimpleNamespace(content=[SimpleNamespace(text=text)],
+                               usage=SimpleNamespace(input_tokens=10, output_tokens=10))
+
+    async def close(self):
+        self.closed += 1
+
+def _article(article_id):
+    return {'id': article_id, 'title': f'Article {article_id}', 'source_name': 'Source',
+            'pub_date': None, 'description': None}
+
+def test_score_batch_falls_back_to_single_scoring_for_dropped_articles():
+    batch = json.dumps([dict(_scores(), id=1), dict(_scores(relevance_score=2), id=2), dict(_scores(), id=9)])
+    client = FakeClient(batch, json.dumps(_scores(overall_score=0.5)))
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1_000_000)
+    results, errors = asyncio.run(score_batch(client, limiter, [_article(1), _article(2), _article(3)]))
+    assert results == {1: _scores(), 2: _scores(overall_score=0.5), 3: _scores(overall_score=0.5)}
+    assert errors == {}
+    assert len(client.requests) == 3   # one batch request, then articles 2 and 3 singly
+
+def test_score_batch_reports_articles_that_fail_singly_too():
+    client = FakeClient('not json', '{"overall_score": 7}')
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1_000_000)
+    results, errors = asyncio.run(score_batch(client, limiter, [_article(1), _article(2)]))
+    assert results == {}
+    assert sorted(errors) == [1, 2] and not any(error.transient for error in errors.values())
+
+class FailingWriter:
+    max_seconds = 60.0
+
+    def flush(self):
+        raise RuntimeError('database went away')
+
+def test_score_articles_closes_only_the_client_it_opened():
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1_000_000)
+    shared = FakeClient('[]', '{}')
+    asyncio.run(score_articles(None, [], 1, limiter, client=shared))
+    assert shared.closed == 0
+
+    opened = FakeClient('[]', '{}')
+    original = ai_curator.async_client
+    ai_curator.async_client = lambda api_key: opened
+    try:
+        try:
+            asyncio.run(score_articles(None, [], 1, limiter, writer=FailingWriter()))
+            assert False, 'expected RuntimeError'
+        except RuntimeError:
+            pass
+    finally:
+        ai_curator.async_client = original
+    assert opened.closed == 1
+
+if __name__ == '__main__':
+    tests = [(name, test) for name, test in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Checks that the Render worker runs the root pipeline modules
+Run: python3 test_worker.py   (or with pytest)
+"""
+
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def _is_root_module(module) -> bool:
+    return os.path.dirname(os.path.abspath(module.__file__)) == ROOT
+
+def test_rss_monitor_does_not_shadow_root_modules():
+    import worker
+    import rss_monitor  # worker.init_database imports it at startup
+    import ai_curator
+    import newsletter_assembler
+    assert _is_root_module(ai_curator)
+    assert _is_root_module(newsletter_assembler)
+
+def test_run_ai_curator_calls_root_score_articles():
+    import worker
+    import rss_monitor
+    import ai_curator
+
+    assert _is_root_module(ai_curator)
+    calls = []
+    original = ai_curator.score_articles
+    ai_curator.score_articles = lambda: calls.append('root')
+    try:
+        worker.run_ai_curator()
+    finally:
+        ai_curator.score_articles = original
+    assert calls == ['root']
+
+def test_run_newsletter_assembler_calls_root_assembler():
+    import worker
+    import rss_monitor
+    import newsletter_assembler
+
+    assert _is_root_module(newsletter_assembler)
+    calls = []
+    original = newsletter_assembler.assemble_newsletter
+    newsletter_assembler.assemble_newsletter = lambda: calls.append('root')
+    try:
+        worker.run_newsletter_assembler()
+    finally:
+        newsletter_assembler.assemble_newsletter = original
+    assert calls == ['root']
+
+def test_run_due_feeds_scores_new_articles_and_keeps_skipped_intervals():
+    import worker
+    import rss_monitor
+    import ai_curator
+    from feed_scheduler import FeedScheduler
+
+    feeds = [{'url': f'https://example.org/{name}', 'source': name} for name in ('ok', 'failed', 'skipped')]
+    scheduler = FeedScheduler(feeds)
+    scheduler.failures['skipped'] = 2
+    for source in scheduler.next_poll:
+        scheduler.next_poll[source] = scheduler.next_poll[source].replace(year=2000)
+
+    def fetch(due, results):
+        results.update({'ok': 2, 'failed': None, 'skipped': rss_monitor.NOT_ATTEMPTED})
+        return 2
+
+    curator_runs = []
+    fetch_rss_feeds, score_articles = rss_monitor.fetch_rss_feeds, ai_curator.score_articles
+    rss_monitor.fetch_rss_feeds = fetch
+    ai_curator.score_articles = lambda: curator_runs.append(True)
+    worker.feed_scheduler = scheduler
+    try:
+        worker.run_due_feeds()
+    finally:
+        rss_monitor.fetch_rss_feeds, ai_curator.score_articles = fetch_rss_feeds, score_articles
+        worker.feed_scheduler = None
+
+    assert scheduler.failures == {'ok': 0, 'failed': 1, 'skipped': 2}
+    assert not scheduler.due_feeds()
+    assert curator_runs == [True]
+
+def test_feedparser_fallback_skips_entries_without_link():
+    import rss_monitor
+
+    body = b'''<?xml version="1.0"?>
+    <rss version="2.0"><channel><title>Feed</title>
+      <item><title>No link & broken</title></item>
+      <item><title>Kept</title><link>https://example.org/kept</link></item>
+    </channel></rss>'''
+
+    class Response:
+        raw = None
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc_info):
+            pass
+
+    class Reader(io.BytesIO):
+        def __init__(self, raw, deadline):
+            super().__init__(body)
+        def read_all(self):
+            return body
+
+    get, reader = rss_monitor._get, rss_monitor.DeadlineReader
+    rss_monitor._get = lambda url, deadline: Response()
+    rss_monitor.DeadlineReader = Reader
+    try:
+        # The unescaped & makes the streaming parser fail, so the fallback runs
+        entries = rss_monitor._fetch_entries({'url': 'https://example.org/feed', 'source': 'Test'}, 0)
+    finally:
+        rss_monitor._get, rss_monitor.DeadlineReader = get, reader
+    assert [entry['link'] for entry in entries] == ['https://example.org/kept']
+
+if __name__ == '__main__':
+    tests = [(name, test) for name, test in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name}: {e!r}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    sys.exit(1 if failed else 0)
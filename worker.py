@@ -28,7 +28,8 @@ def init_database():
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS articles (
                     id SERIAL PRIMARY KEY,
-                    url TEXT UNIQUE NOT NULL,
+                    url TEXT NOT NULL,
+                    url_key BYTEA NOT NULL,
                     title TEXT NOT NULL,
                     source TEXT NOT NULL,
                     published_date TIMESTAMP,
@@ -36,6 +37,10 @@ def init_database():
                 );
             """)
 
+            # Dedup on a 16-byte hash of the canonical URL instead of the raw text
+            cur.execute("ALTER TABLE articles ADD COLUMN IF NOT EXISTS url_key BYTEA;")
+            cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_url_key ON articles(url_key);")
+
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS article_scores (
                     id SERIAL PRIMARY KEY,
@@ -45,11 +50,17 @@ def init_database():
                     quality_score DECIMAL(3,2),
                     novelty_score DECIMAL(3,2),
                     reasoning TEXT,
+                    ai_model VARCHAR(100),
+                    prompt_version VARCHAR(50),
                     scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     UNIQUE(article_id)
                 );
             """)
 
+            # Record which model and prompt produced each score
+            cur.execute("ALTER TABLE article_scores ADD COLUMN IF NOT EXISTS ai_model VARCHAR(100);")
+            cur.execute("ALTER TABLE article_scores ADD COLUMN IF NOT EXISTS prompt_version VARCHAR(50);")
+
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS newsletter_items (
                     id SERIAL PRIMARY KEY,
@@ -62,9 +73,84 @@ def init_database():
                 );
             """)
 
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS feed_registry (
+                    feed_url TEXT PRIMARY KEY,
+                    feed_name TEXT,
+                    last_attempt_at TIMESTAMP,
+                    last_success_at TIMESTAMP,
+                    avg_latency_ms DOUBLE PRECISION,
+                    consecutive_failures INTEGER DEFAULT 0,
+                    total_fetches INTEGER DEFAULT 0,
+                    total_failures INTEGER DEFAULT 0,
+                    last_error TEXT,
+                    open_until TIMESTAMP
+                );
+            """)
+
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS score_cache (
+                    cache_key BYTEA PRIMARY KEY,
+                    ai_model VARCHAR(100) NOT NULL,
+                    prompt_version VARCHAR(50) NOT NULL,
+                    relevance_score DECIMAL(3,2),
+                    quality_score DECIMAL(3,2),
+                    novelty_score DECIMAL(3,2),
+                    overall_score DECIMAL(3,2),
+                    reasoning TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_hit_at TIMESTAMP,
+                    hits INTEGER DEFAULT 0
+                );
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_score_cache_created ON score_cache(created_at);")
+
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS scoring_dead_letters (
+                    id SERIAL PRIMARY KEY,
+                    article_id INTEGER REFERENCES articles(id) ON DELETE CASCADE,
+                    ai_model VARCHAR(100),
+                    prompt_version VARCHAR(50),
+                    error TEXT NOT NULL,
+                    raw_response TEXT,
+                    failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_dead_letters_article ON scoring_dead_letters(article_id);")
+
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS scoring_calls (
+                    id BIGSERIAL PRIMARY KEY,
+                    run_id TEXT NOT NULL,
+                    called_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    ai_model VARCHAR(100) NOT NULL,
+                    prompt_version VARCHAR(50),
+                    article_ids INTEGER[] NOT NULL,
+                    input_tokens INTEGER DEFAULT 0,
+                    output_tokens INTEGER DEFAULT 0,
+                    cache_read_tokens INTEGER DEFAULT 0,
+                    cache_write_tokens INTEGER DEFAULT 0,
+                    latency_ms DOUBLE PRECISION,
+                    outcome VARCHAR(20) NOT NULL,
+                    cost_usd NUMERIC(12,6)
+                );
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_scoring_calls_called ON scoring_calls(called_at);")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_scoring_calls_run ON scoring_calls(run_id);")
+
             conn.commit()
             print(f"[{datetime.now()}] ✅ Database schema initialized!")
 
+            # Databases from before url_key still dedup on UNIQUE(url), which makes inserts raise
+            # instead of hitting ON CONFLICT (url_key); key their rows and drop it (once)
+            from scripts.url_canon import unique_constraints
+            if unique_constraints(cur, 'articles', 'url'):
+                from rss_monitor import backfill_url_keys
+                keyed = backfill_url_keys(conn)
+                print(f"[{datetime.now()}] 🔑 Migrated to url_key dedup: keyed {keyed} articles, "
+                      f"dropped the unique url constraint")
+            conn.commit()
+
         conn.close()
         return True
 
@@ -72,13 +158,51 @@ def init_database():
         print(f"[{datetime.now()}] ❌ Database init error: {e}")
         return False
 
-def run_rss_monitor():
-    """Run RSS monitor script"""
+feed_scheduler = None
+
+def learn_feed_rates():
+    """Re-estimate per-feed polling intervals from posting history"""
+    global feed_scheduler
     try:
-        from rss_monitor import fetch_rss_feeds
-        fetch_rss_feeds()
+        if feed_scheduler is None:
+            from rss_monitor import RSS_FEEDS
+            from feed_scheduler import FeedScheduler
+            feed_scheduler = FeedScheduler(RSS_FEEDS)
+
+        conn = psycopg.connect(DATABASE_URL)
+        feed_scheduler.learn_rates(conn)
+        conn.close()
+    except Exception as e:
+        print(f"[{datetime.now()}] ❌ Feed rate learning error: {e}")
+
+def run_due_feeds():
+    """Poll the feeds the adaptive scheduler says are due"""
+    if feed_scheduler is None:
+        return
+
+    due = feed_scheduler.due_feeds()
+    if not due:
+        return
+
+    from rss_monitor import NOT_ATTEMPTED, fetch_rss_feeds
+    results = {}
+    try:
+        new_articles = fetch_rss_feeds(due, results)
     except Exception as e:
         print(f"[{datetime.now()}] ❌ RSS monitor error: {e}")
+        new_articles = 0
+
+    # Feeds that were never fetched keep their interval instead of backing off
+    for feed in due:
+        result = results.get(feed['source'], NOT_ATTEMPTED)
+        if result == NOT_ATTEMPTED:
+            feed_scheduler.record_skip(feed['source'])
+        else:
+            feed_scheduler.record_result(feed['source'], result)
+
+    # Hand fresh articles to the curator right away instead of waiting for a slot
+    if new_articles:
+        run_ai_curator()
 
 def run_ai_curator():
     """Run AI curator script"""
@@ -102,9 +226,12 @@ if __name__ == "__main__":
     # Initialize database on startup
     init_database()
 
+    # Poll each feed at its own learned rate
+    learn_feed_rates()
+    schedule.every().hour.do(learn_feed_rates)
+    schedule.every().minute.do(run_due_feeds)
+
     # Schedule jobs
-    schedule.every().day.at("09:00").do(run_rss_monitor)
-    schedule.every().day.at("17:00").do(run_rss_monitor)
     schedule.every().day.at("09:30").do(run_ai_curator)
     schedule.every().day.at("17:30").do(run_ai_curator)
     schedule.every().monday.at("08:00").do(run_newsletter_assembler)